@@ -0,0 +1,190 @@
+import os
+from typing import Literal
+from pydantic import BaseModel, Field
+from dotenv import load_dotenv
+
+ENV_PREFIX = "TRANSCRIBER_"
+
+class Settings(BaseModel):
+    inference_workers: int = Field(
+        default=1,
+        ge=1,
+        description="Number of threads running blocking model inference"
+    )
+    inference_queue_size: int = Field(
+        default=8,
+        ge=0,
+        description="Requests allowed to wait for an inference worker before new ones are rejected"
+    )
+    retry_after_s: int = Field(
+        default=5,
+        ge=1,
+        description="Retry-After value (in seconds) sent when the inference queue is full"
+    )
+    inference_processes: int = Field(
+        default=0,
+        ge=0,
+        description="Worker processes that each hold a copy of the model and decode windows in parallel; 0 runs inference in this process"
+    )
+    batch_max_size: int = Field(
+        default=16,
+        ge=1,
+        description="Maximum number of audio chunks run through the model in one forward pass"
+    )
+    batch_max_wait_ms: int = Field(
+        default=20,
+        ge=0,
+        description="How long a request waits for others to share its batch before running"
+    )
+    default_model: str = Field(
+        default="distil-whisper/distil-large-v3",
+        description="Model used when a request does not name one"
+    )
+    inference_broker: str = Field(
+        default="",
+        description="Unix socket path or host:port of an inference broker (python -m app.services.broker) that runs the models for this process; empty to load them in-process"
+    )
+    inference_broker_authkey: str = Field(
+        default="",
+        description="Shared secret between the broker and its clients; required when the broker listens on TCP"
+    )
+    inference_engine: Literal["transformers", "int8", "onnx"] = Field(
+        default="transformers",
+        description="How models are run: the transformers pipeline as-is, with int8-quantized linear layers (CPU), or exported to ONNX Runtime"
+    )
+    assistant_model: str = Field(
+        default="",
+        description="Small model that drafts tokens for every served model sharing its tokenizer to verify (speculative decoding); other models, or all when empty, decode normally"
+    )
+    encoder_cache_mb: int = Field(
+        default=512,
+        ge=0,
+        description="Memory for caching encoder outputs per audio window, so re-transcribing audio with other decoding options only reruns the decoder; 0 disables"
+    )
+    encoder_cache_dir: str = Field(
+        default="",
+        description="Directory that encoder outputs beyond the memory budget are spilled to; empty to drop them instead"
+    )
+    encoder_cache_disk_mb: int = Field(
+        default=4096,
+        ge=1,
+        description="Disk space for spilled encoder outputs"
+    )
+    language_detection: bool = Field(
+        default=True,
+        description="When a request names no language, identify it once from the first 30 s and decode every window in it, instead of letting each window guess"
+    )
+    warm_up: bool = Field(
+        default=True,
+        description="Load models in the background at startup instead of on the first request"
+    )
+    warm_up_models: str = Field(
+        default="",
+        description="Comma-separated extra model IDs or aliases to load during warm-up"
+    )
+    model_memory_budget_mb: int = Field(
+        default=8192,
+        ge=1,
+        description="Memory budget for loaded models; least recently used models are evicted beyond it"
+    )
+    max_concurrent_downloads: int = Field(
+        default=4,
+        ge=1,
+        description="YouTube audio streams downloaded and decoded at once, independent of inference concurrency"
+    )
+    batch_concurrency: int = Field(
+        default=2,
+        ge=1,
+        description="Videos from one /transcribe/batch request transcribed at once"
+    )
+    max_upload_mb: int = Field(
+        default=2048,
+        ge=1,
+        description="Largest accepted upload; larger requests are rejected from their Content-Length before the body is read"
+    )
+    upload_chunk_kb: int = Field(
+        default=1024,
+        ge=4,
+        description="Size of the chunks an upload is copied in"
+    )
+    cache_backend: Literal["none", "memory", "sqlite"] = Field(
+        default="memory",
+        description="Where transcription results are cached"
+    )
+    coalesce_requests: bool = Field(
+        default=True,
+        description="Let concurrent requests for the same audio and options share one transcription"
+    )
+    cache_max_entries: int = Field(
+        default=1024,
+        ge=1,
+        description="Maximum number of results kept by the in-memory cache"
+    )
+    cache_path: str = Field(
+        default="cache/transcriptions.sqlite3",
+        description="SQLite file used by the on-disk cache"
+    )
+    cache_max_mb: int = Field(
+        default=1024,
+        ge=1,
+        description="Size cap of the on-disk cache; least recently used results are evicted beyond it"
+    )
+    artifact_dir: str = Field(
+        default="cache/audio",
+        description="Directory where decoded YouTube audio is kept, keyed by video ID"
+    )
+    artifact_max_mb: int = Field(
+        default=4096,
+        ge=0,
+        description="Size cap of the stored YouTube audio (about 230 MB per hour); least recently used videos beyond it are deleted; 0 disables"
+    )
+    jobs_path: str = Field(
+        default="cache/jobs.sqlite3",
+        description="SQLite file where background jobs and their results are stored"
+    )
+    jobs_upload_dir: str = Field(
+        default="cache/job_uploads",
+        description="Directory holding uploaded audio until its job has run"
+    )
+    max_concurrent_jobs: int = Field(
+        default=2,
+        ge=1,
+        description="Background jobs transcribed at the same time; the rest wait in order"
+    )
+    live_step_ms: int = Field(
+        default=1000,
+        ge=100,
+        description="How much new audio a live session collects before decoding again"
+    )
+    live_max_window_s: int = Field(
+        default=15,
+        ge=2,
+        le=30,
+        description="Longest utterance a live session decodes before committing it"
+    )
+    live_min_silence_ms: int = Field(
+        default=600,
+        ge=100,
+        description="Silence that ends an utterance in a live session"
+    )
+    live_max_backlog_s: int = Field(
+        default=10,
+        ge=1,
+        description="Undecoded audio a live session may queue before dropping the oldest"
+    )
+    vad_threshold: float = Field(
+        default=0.01,
+        gt=0,
+        description="RMS energy above which an audio frame counts as speech"
+    )
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Build settings from TRANSCRIBER_* environment variables (and a .env file, if present)"""
+        load_dotenv()
+        values = {
+            name: os.environ[f"{ENV_PREFIX}{name.upper()}"]
+            for name in cls.model_fields
+            if f"{ENV_PREFIX}{name.upper()}" in os.environ
+        }
+        return cls(**values)
@@ -1,15 +1,123 @@
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import asdict
 from fastapi import FastAPI
-from app.routers import transcription
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from app.routers import jobs, live, transcription
+from app.config import Settings
+from app.services import metrics
+from app.services.audio import UploadSizeLimitMiddleware
+from app.services.cache import CachingTranscriptionService, create_cache_backend
+from app.services.jobs import JobManager, JobStore
 from app.services.transcription_service import WhisperTranscriptionService
 
-app = FastAPI(title="Audio Transcription API")
+settings = Settings.from_env()
+whisper_service = WhisperTranscriptionService(settings)
+cache_backend = create_cache_backend(settings)
+metrics.bind_service(whisper_service)
+transcription_service = whisper_service
+if cache_backend is not None or settings.coalesce_requests:
+    transcription_service = CachingTranscriptionService(
+        whisper_service,
+        cache_backend,
+        model_resolver=whisper_service.registry.resolve,
+        coalesce=settings.coalesce_requests,
+    )
+job_manager = JobManager(
+    transcription_service,
+    None,
+    upload_dir=settings.jobs_upload_dir,
+    max_concurrent_jobs=settings.max_concurrent_jobs,
+    max_upload_bytes=settings.max_upload_mb * 1024**2,
+    upload_chunk_size=settings.upload_chunk_kb * 1024,
+    model_resolver=whisper_service.registry.resolve,
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the port binds immediately; /ready reports progress
+    warm_up = None
+    if settings.warm_up:
+        extra_models = [m.strip() for m in settings.warm_up_models.split(",") if m.strip()]
+        warm_up = asyncio.create_task(
+            asyncio.to_thread(whisper_service.registry.warm_up, extra_models)
+        )
+    # Opening the job store creates its files, so it waits until the app starts rather than import
+    await job_manager.start(JobStore(settings.jobs_path))
+    yield
+    await job_manager.shutdown()
+    if warm_up is not None and not warm_up.done():
+        warm_up.cancel()
+    whisper_service.inference_pool.shutdown(wait=False)
+    whisper_service.download_executor.shutdown(wait=False, cancel_futures=True)
+    if whisper_service.process_pool is not None:
+        whisper_service.process_pool.shutdown()
+    if whisper_service.remote_engine is not None:
+        whisper_service.remote_engine.shutdown()
+
+app = FastAPI(title="Audio Transcription API", lifespan=lifespan)
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=settings.max_upload_mb * 1024**2)
 
 # Use the real implementation in production
 app.include_router(
-    transcription.create_router(WhisperTranscriptionService()), 
+    transcription.create_router(transcription_service, batch_concurrency=settings.batch_concurrency),
     prefix="/api/v1"
 )
+app.include_router(jobs.create_jobs_router(job_manager), prefix="/api/v1")
+# Live audio is never worth caching, so it goes straight to the model
+app.include_router(live.create_live_router(whisper_service, settings), prefix="/api/v1")
 
 @app.get("/")
 async def root():
-    return {"message": "Audio Transcription API"}
\ No newline at end of file
+    return {"message": "Audio Transcription API"}
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: only succeeds once the default model is loaded"""
+    registry = whisper_service.registry
+    if not registry.ready:
+        return JSONResponse(status_code=503, content={"status": "warming up"})
+    return {"status": "ready", "models": registry.loaded_models}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Counters of the result cache, request coalescing, the encoder-output cache and the YouTube audio store"""
+    encoder_cache = whisper_service.encoder_cache
+    encoder = {"enabled": False} if encoder_cache is None else {
+        "enabled": True,
+        **asdict(encoder_cache.stats),
+        "memory_bytes": encoder_cache.memory_bytes,
+        "disk_bytes": encoder_cache.disk_bytes,
+    }
+    store = whisper_service.artifacts
+    artifacts = {"enabled": False} if store is None else {
+        "enabled": True,
+        **asdict(store.stats),
+        "entries": len(store),
+        "disk_bytes": store.size_bytes,
+    }
+    caching = isinstance(transcription_service, CachingTranscriptionService)
+    flights = transcription_service.flights if caching else None
+    coalescing = {"enabled": False} if flights is None else {
+        "enabled": True,
+        **asdict(flights.stats),
+        "in_flight": len(flights),
+    }
+    if not caching or transcription_service.backend is None:
+        return {"enabled": False, "encoder": encoder, "artifacts": artifacts, "coalescing": coalescing}
+    stats = transcription_service.stats
+    return {
+        "enabled": True,
+        "hits": stats.hits,
+        "misses": stats.misses,
+        "hit_rate": stats.hit_rate,
+        "encoder": encoder,
+        "artifacts": artifacts,
+        "coalescing": coalescing,
+    }
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus metrics: stage latencies, audio processed, real-time factor, queue depth and model memory"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,26 @@
+from datetime import datetime
+from enum import Enum
+from pydantic import BaseModel, Field
+from typing import Optional
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobProgress(BaseModel):
+    chunks_done: int = Field(default=0, description="Audio chunks transcribed so far")
+    chunks_total: Optional[int] = Field(
+        default=None,
+        description="Total audio chunks, known once the audio has been downloaded and decoded"
+    )
+
+class JobInfo(BaseModel):
+    id: str
+    status: JobStatus
+    progress: JobProgress
+    created_at: datetime
+    updated_at: datetime
+    error: Optional[str] = None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field, HttpUrl
-from typing import Optional, List, Union
+from enum import Enum
+from pydantic import BaseModel, Field, HttpUrl, model_validator
+from typing import Any, Dict, Optional, List, Union
 
 class TranscriptionOptions(BaseModel):
     language: Optional[str] = Field(
@@ -10,12 +11,28 @@ class TranscriptionOptions(BaseModel):
         default=False,
         description="Whether to return timestamps for each transcribed segment"
     )
+    word_timestamps: bool = Field(
+        default=False,
+        description="Also return the start and end of every word, in each segment's words; implies return_timestamps"
+    )
     chunk_length_s: int = Field(
         default=30,
         ge=1,
         le=120,
         description="Length of audio chunks to process at a time (in seconds)"
     )
+    model: Optional[str] = Field(
+        default=None,
+        description="Model to transcribe with (e.g., 'distil-large-v3', 'distil-large-v2', 'tiny', 'base'). If None, the server default is used"
+    )
+    vad: bool = Field(
+        default=False,
+        description="Detect speech first and only transcribe speech regions, skipping silence and music"
+    )
+    debug: bool = Field(
+        default=False,
+        description="Include per-stage timings, audio duration and real-time factor in the response"
+    )
 
 class YoutubeTranscriptionRequest(BaseModel):
     url: HttpUrl = Field(..., description="YouTube video URL to transcribe")
@@ -24,8 +41,91 @@ class YoutubeTranscriptionRequest(BaseModel):
         description="Transcription options"
     )
 
+class BatchTranscriptionRequest(BaseModel):
+    urls: List[HttpUrl] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="YouTube video or playlist URLs; playlists are expanded and repeated videos transcribed once"
+    )
+    options: Optional[TranscriptionOptions] = Field(
+        default_factory=TranscriptionOptions,
+        description="Transcription options applied to every video"
+    )
+
+class ExportFormat(str, Enum):
+    JSON = "json"
+    SRT = "srt"
+    VTT = "vtt"
+
+class Word(BaseModel):
+    start: float
+    end: float
+    text: str
+
+class Segment(BaseModel):
+    start: float
+    end: float
+    text: str
+    words: Optional[List[Word]] = None  # Only with the word_timestamps option
+
+    @model_validator(mode="before")
+    @classmethod
+    def _from_pipeline_chunk(cls, data: Any) -> Any:
+        # Raw pipeline chunks carry a (start, end) pair, with end None when a window ends mid-speech
+        if isinstance(data, dict) and "timestamp" in data and "start" not in data:
+            start, end = data["timestamp"]
+            start = start or 0.0
+            return {"start": start, "end": end if end is not None else start, "text": data["text"].strip()}
+        return data
+
 class TranscriptionResponse(BaseModel):
     text: str
     language: Optional[str] = None
-    segments: Optional[List[dict]] = None
-    video_title: Optional[str] = None  # Added for YouTube responses
\ No newline at end of file
+    language_probability: Optional[float] = None  # Set when the language was detected rather than given
+    segments: Optional[List[Segment]] = None
+    video_title: Optional[str] = None  # Added for YouTube responses
+    silence_skipped_s: Optional[float] = None  # Seconds not transcribed when vad is enabled
+    debug: Optional[dict] = None  # Stage timings, only when the debug option is set
+
+class LanguageDetectionRequest(BaseModel):
+    url: HttpUrl = Field(..., description="YouTube video URL whose language to identify")
+    model: Optional[str] = Field(default=None, description="Model to identify the language with")
+
+class LanguageDetectionResponse(BaseModel):
+    language: str = Field(..., description="Most likely language code (e.g. 'en')")
+    probability: float = Field(..., description="Probability of that language")
+    probabilities: Dict[str, float] = Field(..., description="The most likely languages and their probabilities")
+
+class SegmentColumns(BaseModel):
+    start: List[float]
+    end: List[float]
+    text: List[str]
+
+class WordColumns(BaseModel):
+    start: List[float]
+    end: List[float]
+    text: List[str]
+    segment: List[int]  # Index of the segment each word belongs to
+
+class ColumnarTranscript(BaseModel):
+    """A transcript as parallel arrays instead of one object per segment and word"""
+    text: str
+    language: Optional[str] = None
+    video_title: Optional[str] = None
+    segments: SegmentColumns
+    words: Optional[WordColumns] = None
+
+def build_transcription_response(result: Union[str, dict, list]) -> TranscriptionResponse:
+    """Normalize the result formats a TranscriptionService may return into a TranscriptionResponse"""
+    if isinstance(result, str):
+        return TranscriptionResponse(text=result)
+    if isinstance(result, list):
+        result = {"segments": result}
+    if not isinstance(result, dict):
+        raise TypeError("Unexpected response format from transcription service")
+    if "segments" not in result and "chunks" in result:
+        result = {**result, "segments": result["chunks"]}
+    if "text" not in result:
+        result = {**result, "text": " ".join(segment["text"].strip() for segment in result.get("segments") or [])}
+    return TranscriptionResponse.model_validate(result)
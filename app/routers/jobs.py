@@ -0,0 +1,99 @@
+from fastapi import APIRouter, UploadFile, HTTPException, File, Depends
+from app.services.jobs import JobManager, JobNotFoundError
+from app.services.audio import UploadTooLargeError
+from app.services.model_registry import UnknownModelError
+from app.services.export import MissingTimestampsError
+from app.routers.transcription import ALLOWED_AUDIO_TYPES, export_response, json_response
+from app.models.jobs import JobInfo, JobStatus
+from app.models.transcription import (
+    ExportFormat,
+    TranscriptionOptions,
+    TranscriptionResponse,
+    YoutubeTranscriptionRequest,
+)
+
+def create_jobs_router(job_manager: JobManager) -> APIRouter:
+    router = APIRouter()
+
+    def get_job(job_id: str):
+        try:
+            return job_manager.get(job_id)
+        except JobNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+
+    @router.post("/jobs/transcribe", response_model=JobInfo, status_code=202)
+    async def submit_transcription_job(
+        file: UploadFile = File(...),
+        options: TranscriptionOptions = Depends()
+    ):
+        """
+        Queue an audio file for transcription and return the job immediately.
+        """
+        if not file.content_type in ALLOWED_AUDIO_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File must be an audio file. Supported types: {', '.join(ALLOWED_AUDIO_TYPES)}"
+            )
+        try:
+            job = await job_manager.submit_upload(file, options)
+        except UnknownModelError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except UploadTooLargeError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        return job.info()
+
+    @router.post("/jobs/transcribe/youtube", response_model=JobInfo, status_code=202)
+    async def submit_youtube_job(request: YoutubeTranscriptionRequest):
+        """
+        Queue a YouTube video for transcription and return the job immediately.
+        """
+        try:
+            job = await job_manager.submit_youtube(str(request.url), request.options or TranscriptionOptions())
+        except UnknownModelError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return job.info()
+
+    @router.get("/jobs/{job_id}", response_model=JobInfo)
+    async def get_job_status(job_id: str):
+        """
+        Report a job's status and progress (chunks done / total).
+        """
+        return get_job(job_id).info()
+
+    def get_job_result_response(job_id: str) -> TranscriptionResponse:
+        job = get_job(job_id)
+        if job.status != JobStatus.COMPLETED:
+            detail = f"Job is {job.status.value}"
+            if job.error:
+                detail += f": {job.error}"
+            raise HTTPException(status_code=409, detail=detail)
+        return TranscriptionResponse(**job.result)
+
+    @router.get("/jobs/{job_id}/result", response_model=TranscriptionResponse)
+    async def get_job_result(job_id: str):
+        """
+        Return the transcription of a completed job.
+        """
+        return json_response(get_job_result_response(job_id))
+
+    @router.get("/jobs/{job_id}/export/{export_format}")
+    async def export_job_result(job_id: str, export_format: ExportFormat):
+        """
+        Return the transcription of a completed job as SRT or WebVTT subtitles, or as JSON
+        with segments and words as column arrays. Subtitles need a job submitted with
+        return_timestamps.
+        """
+        try:
+            return export_response(get_job_result_response(job_id), export_format)
+        except MissingTimestampsError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+    @router.delete("/jobs/{job_id}", response_model=JobInfo)
+    async def cancel_job(job_id: str):
+        """
+        Cancel a queued or running job.
+        """
+        get_job(job_id)
+        return job_manager.cancel(job_id).info()
+
+    return router
@@ -0,0 +1,125 @@
+import asyncio
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services.audio import SAMPLING_RATE, pcm_to_float32, resample
+from app.services.inference_pool import InferenceQueueFullError
+from app.services.live import LiveTranscriptionSession, LiveUpdate
+from app.services.model_registry import UnknownModelError
+from app.services.transcription_service import TranscriptionService
+from app.services.vad import EnergyVAD
+
+def _update_message(update: LiveUpdate) -> dict:
+    return {
+        "type": "hypothesis",
+        "stable": update.stable,
+        "tentative": update.tentative,
+        "latency_s": round(update.latency_s, 3),
+    }
+
+def _is_end_message(text: str) -> bool:
+    try:
+        return json.loads(text).get("type") == "end"
+    except (ValueError, AttributeError):
+        return text.strip() == "end"
+
+def create_live_router(transcription_service: TranscriptionService, settings: Optional[Settings] = None) -> APIRouter:
+    router = APIRouter()
+    settings = settings or Settings()
+
+    @router.websocket("/live")
+    async def live_transcription(
+        websocket: WebSocket,
+        language: Optional[str] = None,
+        model: Optional[str] = None,
+        sample_rate: int = SAMPLING_RATE,
+        encoding: Literal["pcm_s16le", "f32le"] = "pcm_s16le",
+    ):
+        """
+        Live captioning. Send raw mono PCM frames as binary messages and {"type": "end"}
+        when done. Receives "hypothesis" messages with newly stable words and the current
+        tentative tail, "backpressure" messages when audio had to be dropped, and a final
+        "final" message with the whole transcript.
+        """
+        await websocket.accept()
+        try:
+            options = TranscriptionOptions(language=language, model=model)
+        except ValidationError as e:
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1008)
+            return
+
+        async def transcribe(audio) -> str:
+            result = await transcription_service.transcribe_array(audio, options)
+            return result["text"]
+
+        session = LiveTranscriptionSession(
+            transcribe,
+            SAMPLING_RATE,
+            step_s=settings.live_step_ms / 1000,
+            max_window_s=settings.live_max_window_s,
+            min_silence_s=settings.live_min_silence_ms / 1000,
+            max_backlog_s=settings.live_max_backlog_s,
+            vad=EnergyVAD(SAMPLING_RATE, threshold=settings.vad_threshold),
+        )
+        audio_arrived = asyncio.Event()
+        closing = False
+
+        async def decode_loop() -> None:
+            # Runs alongside the receive loop; audio arriving while a decode is in
+            # flight is coalesced into the next decode instead of queueing decodes
+            while not closing:
+                await audio_arrived.wait()
+                audio_arrived.clear()
+                while session.ready and not closing:
+                    update = await session.advance()
+                    if update is not None:
+                        await websocket.send_json(_update_message(update))
+
+        decoder = asyncio.create_task(decode_loop())
+        try:
+            while True:
+                if decoder.done():
+                    # Surface a failed decode instead of silently buffering audio
+                    decoder.result()
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                if message.get("bytes") is not None:
+                    samples = resample(pcm_to_float32(message["bytes"], encoding), sample_rate)
+                    dropped = session.feed(samples)
+                    if dropped:
+                        await websocket.send_json({
+                            "type": "backpressure",
+                            "dropped_s": round(dropped / SAMPLING_RATE, 3),
+                            "backlog_s": round(session.backlog_s, 3),
+                        })
+                    audio_arrived.set()
+                elif message.get("text") is not None and _is_end_message(message["text"]):
+                    break
+
+            closing = True
+            audio_arrived.set()
+            await decoder
+            update = await session.advance(final=True)
+            if update is not None and (update.stable or update.tentative):
+                await websocket.send_json(_update_message(update))
+            await websocket.send_json({"type": "final", "text": " ".join(session.transcript)})
+            await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        except InferenceQueueFullError as e:
+            # The close code for 503: the server is overloaded, try again later
+            await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+            await websocket.close(code=1013)
+        except Exception as e:
+            # Same codes as the HTTP endpoints, as close codes: bad request vs server error
+            await websocket.send_json({"type": "error", "detail": str(e)})
+            await websocket.close(code=1008 if isinstance(e, UnknownModelError) else 1011)
+        finally:
+            decoder.cancel()
+
+    return router
@@ -1,9 +1,28 @@
+import asyncio
+import json
+import time
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, Optional, Union
 from fastapi import APIRouter, UploadFile, HTTPException, File, Depends
-from app.services.transcription_service import TranscriptionService
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from app.services import metrics
+from app.services.batch import BatchItemResult, BatchTranscriber
+from app.services.export import MEDIA_TYPES, render_export
+from app.services.language import LanguageDetectionUnsupportedError
+from app.services.transcription_service import TranscriptionProgress, TranscriptionService
+from app.services.inference_pool import InferenceQueueFullError
+from app.services.model_registry import UnknownModelError
+from app.services.audio import AudioDecodeError, UploadTooLargeError
 from app.models.transcription import (
-    TranscriptionOptions, 
+    BatchTranscriptionRequest,
+    ExportFormat,
+    LanguageDetectionRequest,
+    LanguageDetectionResponse,
+    TranscriptionOptions,
     TranscriptionResponse,
     YoutubeTranscriptionRequest,
+    build_transcription_response,
 )
 
 ALLOWED_AUDIO_TYPES = {
@@ -14,8 +33,132 @@ ALLOWED_AUDIO_TYPES = {
     'audio/x-m4a',
 }
 
-def create_router(transcription_service: TranscriptionService) -> APIRouter:
+def _http_error(e: Exception, detail_prefix: str = "") -> HTTPException:
+    """Map an exception raised by a TranscriptionService to an HTTP error"""
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, InferenceQueueFullError):
+        return HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    if isinstance(e, (UnknownModelError, LanguageDetectionUnsupportedError)):
+        return HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, UploadTooLargeError):
+        return HTTPException(status_code=413, detail=str(e))
+    if isinstance(e, AudioDecodeError) and not detail_prefix:
+        return HTTPException(status_code=400, detail=str(e))
+    return HTTPException(status_code=500, detail=f"{detail_prefix}{str(e)}")
+
+# Keep proxies from buffering the stream, which would defeat early chunks
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+# Reported when a streaming client disconnects before the result (nginx's convention)
+CLIENT_CLOSED_STATUS = 499
+
+@contextmanager
+def _timed_request(endpoint: str) -> Iterator[None]:
+    """Record a request's latency under the status it ends with"""
+    start = time.perf_counter()
+    status = 200
+    try:
+        yield
+    except HTTPException as e:
+        status = e.status_code
+        raise
+    except (GeneratorExit, asyncio.CancelledError):
+        status = CLIENT_CLOSED_STATUS
+        raise
+    except BaseException:
+        status = 500
+        raise
+    finally:
+        metrics.REQUEST_SECONDS.labels(endpoint, str(status)).observe(time.perf_counter() - start)
+
+def json_response(model: BaseModel) -> Response:
+    """Serialize a response model in one pass of pydantic-core, skipping FastAPI's revalidation.
+
+    Long transcripts with word timings hold tens of thousands of objects, which the
+    default response path validates and converts twice.
+    """
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+def export_response(response: TranscriptionResponse, export_format: ExportFormat) -> Response:
+    return Response(
+        content=render_export(response, export_format),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transcript.{export_format.value}"'},
+    )
+
+def _with_segments(options: TranscriptionOptions) -> TranscriptionOptions:
+    """Exports are built from segments, so they are always transcribed with timestamps"""
+    return options.model_copy(update={"return_timestamps": True})
+
+def _check_audio_type(file: UploadFile) -> None:
+    if not file.content_type in ALLOWED_AUDIO_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File must be an audio file. Supported types: {', '.join(ALLOWED_AUDIO_TYPES)}"
+        )
+
+def _batch_line(item: BatchItemResult) -> str:
+    line = {"index": item.index, "url": item.url, "video_id": item.video_id}
+    if item.error is None:
+        line.update(status="completed", result=build_transcription_response(item.result).model_dump())
+    else:
+        error = _http_error(item.error, "Failed to transcribe YouTube video: ")
+        line.update(status="failed", status_code=error.status_code, error=error.detail)
+    return json.dumps(line) + "\n"
+
+def create_router(transcription_service: TranscriptionService, batch_concurrency: int = 2) -> APIRouter:
     router = APIRouter()
+    batch_transcriber = BatchTranscriber(transcription_service, concurrency=batch_concurrency)
+
+    async def stream_transcription(
+        source: Union[UploadFile, str],
+        options: TranscriptionOptions,
+        endpoint: str,
+        is_youtube: bool = False,
+        detail_prefix: str = ""
+    ) -> AsyncIterator[str]:
+        """Yield server-sent events: one 'chunk' per decoded chunk, then 'result' or 'error'"""
+        events: asyncio.Queue = asyncio.Queue()
+        start = time.perf_counter()
+        status = CLIENT_CLOSED_STATUS
+
+        def on_progress(progress: TranscriptionProgress) -> None:
+            if progress.chunk is not None:
+                events.put_nowait(("chunk", {
+                    **progress.chunk,
+                    "chunks_done": progress.chunks_done,
+                    "chunks_total": progress.chunks_total,
+                }))
+
+        async def run() -> None:
+            try:
+                result = await transcription_service.transcribe(source, options, is_youtube, on_progress)
+                response = build_transcription_response(result)
+                events.put_nowait(("result", response.model_dump()))
+            except Exception as e:
+                error = _http_error(e, detail_prefix)
+                events.put_nowait(("error", {"status_code": error.status_code, "detail": error.detail}))
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event, data = await events.get()
+                yield _sse_event(event, data)
+                if event in ("result", "error"):
+                    status = data["status_code"] if event == "error" else 200
+                    break
+        finally:
+            # The client went away: stop transcribing for it
+            task.cancel()
+            metrics.REQUEST_SECONDS.labels(endpoint, str(status)).observe(time.perf_counter() - start)
 
     @router.post("/transcribe", response_model=TranscriptionResponse)
     async def transcribe_audio(
@@ -25,64 +168,148 @@ def create_router(transcription_service: TranscriptionService) -> APIRouter:
         """
         Transcribe an audio file to text in its original language.
         """
-        if not file.content_type in ALLOWED_AUDIO_TYPES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File must be an audio file. Supported types: {', '.join(ALLOWED_AUDIO_TYPES)}"
-            )
-        
-        try:
-            result = await transcription_service.transcribe(file, options)
-            
-            # Handle different response formats
-            if isinstance(result, str):
-                return TranscriptionResponse(text=result)
-            elif isinstance(result, dict):
-                if "text" not in result:
-                    result = {"text": " ".join(chunk["text"] for chunk in result)}
-                return TranscriptionResponse(**result)
-            elif isinstance(result, list):
-                text = " ".join(chunk["text"] for chunk in result)
-                return TranscriptionResponse(text=text, segments=result)
-            
-            raise HTTPException(
-                status_code=500, 
-                detail="Unexpected response format from transcription service"
-            )
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=str(e))
+        with _timed_request("transcribe"):
+            _check_audio_type(file)
+            try:
+                result = await transcription_service.transcribe(file, options)
+                return json_response(build_transcription_response(result))
+            except Exception as e:
+                raise _http_error(e)
+
+    @router.post("/transcribe/export/{export_format}")
+    async def export_audio(
+        export_format: ExportFormat,
+        file: UploadFile = File(...),
+        options: TranscriptionOptions = Depends()
+    ):
+        """
+        Transcribe an audio file to SRT or WebVTT subtitles, or to JSON with segments and
+        words as column arrays.
+        """
+        with _timed_request("transcribe_export"):
+            _check_audio_type(file)
+            try:
+                result = await transcription_service.transcribe(file, _with_segments(options))
+                return export_response(build_transcription_response(result), export_format)
+            except Exception as e:
+                raise _http_error(e)
+
+    @router.post("/detect-language", response_model=LanguageDetectionResponse)
+    async def detect_language(
+        file: UploadFile = File(...),
+        model: Optional[str] = None
+    ):
+        """
+        Identify the spoken language from the first 30 seconds of an audio file, without
+        transcribing it.
+        """
+        with _timed_request("detect_language"):
+            _check_audio_type(file)
+            try:
+                return LanguageDetectionResponse(**await transcription_service.detect_language(file, model))
+            except Exception as e:
+                raise _http_error(e)
+
+    @router.post("/detect-language/youtube", response_model=LanguageDetectionResponse)
+    async def detect_youtube_language(request: LanguageDetectionRequest):
+        """
+        Identify the spoken language of a YouTube video; only its first 30 seconds are downloaded.
+        """
+        with _timed_request("detect_language_youtube"):
+            try:
+                return LanguageDetectionResponse(**await transcription_service.detect_language(
+                    str(request.url), request.model, is_youtube=True
+                ))
+            except Exception as e:
+                raise _http_error(e, "Failed to detect the language of YouTube video: ")
+
+    @router.post("/transcribe/stream")
+    async def transcribe_audio_stream(
+        file: UploadFile = File(...),
+        options: TranscriptionOptions = Depends()
+    ):
+        """
+        Transcribe an audio file, streaming each chunk as server-sent events as soon as
+        it is decoded, followed by the final merged transcription.
+        """
+        _check_audio_type(file)
+        return StreamingResponse(
+            stream_transcription(file, options, "transcribe_stream"),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
 
     @router.post("/transcribe/youtube", response_model=TranscriptionResponse)
     async def transcribe_youtube(request: YoutubeTranscriptionRequest):
         """
         Transcribe audio from a YouTube video URL.
         """
-        try:
-            result = await transcription_service.transcribe(
+        with _timed_request("transcribe_youtube"):
+            try:
+                result = await transcription_service.transcribe(
+                    str(request.url),
+                    request.options or TranscriptionOptions(),
+                    is_youtube=True
+                )
+                return json_response(build_transcription_response(result))
+            except Exception as e:
+                raise _http_error(e, "Failed to transcribe YouTube video: ")
+
+    @router.post("/transcribe/youtube/export/{export_format}")
+    async def export_youtube(export_format: ExportFormat, request: YoutubeTranscriptionRequest):
+        """
+        Transcribe a YouTube video to SRT or WebVTT subtitles, or to JSON with segments and
+        words as column arrays.
+        """
+        with _timed_request("transcribe_youtube_export"):
+            try:
+                result = await transcription_service.transcribe(
+                    str(request.url),
+                    _with_segments(request.options or TranscriptionOptions()),
+                    is_youtube=True
+                )
+                return export_response(build_transcription_response(result), export_format)
+            except Exception as e:
+                raise _http_error(e, "Failed to transcribe YouTube video: ")
+
+    @router.post("/transcribe/youtube/stream")
+    async def transcribe_youtube_stream(request: YoutubeTranscriptionRequest):
+        """
+        Transcribe audio from a YouTube video URL, streaming each chunk as server-sent
+        events as soon as it is decoded, followed by the final merged transcription.
+        """
+        return StreamingResponse(
+            stream_transcription(
                 str(request.url),
                 request.options or TranscriptionOptions(),
-                is_youtube=True
-            )
-            
-            # Handle different response formats
-            if isinstance(result, str):
-                return TranscriptionResponse(text=result)
-            elif isinstance(result, dict):
-                if "text" not in result:
-                    result = {"text": " ".join(chunk["text"] for chunk in result)}
-                return TranscriptionResponse(**result)
-            elif isinstance(result, list):
-                text = " ".join(chunk["text"] for chunk in result)
-                return TranscriptionResponse(text=text, segments=result)
-            
-            raise HTTPException(
-                status_code=500, 
-                detail="Unexpected response format from transcription service"
-            )
-        except Exception as e:
-            raise HTTPException(
-                status_code=500, 
-                detail=f"Failed to transcribe YouTube video: {str(e)}"
-            )
-
-    return router
\ No newline at end of file
+                "transcribe_youtube_stream",
+                is_youtube=True,
+                detail_prefix="Failed to transcribe YouTube video: "
+            ),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
+        )
+
+    @router.post("/transcribe/batch")
+    async def transcribe_batch(request: BatchTranscriptionRequest):
+        """
+        Transcribe many YouTube videos or playlists, streaming one JSON line per video
+        (newline-delimited JSON) as each finishes. A failed video is reported on its own
+        line and does not stop the others.
+        """
+        async def lines() -> AsyncIterator[str]:
+            with _timed_request("transcribe_batch"):
+                try:
+                    async for item in batch_transcriber.run(
+                        [str(url) for url in request.urls],
+                        request.options or TranscriptionOptions()
+                    ):
+                        yield _batch_line(item)
+                except Exception as e:
+                    # Expanding a playlist failed before any video was transcribed
+                    error = _http_error(e, "Failed to expand playlist: ")
+                    yield json.dumps({"status": "failed", "status_code": error.status_code, "error": error.detail}) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson", headers=SSE_HEADERS)
+
+    return router
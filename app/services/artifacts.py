@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional
+import numpy as np
+from app.services.youtube import VIDEO_ID_PATTERN
+
+@dataclass
+class ArtifactStoreStats:
+    hits: int = 0
+    misses: int = 0
+    evicted: int = 0
+
+@dataclass
+class AudioArtifact:
+    # Decoded 16 kHz mono float32 samples, memory-mapped read-only
+    audio: np.ndarray
+    # Title and duration of the source, so a hit needs no lookup
+    meta: Dict
+
+class ArtifactWriter:
+    """Streams decoded blocks into a temporary file that becomes visible only on commit"""
+
+    def __init__(self, store: "AudioArtifactStore", key: str, meta: Dict):
+        self.store = store
+        self.key = key
+        self.meta = meta
+        os.makedirs(store.directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=store.directory, suffix=".tmp", delete=False)
+        self._samples = 0
+
+    def write(self, block: np.ndarray) -> None:
+        self._file.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+        self._samples += len(block)
+
+    def commit(self) -> None:
+        self._file.close()
+        self.store._publish(self.key, self._file.name, {**self.meta, "samples": self._samples})
+
+    def abort(self) -> None:
+        self._file.close()
+        try:
+            os.remove(self._file.name)
+        except FileNotFoundError:
+            pass
+
+class AudioArtifactStore:
+    """Decoded audio of YouTube videos on disk, keyed by video ID, in LRU order up to max_bytes.
+
+    Each entry is a raw float32 file plus a JSON metadata file. Both are written under
+    temporary names and renamed into place, so readers in any process never see a
+    partial entry. Hits are memory-mapped rather than read. lock(key) serializes
+    requests for one video, so a second request waits for the first download instead
+    of starting its own.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = ArtifactStoreStats()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size_bytes = 0
+        self._mutex = threading.Lock()
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        if os.path.isdir(directory):
+            self._scan()
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        # Keys become file names, so nothing but a video ID may reach the filesystem
+        if not VIDEO_ID_PATTERN.match(key):
+            raise ValueError(f"Invalid artifact key {key!r}")
+        directory = os.path.realpath(self.directory)
+        base = os.path.realpath(os.path.join(directory, key))
+        if os.path.dirname(base) != directory:
+            raise ValueError(f"Invalid artifact key {key!r}")
+        return f"{base}.f32", f"{base}.json"
+
+    def _scan(self) -> None:
+        """Index entries left by earlier runs, least recently used first"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Left behind by a download that was interrupted
+                os.remove(path)
+            elif name.endswith(".json") and VIDEO_ID_PATTERN.match(name[:-len(".json")]):
+                data_path = path[:-len(".json")] + ".f32"
+                if os.path.exists(data_path):
+                    entries.append((os.path.getmtime(data_path), name[:-len(".json")], os.path.getsize(data_path)))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size_bytes += size
+
+    def lock(self, key: str) -> asyncio.Lock:
+        """The lock for one key; it lives as long as someone holds or waits on it"""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        return lock
+
+    def get(self, key: str) -> Optional[AudioArtifact]:
+        data_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            audio = np.memmap(data_path, dtype=np.float32, mode="r") if meta["samples"] else np.zeros(0, np.float32)
+        except (FileNotFoundError, ValueError, KeyError):
+            # Missing, or evicted by another process between the two reads
+            with self._mutex:
+                self.stats.misses += 1
+            return None
+        # Marks the entry as recently used for processes that rescan the directory
+        os.utime(data_path)
+        with self._mutex:
+            self.stats.hits += 1
+            if key not in self._entries:
+                # Written by another process sharing the directory
+                self._size_bytes += audio.nbytes
+            self._entries[key] = audio.nbytes
+            self._entries.move_to_end(key)
+        return AudioArtifact(audio, meta)
+
+    def writer(self, key: str, meta: Dict) -> ArtifactWriter:
+        self._paths(key)
+        return ArtifactWriter(self, key, meta)
+
+    def _publish(self, key: str, temp_path: str, meta: Dict) -> None:
+        data_path, meta_path = self._paths(key)
+        size = os.path.getsize(temp_path)
+        if size > self.max_bytes:
+            os.remove(temp_path)
+            return
+        with tempfile.NamedTemporaryFile("w", dir=self.directory, suffix=".tmp", delete=False) as f:
+            json.dump(meta, f)
+        # Data first: an entry exists once its metadata does
+        os.replace(temp_path, data_path)
+        os.replace(f.name, meta_path)
+        with self._mutex:
+            self._size_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            expired = []
+            while self._size_bytes > self.max_bytes:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._size_bytes -= old_size
+                self.stats.evicted += 1
+                expired.append(old_key)
+        for old_key in expired:
+            # Metadata first, so the entry disappears before its data does; readers that
+            # already mapped the data keep it until they are done
+            for path in reversed(self._paths(old_key)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
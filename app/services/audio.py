@@ -0,0 +1,232 @@
+import contextlib
+import io
+import re
+import shutil
+import subprocess
+import tempfile
+from typing import BinaryIO, Dict, Iterator, Optional
+import numpy as np
+from fastapi import UploadFile
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Whisper feature extractors expect 16 kHz mono audio
+SAMPLING_RATE = 16000
+
+# Sources with a scheme, which ffmpeg opens through a protocol rather than as a local path
+URL_PATTERN = re.compile(r"^[A-Za-z][A-Za-z0-9+.-]*:")
+# Protocols ffmpeg may use to read a media URL
+URL_PROTOCOLS = "https,http,tls,tcp"
+
+class AudioDecodeError(ValueError):
+    """Raised when ffmpeg cannot decode the given audio"""
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Upload exceeds the maximum size of {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+class UploadSizeLimitMiddleware:
+    """Rejects requests whose Content-Length exceeds max_bytes before their body is read.
+
+    Starlette parses a multipart body into its own temporary file before the endpoint
+    runs, so checking the size there would come after the whole upload hit the disk.
+    Bodies sent without a Content-Length are checked once parsed.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            length = dict(scope["headers"]).get(b"content-length", b"")
+            if length.isdigit() and int(length) > self.max_bytes:
+                response = JSONResponse({"detail": str(UploadTooLargeError(self.max_bytes))}, status_code=413)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+async def spool_upload(
+    upload: UploadFile,
+    dest: BinaryIO,
+    max_bytes: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> int:
+    """Copy an upload to dest in fixed-size chunks, enforcing max_bytes as it goes.
+
+    Only one chunk is held in memory at a time. Returns the number of bytes written.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLargeError(max_bytes)
+
+    written = 0
+    while chunk := await upload.read(chunk_size):
+        written += len(chunk)
+        if written > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+        dest.write(chunk)
+    dest.flush()
+    return written
+
+def ffmpeg_decode_command(
+    source: str,
+    sampling_rate: int = SAMPLING_RATE,
+    headers: Optional[Dict[str, str]] = None,
+    max_duration_s: Optional[float] = None
+) -> list[str]:
+    """ffmpeg arguments that decode source to raw mono float32 PCM on stdout, optionally only its start"""
+    input_options = []
+    if URL_PATTERN.match(source):
+        # URLs come from an extractor; never let one reach file:, concat: and the like
+        input_options += ["-protocol_whitelist", URL_PROTOCOLS]
+    if source.startswith(("http://", "https://")):
+        # Resume dropped connections instead of silently truncating the audio
+        input_options += ["-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "5"]
+        if headers:
+            input_options += ["-headers", "".join(f"{name}: {value}\r\n" for name, value in headers.items())]
+    return [
+        "ffmpeg", "-nostdin", "-hide_banner", "-loglevel", "error",
+        *input_options,
+        "-i", source,
+        "-vn", "-ac", "1", "-ar", str(sampling_rate),
+        *(["-t", str(max_duration_s)] if max_duration_s else []),
+        "-f", "f32le", "pipe:1",
+    ]
+
+def decode_audio(
+    source: str,
+    sampling_rate: int = SAMPLING_RATE,
+    headers: Optional[Dict[str, str]] = None,
+    max_duration_s: Optional[float] = None,
+    stdin: Optional[BinaryIO] = None
+) -> np.ndarray:
+    """Decode any ffmpeg-readable file or URL to a mono float32 array at sampling_rate.
+
+    The samples are piped straight from ffmpeg into the array, with no intermediate
+    file or re-encode. The returned array is read-only; slice it rather than copy it.
+    """
+    try:
+        process = subprocess.run(
+            ffmpeg_decode_command(source, sampling_rate, headers, max_duration_s),
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=False,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; it is required to decode audio")
+
+    if process.returncode != 0:
+        message = process.stderr.decode(errors="replace").strip().splitlines()
+        raise AudioDecodeError(f"Could not decode audio: {message[-1] if message else 'unknown error'}")
+
+    audio = np.frombuffer(process.stdout, dtype=np.float32)
+    if audio.size == 0:
+        raise AudioDecodeError("Could not decode audio: no audio samples found")
+    return audio
+
+@contextlib.contextmanager
+def _readable_by_ffmpeg(file: BinaryIO) -> Iterator[BinaryIO]:
+    """file rewound to its start, or a copy of it on disk when it has no descriptor"""
+    try:
+        file.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        # Only in memory: ffmpeg needs a descriptor, so the bytes are written out once
+        with tempfile.TemporaryFile() as spooled:
+            file.seek(0)
+            shutil.copyfileobj(file, spooled)
+            spooled.seek(0)
+            yield spooled
+        return
+    file.seek(0)
+    yield file
+
+def decode_audio_file(
+    file: BinaryIO,
+    sampling_rate: int = SAMPLING_RATE,
+    max_duration_s: Optional[float] = None
+) -> np.ndarray:
+    """decode_audio for an open file, which ffmpeg reads in place rather than from a copy.
+
+    The file becomes ffmpeg's stdin and is opened as /dev/stdin, which reopens it and so
+    keeps it seekable (some containers keep their index at the end).
+    """
+    with _readable_by_ffmpeg(file) as readable:
+        return decode_audio("/dev/stdin", sampling_rate, max_duration_s=max_duration_s, stdin=readable)
+
+def stream_decode_audio(
+    source: str,
+    headers: Optional[Dict[str, str]] = None,
+    block_samples: int = SAMPLING_RATE,
+    sampling_rate: int = SAMPLING_RATE,
+    stdin: Optional[BinaryIO] = None
+) -> Iterator[np.ndarray]:
+    """Decode a file or URL like decode_audio, yielding float32 blocks as ffmpeg produces them.
+
+    For URLs, ffmpeg downloads and decodes at the same time, so the first blocks are
+    available long before the download finishes. Closing the generator stops ffmpeg.
+    """
+    try:
+        process = subprocess.Popen(
+            ffmpeg_decode_command(source, sampling_rate, headers),
+            stdin=stdin,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise RuntimeError("ffmpeg was not found; it is required to decode audio")
+
+    block_bytes = block_samples * 4
+    produced = 0
+    try:
+        while data := process.stdout.read(block_bytes):
+            # A read can end mid-sample only at the end of the stream
+            block = np.frombuffer(data[:len(data) - len(data) % 4], dtype=np.float32)
+            produced += block.size
+            yield block
+        returncode = process.wait()
+        if returncode != 0:
+            message = process.stderr.read().decode(errors="replace").strip().splitlines()
+            raise AudioDecodeError(f"Could not decode audio: {message[-1] if message else 'unknown error'}")
+        if produced == 0:
+            raise AudioDecodeError("Could not decode audio: no audio samples found")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+        process.stderr.close()
+
+def stream_decode_audio_file(
+    file: BinaryIO,
+    block_samples: int = SAMPLING_RATE,
+    sampling_rate: int = SAMPLING_RATE
+) -> Iterator[np.ndarray]:
+    """stream_decode_audio for an open file, read in place like decode_audio_file"""
+    with _readable_by_ffmpeg(file) as readable:
+        yield from stream_decode_audio(
+            "/dev/stdin", block_samples=block_samples, sampling_rate=sampling_rate, stdin=readable
+        )
+
+def pcm_to_float32(data: bytes, encoding: str = "pcm_s16le") -> np.ndarray:
+    """Convert raw little-endian PCM bytes (16-bit int or 32-bit float) to float32 samples"""
+    dtype = np.dtype("<i2") if encoding == "pcm_s16le" else np.dtype("<f4")
+    usable = len(data) - len(data) % dtype.itemsize
+    samples = np.frombuffer(data[:usable], dtype=dtype)
+    if dtype.kind == "i":
+        return samples.astype(np.float32) / 32768.0
+    return samples.astype(np.float32)
+
+def resample(audio: np.ndarray, from_rate: int, to_rate: int = SAMPLING_RATE) -> np.ndarray:
+    """Linear-interpolation resampling; adequate for speech from live microphones"""
+    if from_rate == to_rate or len(audio) == 0:
+        return audio
+    duration = len(audio) / from_rate
+    target = np.arange(int(duration * to_rate)) / to_rate
+    source = np.arange(len(audio)) / from_rate
+    return np.interp(target, source, audio).astype(np.float32)
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, List, Optional
+from app.models.transcription import TranscriptionOptions
+from app.services.inference_pool import retry_when_full
+from app.services.transcription_service import TranscriptionService
+from app.services.youtube import expand_playlist, is_playlist_url, youtube_video_id
+
+@dataclass
+class BatchItemResult:
+    # Position of the video in the expanded, deduplicated list
+    index: int
+    url: str
+    video_id: Optional[str]
+    result: Optional[dict] = None
+    error: Optional[Exception] = None
+
+def dedupe_urls(urls: Iterable[str]) -> List[str]:
+    """Drop repeated videos, comparing by video ID so different URL forms of one video match"""
+    seen = set()
+    unique = []
+    for url in urls:
+        key = youtube_video_id(url) or url
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique
+
+class BatchTranscriber:
+    """Transcribes many YouTube videos through one service, and so one set of loaded models.
+
+    Playlists are expanded and videos deduplicated first. A bounded queue feeds at most
+    concurrency transcriptions at a time, and results are yielded as each one finishes,
+    so callers can write them out incrementally.
+    """
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        concurrency: int = 2,
+        playlist_expander: Callable[[str], List[str]] = expand_playlist,
+    ):
+        self.service = service
+        self.concurrency = concurrency
+        self.playlist_expander = playlist_expander
+
+    async def expand(self, urls: Iterable[str]) -> List[str]:
+        """Replace playlist URLs with their videos' URLs, then deduplicate"""
+        expanded = []
+        for url in urls:
+            if is_playlist_url(url):
+                expanded += await asyncio.to_thread(self.playlist_expander, url)
+            else:
+                expanded.append(url)
+        return dedupe_urls(expanded)
+
+    async def run(self, urls: Iterable[str], options: TranscriptionOptions) -> AsyncIterator[BatchItemResult]:
+        """Transcribe every video, yielding each result (or failure) as soon as it is ready"""
+        videos = await self.expand(urls)
+        work: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def feed() -> None:
+            for index, url in enumerate(videos):
+                await work.put((index, url))
+            for _ in range(self.concurrency):
+                await work.put(None)
+
+        async def worker() -> None:
+            while (item := await work.get()) is not None:
+                index, url = item
+                outcome = BatchItemResult(index, url, youtube_video_id(url))
+                try:
+                    # No client is waiting on a single item, so wait for capacity instead of failing
+                    outcome.result = await retry_when_full(
+                        lambda: self.service.transcribe(url, options, is_youtube=True)
+                    )
+                except Exception as e:
+                    outcome.error = e
+                results.put_nowait(outcome)
+
+        tasks = [asyncio.create_task(feed())]
+        tasks += [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        try:
+            for _ in videos:
+                yield await results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Tuple
+
+BatchRunner = Callable[[Hashable, List[Any]], Awaitable[List[Any]]]
+
+class MicroBatcher:
+    """Collects inputs from concurrent requests and runs them through the model together.
+
+    Inputs are grouped by a key (inputs with different decoding options cannot share
+    a forward pass). A group is dispatched once it holds ``max_batch_size`` inputs or
+    its oldest input has waited ``max_wait_ms``, whichever comes first. Each caller
+    gets back the output for its own input.
+    """
+
+    def __init__(self, run_batch: BatchRunner, max_batch_size: int = 16, max_wait_ms: int = 20):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def pending(self) -> int:
+        """Number of inputs waiting for their batch to be dispatched"""
+        return sum(len(group) for group in self._pending.values())
+
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        """Queue an input for the next batch with the same key and wait for its output"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = self._pending.setdefault(key, [])
+        group.append((item, future))
+
+        if len(group) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.max_wait_s, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = [(item, future) for item, future in self._pending.pop(key, []) if not future.done()]
+        if not batch:
+            return
+        task = asyncio.ensure_future(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key: Hashable, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            results = await self.run_batch(key, [item for item, _ in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                _set_exception(batch[0][1], e)
+                return
+            # Rerun inputs one at a time so a single bad input only fails its own request
+            for item, future in batch:
+                try:
+                    _set_result(future, (await self.run_batch(key, [item]))[0])
+                except Exception as item_error:
+                    _set_exception(future, item_error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            _set_result(future, result)
+
+def _set_result(future: asyncio.Future, result: Any) -> None:
+    if not future.done():
+        future.set_result(result)
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
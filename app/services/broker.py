@@ -0,0 +1,238 @@
+"""Local inference broker: one process holds the models, HTTP workers send it work.
+
+Running uvicorn with --workers N would otherwise load a private copy of every model
+in each worker. Start the broker once, point every worker at it with
+TRANSCRIBER_INFERENCE_BROKER, and model memory no longer grows with the worker count:
+
+    TRANSCRIBER_INFERENCE_BROKER=/tmp/transcriber.sock python -m app.services.broker
+    TRANSCRIBER_INFERENCE_BROKER=/tmp/transcriber.sock uvicorn app.main:app --workers 4
+"""
+import os
+import queue
+import socket
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional, Tuple, Union
+from app.config import Settings
+from app.services.language import LanguageDetectionUnsupportedError, detect_loaded_language
+from app.services.model_registry import LoadedModel, ModelRegistry
+
+Address = Union[str, Tuple[str, int]]
+
+class BrokerError(RuntimeError):
+    """Raised when a call failed inside the broker"""
+
+def parse_address(address: str) -> Address:
+    """'host:port' (or ':port' for localhost) is a TCP address, anything else a Unix socket path"""
+    host, separator, port = address.rpartition(":")
+    if separator and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+def broker_authkey(settings: Settings) -> Optional[bytes]:
+    return settings.inference_broker_authkey.encode() or None
+
+def _require_authkey(address: Address, authkey: Optional[bytes]) -> None:
+    # Requests are unpickled, so an unauthenticated TCP peer could run arbitrary code
+    if isinstance(address, tuple) and not authkey:
+        raise ValueError("A TCP inference broker needs a secret; set TRANSCRIBER_INFERENCE_BROKER_AUTHKEY")
+
+class InferenceBroker:
+    """Serves one ModelRegistry to any number of client processes over a local socket.
+
+    Every connection is handled on its own thread and at most max_concurrency model calls
+    run at once. Requests are pickled, so clients must present the authkey; it is required
+    on TCP. A Unix socket is only accessible to the broker's own user.
+    """
+
+    def __init__(
+        self,
+        registry: ModelRegistry,
+        address: str,
+        authkey: Optional[bytes],
+        max_concurrency: int = 1
+    ):
+        self.registry = registry
+        parsed = parse_address(address)
+        _require_authkey(parsed, authkey)
+        if isinstance(parsed, str):
+            if os.path.exists(parsed):
+                # Left behind by a broker that did not shut down cleanly
+                os.unlink(parsed)
+            # Created with mode 0600 rather than chmod-ed afterwards, which would leave a window
+            umask = os.umask(0o177)
+            try:
+                self.listener = Listener(parsed, authkey=authkey)
+            finally:
+                os.umask(umask)
+        else:
+            self.listener = Listener(parsed, authkey=authkey)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._closed = threading.Event()
+        self._connections: set[Connection] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def address(self) -> Address:
+        return self.listener.address
+
+    def serve_forever(self) -> None:
+        while not self._closed.is_set():
+            try:
+                connection = self.listener.accept()
+            except AuthenticationError:
+                continue
+            except OSError:
+                if self._closed.is_set():
+                    return
+                raise
+            with self._lock:
+                self._connections.add(connection)
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        try:
+            while True:
+                request = connection.recv()
+                connection.send(self._handle(*request))
+        except (EOFError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._connections.discard(connection)
+            connection.close()
+
+    def _handle(self, operation: str, model_id: str, *args: Any) -> Tuple[str, Any]:
+        try:
+            if operation == "load":
+                return ("ok", self.registry.get(model_id).size_bytes)
+            if operation == "transcribe":
+                inputs, kwargs = args
+                with self._slots:
+                    return ("ok", list(self.registry.get(model_id).transcriber(inputs, **kwargs)))
+            if operation == "detect_language":
+                (audio,) = args
+                with self._slots:
+                    return ("ok", detect_loaded_language(self.registry.get(model_id), audio))
+            raise ValueError(f"Unknown broker operation '{operation}'")
+        except LanguageDetectionUnsupportedError as e:
+            # Callers fall back to detection during decoding, so this one keeps its type
+            return ("unsupported", str(e))
+        except Exception as e:
+            return ("error", f"{type(e).__name__}: {e}")
+
+    def close(self) -> None:
+        """Stop accepting connections and drop the open ones"""
+        self._closed.set()
+        self.listener.close()
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for connection in connections:
+            # Shutting the socket down wakes its thread, blocked in recv, with EOFError;
+            # closing it from here instead would pull the handle out from under that thread
+            sock = socket.socket(fileno=connection.fileno())
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            finally:
+                sock.detach()
+
+class RemoteEngine:
+    """Runs models in an InferenceBroker process; used as the ModelRegistry's loader.
+
+    Loading a model loads it in the broker and returns a LoadedModel whose transcriber
+    forwards each batch there. Connections are pooled, one per concurrent call.
+    """
+
+    def __init__(self, address: str, authkey: Optional[bytes], connect_timeout_s: float = 60.0):
+        self.address = parse_address(address)
+        _require_authkey(self.address, authkey)
+        self.authkey = authkey
+        self.connect_timeout_s = connect_timeout_s
+        self._idle: "queue.LifoQueue[Connection]" = queue.LifoQueue()
+
+    def _connect(self) -> Connection:
+        # The broker may still be starting when the HTTP workers come up
+        deadline = time.monotonic() + self.connect_timeout_s
+        while True:
+            try:
+                return Client(self.address, authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def _call(self, *request: Any) -> Any:
+        for attempt in range(2):
+            try:
+                connection, pooled = self._idle.get_nowait(), True
+            except queue.Empty:
+                connection, pooled = self._connect(), False
+            try:
+                connection.send(request)
+                status, value = connection.recv()
+            except (EOFError, OSError):
+                connection.close()
+                # A pooled connection may predate a broker restart; retry once on a new one
+                if pooled and attempt == 0:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            self._idle.put(connection)
+            if status == "unsupported":
+                raise LanguageDetectionUnsupportedError(value)
+            if status == "error":
+                raise BrokerError(value)
+            return value
+
+    def load(self, model_id: str) -> LoadedModel:
+        """Load a model in the broker and return a proxy that runs it there"""
+        self._call("load", model_id)
+
+        def transcriber(inputs: List[Dict], **kwargs: Any) -> List:
+            return self._call("transcribe", model_id, inputs, kwargs)
+
+        def language_detector(audio: Any) -> Dict:
+            return self._call("detect_language", model_id, audio)
+
+        # The weights live in the broker, not in this process
+        return LoadedModel(model_id, None, None, transcriber, 0, engine="remote", language_detector=language_detector)
+
+    def shutdown(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+def main() -> None:
+    from app.services.transcription_service import WhisperTranscriptionService
+
+    settings = Settings.from_env()
+    if not settings.inference_broker:
+        raise SystemExit("Set TRANSCRIBER_INFERENCE_BROKER to the socket path or host:port to listen on")
+    # The broker's own service builds the registry exactly as a standalone server would
+    # (engine, assistant model, encoder cache, worker processes)
+    service = WhisperTranscriptionService(settings.model_copy(update={"inference_broker": ""}))
+    broker = InferenceBroker(
+        service.registry,
+        settings.inference_broker,
+        broker_authkey(settings),
+        max_concurrency=settings.inference_workers,
+    )
+    if settings.warm_up:
+        service.registry.warm_up([m.strip() for m in settings.warm_up_models.split(",") if m.strip()])
+    print(f"Inference broker listening on {settings.inference_broker}", flush=True)
+    try:
+        broker.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        broker.close()
+        if service.process_pool is not None:
+            service.process_pool.shutdown()
+
+if __name__ == "__main__":
+    main()
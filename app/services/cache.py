@@ -0,0 +1,236 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Union
+from fastapi import UploadFile
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services.single_flight import SingleFlight
+from app.services.transcription_service import (
+    ProgressCallback,
+    TranscriptionProgress,
+    TranscriptionService,
+)
+from app.services.youtube import youtube_video_id
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def _dumps(value: Any) -> str:
+    # Pipeline outputs can contain NumPy scalars
+    return json.dumps(value, default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value under key"""
+        pass
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache holding at most max_entries results"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            payload = self._entries[key]
+        # Stored serialized so callers can never mutate a cached result
+        return json.loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        payload = _dumps(value)
+        with self._lock:
+            self._entries[key] = payload
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache in a SQLite file, evicting least recently used results beyond max_bytes"""
+
+    def __init__(self, path: str, max_bytes: int = 1024**3):
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        payload = _dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time())
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY accessed ASC").fetchall()
+        expired = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            expired.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", expired)
+
+def _without_debug(result: Union[str, Dict, List]) -> Union[str, Dict, List]:
+    # Timings describe one request, not the transcription, so they are neither cached nor shared
+    return {k: v for k, v in result.items() if k != "debug"} if isinstance(result, dict) else result
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+async def hash_upload(upload: UploadFile, chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """SHA-256 of an upload's content, read in chunks; the upload is rewound afterwards"""
+    digest = hashlib.sha256()
+    await upload.seek(0)
+    while chunk := await upload.read(chunk_size):
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
+
+class CachingTranscriptionService(TranscriptionService):
+    """Serves repeated transcriptions from a cache keyed on audio content and options.
+
+    Uploads are keyed on the SHA-256 of their content and YouTube sources on their
+    video ID, together with the resolved model ID and the decoding options. Requests
+    with a key that is already being transcribed wait for that transcription instead
+    of starting their own; this works with or without a cache backend.
+    """
+
+    def __init__(
+        self,
+        inner: TranscriptionService,
+        backend: Optional[CacheBackend],
+        model_resolver: Callable[[Optional[str]], str] = lambda model: model or "default",
+        coalesce: bool = True,
+    ):
+        self.inner = inner
+        self.backend = backend
+        self.model_resolver = model_resolver
+        self.stats = CacheStats()
+        self.flights = SingleFlight() if coalesce else None
+
+    async def cache_key(
+        self,
+        source: Union[UploadFile, str],
+        options: TranscriptionOptions,
+        is_youtube: bool = False
+    ) -> str:
+        if is_youtube:
+            video_id = youtube_video_id(source)
+            source_key = f"youtube:{video_id}" if video_id else f"url:{source}"
+        else:
+            source_key = f"sha256:{await hash_upload(source)}"
+        key = {
+            "source": source_key,
+            "model": self.model_resolver(options.model),
+            "language": options.language,
+            "return_timestamps": options.return_timestamps,
+            "chunk_length_s": options.chunk_length_s,
+        }
+        # Only added when set, so existing entries stay valid
+        if options.vad:
+            key["vad"] = True
+        if options.word_timestamps:
+            key["word_timestamps"] = True
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    async def transcribe(
+        self,
+        source: Union[UploadFile, str],
+        options: TranscriptionOptions,
+        is_youtube: bool = False,
+        progress: Optional[ProgressCallback] = None
+    ) -> Union[str, Dict, List]:
+        key = await self.cache_key(source, options, is_youtube)
+        if self.backend is not None:
+            cached = await asyncio.to_thread(self.backend.get, key)
+            if cached is not None:
+                self.stats.hits += 1
+                if progress:
+                    progress(TranscriptionProgress(1, 1))
+                if options.debug and isinstance(cached, dict):
+                    cached["debug"] = {"cache_hit": True}
+                return cached
+            self.stats.misses += 1
+
+        async def compute(report: Optional[ProgressCallback]) -> Union[str, Dict, List]:
+            # Progress changes how windows are scheduled, so only streamed requests report it
+            result = await self.inner.transcribe(source, options, is_youtube, report if progress else None)
+            if self.backend is not None:
+                await asyncio.to_thread(self.backend.set, key, _without_debug(result))
+            return result
+
+        if self.flights is None:
+            return await compute(progress)
+        # Streamed and plain requests coalesce separately, so each gets the scheduling it asked for
+        result, started = await self.flights.run((key, progress is not None), compute, progress)
+        if started:
+            return result
+        # The timings belong to the request that started the transcription
+        shared = _without_debug(result)
+        if options.debug and isinstance(shared, dict):
+            shared["debug"] = {"coalesced": True}
+        return shared
+
+    async def transcribe_array(self, audio, options: TranscriptionOptions) -> Dict:
+        # Live audio is never repeated, so it bypasses the cache
+        return await self.inner.transcribe_array(audio, options)
+
+    async def detect_language(
+        self,
+        source: Union[UploadFile, str],
+        model: Optional[str] = None,
+        is_youtube: bool = False
+    ) -> Dict:
+        # A single encoder pass over 30 s; not worth a cache entry
+        return await self.inner.detect_language(source, model, is_youtube)
+
+def create_cache_backend(settings: Settings) -> Optional[CacheBackend]:
+    """Build the result cache backend selected by settings, or None when caching is off"""
+    if settings.cache_backend == "memory":
+        return MemoryCache(max_entries=settings.cache_max_entries)
+    if settings.cache_backend == "sqlite":
+        return SQLiteCache(settings.cache_path, max_bytes=settings.cache_max_mb * 1024**2)
+    return None
@@ -0,0 +1,187 @@
+import atexit
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+import numpy as np
+import torch
+from transformers.modeling_outputs import BaseModelOutput
+from app.services.model_registry import LoadedModel
+
+@dataclass
+class EncoderCacheStats:
+    hits: int = 0
+    misses: int = 0
+    # Entries moved from memory to disk to stay within the memory budget
+    spilled: int = 0
+
+class EncoderCache:
+    """Encoder hidden states of recently transcribed audio windows, in LRU order.
+
+    Entries live in memory up to memory_budget_bytes. Beyond that the least recently
+    used are spilled to .npy files under spill_dir (when given) and read back into memory
+    on their next hit; spilled files beyond disk_budget_bytes are deleted.
+    The spill directory is private to this process and removed when it exits.
+    """
+
+    def __init__(
+        self,
+        memory_budget_bytes: int,
+        spill_dir: Optional[str] = None,
+        disk_budget_bytes: int = 4 * 1024**3,
+    ):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.disk_budget_bytes = disk_budget_bytes
+        self.stats = EncoderCacheStats()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.spill_dir = None
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+            self.spill_dir = tempfile.mkdtemp(prefix="encoder-", dir=spill_dir)
+            atexit.register(shutil.rmtree, self.spill_dir, ignore_errors=True)
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    @property
+    def disk_bytes(self) -> int:
+        return self._disk_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.spill_dir, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the hidden states stored under key, or None on a miss"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return self._memory[key]
+            if key not in self._disk:
+                self.stats.misses += 1
+                return None
+            self._disk_bytes -= self._disk.pop(key)
+            path = self._path(key)
+        # Read back outside the lock; the entry returns to memory as most recently used
+        # Read in full rather than mapped: the entry lives in memory again and its file goes
+        hidden = np.load(path)
+        os.remove(path)
+        with self._lock:
+            self.stats.hits += 1
+        self.put(key, hidden)
+        return hidden
+
+    def put(self, key: str, hidden: np.ndarray) -> None:
+        if hidden.nbytes > self.memory_budget_bytes:
+            return
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return
+            self._memory[key] = hidden
+            self._memory_bytes += hidden.nbytes
+            evicted = []
+            while self._memory_bytes > self.memory_budget_bytes:
+                old_key, old = self._memory.popitem(last=False)
+                self._memory_bytes -= old.nbytes
+                evicted.append((old_key, old))
+        if self.spill_dir is not None:
+            for old_key, old in evicted:
+                self._spill(old_key, old)
+
+    def _spill(self, key: str, hidden: np.ndarray) -> None:
+        if hidden.nbytes > self.disk_budget_bytes or key in self._disk:
+            return
+        np.save(self._path(key), hidden)
+        with self._lock:
+            self.stats.spilled += 1
+            self._disk[key] = hidden.nbytes
+            self._disk_bytes += hidden.nbytes
+            expired = []
+            while self._disk_bytes > self.disk_budget_bytes:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                expired.append(old_key)
+        for old_key in expired:
+            os.remove(self._path(old_key))
+
+class CachingEncoder(torch.nn.Module):
+    """Wraps a Whisper encoder so each input window is encoded at most once.
+
+    Windows are keyed by a hash of the model ID and their log-mel features, so
+    re-transcribing the same audio with another language or timestamp setting only
+    reruns the decoder. Attribute lookups fall through to the wrapped encoder.
+    """
+
+    def __init__(self, encoder: torch.nn.Module, cache: EncoderCache, model_id: str):
+        super().__init__()
+        self.encoder = encoder
+        self.cache = cache
+        self.model_id = model_id
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return super().__getattr__(name)
+        except AttributeError:
+            return getattr(self._modules["encoder"], name)
+
+    def _key(self, features: torch.Tensor) -> str:
+        digest = hashlib.sha256(self.model_id.encode())
+        digest.update(str((features.dtype, tuple(features.shape))).encode())
+        digest.update(features.detach().cpu().contiguous().numpy().tobytes())
+        return digest.hexdigest()
+
+    def forward(self, input_features: torch.Tensor, attention_mask=None, **kwargs):
+        if kwargs.get("output_attentions") or kwargs.get("output_hidden_states"):
+            # Only the last hidden state is cached
+            return self.encoder(input_features, attention_mask, **kwargs)
+
+        keys = [self._key(features) for features in input_features]
+        hidden: List[Optional[np.ndarray]] = [self.cache.get(key) for key in keys]
+        missing = [i for i, states in enumerate(hidden) if states is None]
+        if missing:
+            mask = attention_mask[missing] if attention_mask is not None else None
+            encoded = self.encoder(input_features[missing], mask, **kwargs)[0]
+            for i, states in zip(missing, encoded):
+                # Copied so a cached row does not keep the whole batch's output alive
+                hidden[i] = states.detach().cpu().numpy().copy()
+                self.cache.put(keys[i], hidden[i])
+
+        last_hidden_state = torch.from_numpy(np.stack(hidden)).to(input_features.device)
+        if kwargs.get("return_dict") is False:
+            return (last_hidden_state,)
+        return BaseModelOutput(last_hidden_state=last_hidden_state)
+
+@functools.lru_cache(maxsize=None)
+def shared_encoder_cache(memory_budget_bytes: int, spill_dir: str, disk_budget_bytes: int) -> EncoderCache:
+    """One cache per process and configuration, shared by every model loaded with it"""
+    return EncoderCache(memory_budget_bytes, spill_dir or None, disk_budget_bytes)
+
+def load_with_encoder_cache(
+    loader: Callable[[str], LoadedModel],
+    memory_budget_bytes: int,
+    spill_dir: str,
+    disk_budget_bytes: int,
+    model_id: str,
+) -> LoadedModel:
+    """Load a model whose encoder outputs are cached; engines without a torch Whisper encoder load unchanged.
+
+    Takes the cache settings rather than a cache so it can be sent to worker processes,
+    each of which then keeps its own cache.
+    """
+    loaded = loader(model_id)
+    inner = getattr(loaded.model, "model", None)
+    if isinstance(getattr(inner, "encoder", None), torch.nn.Module):
+        cache = shared_encoder_cache(memory_budget_bytes, spill_dir, disk_budget_bytes)
+        inner.encoder = CachingEncoder(inner.encoder, cache, model_id)
+    return loaded
@@ -0,0 +1,163 @@
+import functools
+import importlib.util
+import logging
+import os
+import re
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+import torch
+from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor
+from app.services.model_registry import (
+    MODEL_ALIASES,
+    LoadedModel,
+    build_asr_pipeline,
+    load_whisper_model,
+    model_size_bytes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every engine produces a LoadedModel whose transcriber is called like an ASR pipeline,
+# so the service, batcher and registry do not depend on which engine is configured.
+
+def quantize_int8(model: torch.nn.Module) -> torch.nn.Module:
+    """Quantize a model's linear layers to int8 weights with activations quantized on the fly"""
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def load_int8_model(model_id: str) -> LoadedModel:
+    """Load a Whisper-family model with dynamically int8-quantized linear layers (CPU only)"""
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(
+        model_id,
+        torch_dtype=torch.float32,
+        low_cpu_mem_usage=True,
+        use_safetensors=True
+    )
+    model = quantize_int8(model.eval())
+    processor = AutoProcessor.from_pretrained(model_id)
+
+    transcriber = build_asr_pipeline(model, processor, "cpu")
+    return LoadedModel(model_id, model, processor, transcriber, model_size_bytes(model), engine="int8")
+
+def load_onnx_model(model_id: str) -> LoadedModel:
+    """Export a Whisper-family model to ONNX and run it with ONNX Runtime"""
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+
+    model = ORTModelForSpeechSeq2Seq.from_pretrained(model_id, export=True)
+    processor = AutoProcessor.from_pretrained(model_id)
+
+    transcriber = build_asr_pipeline(model, processor, "cpu")
+    save_dir = str(model.model_save_dir)
+    size_bytes = sum(
+        os.path.getsize(os.path.join(save_dir, name))
+        for name in os.listdir(save_dir)
+        if ".onnx" in name
+    )
+    return LoadedModel(model_id, model, processor, transcriber, size_bytes, engine="onnx")
+
+ENGINE_LOADERS: Dict[str, Callable[[str], LoadedModel]] = {
+    "transformers": load_whisper_model,
+    "int8": load_int8_model,
+    "onnx": load_onnx_model,
+}
+
+# Engines that need packages beyond the base install, with how to get them
+ENGINE_REQUIREMENTS = {
+    "onnx": ("optimum", "pip install 'optimum[onnxruntime]'"),
+}
+
+# Engines whose models generate through torch, which assisted generation needs
+ASSISTED_ENGINES = {"transformers", "int8"}
+
+def check_assistant_compatible(model: Any, assistant: Any) -> None:
+    """Raise ValueError unless assistant drafts tokens in the same vocabulary as model"""
+    tokens = ("vocab_size", "eos_token_id", "decoder_start_token_id", "pad_token_id")
+    mismatched = [t for t in tokens if getattr(model.config, t, None) != getattr(assistant.config, t, None)]
+    if mismatched:
+        raise ValueError(
+            f"Assistant model {assistant.config.name_or_path} does not share the tokenizer of "
+            f"{model.config.name_or_path} (differs in {', '.join(mismatched)})"
+        )
+
+# Assistant models loaded so far in this process, shared by every model they are compatible with
+_assistants: Dict[Tuple[Callable[[str], LoadedModel], str], LoadedModel] = {}
+_assistants_lock = threading.Lock()
+
+def _load_assistant(loader: Callable[[str], LoadedModel], assistant_model_id: str) -> Tuple[LoadedModel, bool]:
+    """Return the process-wide assistant model, and whether this call loaded it"""
+    with _assistants_lock:
+        key = (loader, assistant_model_id)
+        if key in _assistants:
+            return _assistants[key], False
+        assistant = _assistants[key] = loader(assistant_model_id)
+        return assistant, True
+
+def load_with_assistant(loader: Callable[[str], LoadedModel], assistant_model_id: str, model_id: str) -> LoadedModel:
+    """Load a model whose pipeline drafts tokens with a small assistant model and verifies them in one pass.
+
+    The main model checks every drafted token and keeps only those it would have chosen
+    itself, so greedy transcripts are identical to decoding without the assistant. A model
+    that does not share the assistant's tokenizer is loaded without it.
+    """
+    loaded = loader(model_id)
+    if model_id == assistant_model_id:
+        return loaded
+    assistant, first_load = _load_assistant(loader, assistant_model_id)
+    try:
+        check_assistant_compatible(loaded.model, assistant.model)
+    except ValueError as e:
+        logger.warning("Loading %s without speculative decoding: %s", model_id, e)
+        return loaded
+    loaded.transcriber = build_asr_pipeline(
+        loaded.model, loaded.processor, str(loaded.transcriber.device), assistant_model=assistant.model
+    )
+    # The assistant stays loaded once shared, so only the model that brought it in is charged for it
+    if first_load:
+        loaded.size_bytes += assistant.size_bytes
+    return loaded
+
+def get_engine_loader(engine: str, assistant_model: str = "") -> Callable[[str], LoadedModel]:
+    """Return the model loader for an engine, failing at startup if its dependencies are missing.
+
+    With an assistant model, every model sharing its tokenizer is loaded with it for
+    speculative decoding.
+    """
+    if engine not in ENGINE_LOADERS:
+        raise ValueError(f"Unknown inference engine '{engine}'. Supported engines: {', '.join(ENGINE_LOADERS)}")
+    if engine in ENGINE_REQUIREMENTS:
+        package, install = ENGINE_REQUIREMENTS[engine]
+        if importlib.util.find_spec(package) is None:
+            raise ImportError(f"The '{engine}' inference engine requires {package}: {install}")
+    if not assistant_model:
+        return ENGINE_LOADERS[engine]
+    if engine not in ASSISTED_ENGINES:
+        raise ValueError(
+            f"Assisted decoding is not supported by the '{engine}' engine. "
+            f"Supported engines: {', '.join(sorted(ASSISTED_ENGINES))}"
+        )
+    # A partial of module-level functions can be sent to worker processes, unlike a closure
+    assistant_model_id = MODEL_ALIASES.get(assistant_model, assistant_model)
+    return functools.partial(load_with_assistant, ENGINE_LOADERS[engine], assistant_model_id)
+
+def _normalize_words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance between two transcripts, divided by the reference length.
+
+    Case and punctuation are ignored. Used to check that faster engines transcribe
+    like the reference engine.
+    """
+    ref, hyp = _normalize_words(reference), _normalize_words(hypothesis)
+    if not ref:
+        return float(bool(hyp))
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1] / len(ref)
@@ -0,0 +1,77 @@
+from typing import Callable, List
+from app.models.transcription import (
+    ColumnarTranscript,
+    ExportFormat,
+    SegmentColumns,
+    TranscriptionResponse,
+    WordColumns,
+)
+
+MEDIA_TYPES = {
+    ExportFormat.JSON: "application/json",
+    ExportFormat.SRT: "application/x-subrip",
+    ExportFormat.VTT: "text/vtt",
+}
+
+class MissingTimestampsError(ValueError):
+    """Raised when subtitles are requested for a transcript without segment timestamps"""
+
+def _timestamp(seconds: float, decimal_separator: str) -> str:
+    milliseconds = round(seconds * 1000)
+    hours, milliseconds = divmod(milliseconds, 3_600_000)
+    minutes, milliseconds = divmod(milliseconds, 60_000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{decimal_separator}{milliseconds:03d}"
+
+def _cues(
+    response: TranscriptionResponse,
+    decimal_separator: str,
+    escape: Callable[[str], str] = lambda text: text,
+) -> List[str]:
+    if response.segments is None:
+        raise MissingTimestampsError("Subtitles need segment timestamps; transcribe with return_timestamps")
+    return [
+        f"{_timestamp(segment.start, decimal_separator)} --> {_timestamp(segment.end, decimal_separator)}\n"
+        f"{escape(segment.text)}"
+        for segment in response.segments
+        if segment.text
+    ]
+
+def to_srt(response: TranscriptionResponse) -> str:
+    return "".join(f"{index}\n{cue}\n\n" for index, cue in enumerate(_cues(response, ","), start=1))
+
+def to_vtt(response: TranscriptionResponse) -> str:
+    # Cue text is markup in WebVTT
+    cues = _cues(response, ".", lambda text: text.replace("&", "&amp;").replace("<", "&lt;"))
+    return "WEBVTT\n\n" + "".join(f"{cue}\n\n" for cue in cues)
+
+def to_columns(response: TranscriptionResponse) -> ColumnarTranscript:
+    """Flatten segments and words into parallel arrays, which serialize far smaller and faster"""
+    segments = response.segments or []
+    words = None
+    if any(segment.words is not None for segment in segments):
+        words = WordColumns(start=[], end=[], text=[], segment=[])
+        for index, segment in enumerate(segments):
+            for word in segment.words or []:
+                words.start.append(word.start)
+                words.end.append(word.end)
+                words.text.append(word.text)
+                words.segment.append(index)
+    return ColumnarTranscript(
+        text=response.text,
+        language=response.language,
+        video_title=response.video_title,
+        segments=SegmentColumns(
+            start=[segment.start for segment in segments],
+            end=[segment.end for segment in segments],
+            text=[segment.text for segment in segments],
+        ),
+        words=words,
+    )
+
+def render_export(response: TranscriptionResponse, export_format: ExportFormat) -> str:
+    if export_format == ExportFormat.SRT:
+        return to_srt(response)
+    if export_format == ExportFormat.VTT:
+        return to_vtt(response)
+    return to_columns(response).model_dump_json()
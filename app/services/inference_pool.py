@@ -0,0 +1,72 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, TypeVar
+
+T = TypeVar("T")
+
+class InferenceQueueFullError(RuntimeError):
+    """Raised when every inference worker is busy and the wait queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Inference queue is full, retry later")
+        self.retry_after = retry_after
+
+class InferencePool:
+    """Runs blocking model calls on a dedicated thread pool with bounded admission.
+
+    PyTorch releases the GIL inside its kernels, so worker threads run inference
+    in parallel while the event loop stays free for health checks and uploads.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue_size: int = 8, retry_after: int = 5):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue_size
+        self.retry_after = retry_after
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inference")
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of admitted requests, running or waiting"""
+        return self._pending
+
+    @property
+    def queued(self) -> int:
+        """Number of admitted requests waiting for a free worker"""
+        return max(0, self._pending - self.max_workers)
+
+    @property
+    def saturated(self) -> bool:
+        return self._pending >= self.max_pending
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Admit one request, failing fast with InferenceQueueFullError when saturated"""
+        if self.saturated:
+            raise InferenceQueueFullError(self.retry_after)
+        self._pending += 1
+        try:
+            yield
+        finally:
+            self._pending -= 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking callable on an inference worker without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+async def retry_when_full(fn: Callable[[], Awaitable[T]]) -> T:
+    """Await fn(), waiting retry_after seconds and trying again whenever the inference queue is full.
+
+    For work no client is waiting on (jobs, batches), where waiting beats failing.
+    """
+    while True:
+        try:
+            return await fn()
+        except InferenceQueueFullError as e:
+            await asyncio.sleep(e.retry_after)
@@ -0,0 +1,264 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+from fastapi import UploadFile
+from app.models.jobs import JobInfo, JobProgress, JobStatus
+from app.models.transcription import TranscriptionOptions, build_transcription_response
+from app.services.audio import UPLOAD_CHUNK_SIZE, spool_upload
+from app.services.inference_pool import retry_when_full
+from app.services.transcription_service import TranscriptionProgress, TranscriptionService
+
+FINISHED_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+# Progress is reported per chunk from the event loop, so it is persisted at most this often
+PROGRESS_SAVE_INTERVAL_S = 1.0
+
+class JobNotFoundError(KeyError):
+    """Raised when a job ID is not in the job store"""
+
+@dataclass
+class Job:
+    id: str
+    is_youtube: bool
+    # YouTube URL, or the path of the spooled upload
+    source: str
+    options: TranscriptionOptions
+    status: JobStatus = JobStatus.QUEUED
+    chunks_done: int = 0
+    chunks_total: Optional[int] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id,
+            status=self.status,
+            progress=JobProgress(chunks_done=self.chunks_done, chunks_total=self.chunks_total),
+            created_at=datetime.fromtimestamp(self.created_at, tz=timezone.utc),
+            updated_at=datetime.fromtimestamp(self.updated_at, tz=timezone.utc),
+            error=self.error,
+        )
+
+class JobStore:
+    """Persists jobs and their results in a SQLite file so they survive restarts"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, is_youtube INTEGER NOT NULL, source TEXT NOT NULL, "
+            "options TEXT NOT NULL, status TEXT NOT NULL, chunks_done INTEGER NOT NULL, "
+            "chunks_total INTEGER, created_at REAL NOT NULL, updated_at REAL NOT NULL, "
+            "result TEXT, error TEXT)"
+        )
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        job.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.id, int(job.is_youtube), job.source, job.options.model_dump_json(),
+                    job.status.value, job.chunks_done, job.chunks_total, job.created_at,
+                    job.updated_at, json.dumps(job.result) if job.result is not None else None,
+                    job.error,
+                )
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_job(row) if row else None
+
+    def unfinished(self) -> List[Job]:
+        """Jobs that were queued or running, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+    def _to_job(self, row: tuple) -> Job:
+        (job_id, is_youtube, source, options, status, chunks_done,
+         chunks_total, created_at, updated_at, result, error) = row
+        return Job(
+            id=job_id,
+            is_youtube=bool(is_youtube),
+            source=source,
+            options=TranscriptionOptions.model_validate_json(options),
+            status=JobStatus(status),
+            chunks_done=chunks_done,
+            chunks_total=chunks_total,
+            created_at=created_at,
+            updated_at=updated_at,
+            result=json.loads(result) if result is not None else None,
+            error=error,
+        )
+
+class JobManager:
+    """Runs transcriptions in the background so clients can poll instead of holding a connection.
+
+    At most max_concurrent_jobs jobs run at once; the rest wait in submission order.
+    Jobs interrupted by a shutdown are resumed on the next start. The store may be
+    given to start() instead, so nothing touches the disk until the app starts.
+    """
+
+    def __init__(
+        self,
+        service: TranscriptionService,
+        store: Optional[JobStore],
+        upload_dir: str,
+        max_concurrent_jobs: int = 2,
+        max_upload_bytes: int = 2 * 1024**3,
+        upload_chunk_size: int = UPLOAD_CHUNK_SIZE,
+        model_resolver: Optional[Callable[[Optional[str]], str]] = None,
+    ):
+        self.service = service
+        self.model_resolver = model_resolver
+        self.store = store
+        self.upload_dir = upload_dir
+        self.max_upload_bytes = max_upload_bytes
+        self.upload_chunk_size = upload_chunk_size
+        self._semaphore = asyncio.Semaphore(max_concurrent_jobs)
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._jobs: Dict[str, Job] = {}
+        self._shutting_down = False
+
+    async def start(self, store: Optional[JobStore] = None) -> None:
+        """Resume jobs left unfinished by a previous run"""
+        if store is not None:
+            self.store = store
+        os.makedirs(self.upload_dir, exist_ok=True)
+        for job in self.store.unfinished():
+            if not job.is_youtube and not os.path.exists(job.source):
+                job.status = JobStatus.FAILED
+                job.error = "Uploaded audio was lost before the job could run"
+                self.store.save(job)
+                continue
+            job.status = JobStatus.QUEUED
+            self._schedule(job)
+
+    async def shutdown(self) -> None:
+        """Stop running jobs, leaving them queued so the next start resumes them"""
+        self._shutting_down = True
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def submit_youtube(self, url: str, options: TranscriptionOptions) -> Job:
+        self._validate(options)
+        job = Job(id=uuid.uuid4().hex, is_youtube=True, source=url, options=options)
+        self._schedule(job)
+        return job
+
+    async def submit_upload(self, upload: UploadFile, options: TranscriptionOptions) -> Job:
+        self._validate(options)
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.upload_dir, job_id)
+        try:
+            with open(path, "wb") as dest:
+                await spool_upload(upload, dest, self.max_upload_bytes, self.upload_chunk_size)
+        except BaseException:
+            os.unlink(path)
+            raise
+        job = Job(id=job_id, is_youtube=False, source=path, options=options)
+        self._schedule(job)
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id) or self.store.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = self.get(job_id)
+        if job.status in FINISHED_STATUSES:
+            return job
+        job.status = JobStatus.CANCELLED
+        self.store.save(job)
+        task = self._tasks.get(job_id)
+        if task is not None:
+            task.cancel()
+        return job
+
+    def _validate(self, options: TranscriptionOptions) -> None:
+        # Reject unknown models at submission rather than when the job runs
+        if self.model_resolver is not None:
+            self.model_resolver(options.model)
+
+    def _schedule(self, job: Job) -> None:
+        self.store.save(job)
+        self._jobs[job.id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _: self._forget(job.id))
+
+    def _forget(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+
+    async def _run(self, job: Job) -> None:
+        try:
+            async with self._semaphore:
+                if job.status == JobStatus.CANCELLED:
+                    return
+                job.status = JobStatus.RUNNING
+                self.store.save(job)
+                result = await self._transcribe(job)
+                job.result = build_transcription_response(result).model_dump()
+                job.status = JobStatus.COMPLETED
+                self.store.save(job)
+        except asyncio.CancelledError:
+            if self._shutting_down and job.status != JobStatus.CANCELLED:
+                job.status = JobStatus.QUEUED
+            else:
+                job.status = JobStatus.CANCELLED
+            self.store.save(job)
+            raise
+        except Exception as e:
+            job.status = JobStatus.FAILED
+            job.error = str(e)
+            self.store.save(job)
+        finally:
+            if not job.is_youtube and job.status in FINISHED_STATUSES:
+                if os.path.exists(job.source):
+                    os.unlink(job.source)
+
+    async def _transcribe(self, job: Job):
+        last_saved = None
+
+        def on_progress(progress: TranscriptionProgress) -> None:
+            nonlocal last_saved
+            job.chunks_done = progress.chunks_done
+            job.chunks_total = progress.chunks_total
+            # Pollers read the job from memory; the store only needs it to survive a restart
+            now = time.monotonic()
+            if last_saved is None or now - last_saved >= PROGRESS_SAVE_INTERVAL_S:
+                last_saved = now
+                self.store.save(job)
+
+        async def transcribe():
+            if job.is_youtube:
+                return await self.service.transcribe(job.source, job.options, True, on_progress)
+            with open(job.source, "rb") as audio:
+                upload = UploadFile(file=audio, filename=job.id)
+                return await self.service.transcribe(upload, job.options, False, on_progress)
+
+        # Jobs have no client waiting on them, so wait for capacity instead of failing
+        return await retry_when_full(transcribe)
@@ -0,0 +1,48 @@
+from typing import Any, Dict
+import numpy as np
+from app.services.audio import SAMPLING_RATE
+
+# Whisper identifies the language from its first 30 s window
+DETECTION_WINDOW_S = 30
+
+class LanguageDetectionUnsupportedError(ValueError):
+    """Raised when a model has no language tokens to choose from (e.g. English-only checkpoints)"""
+
+def detect_language(model: Any, processor: Any, audio: np.ndarray, top_k: int = 5) -> Dict:
+    """Identify the language of the first 30 s of audio.
+
+    Runs the encoder and a single decoder step, the one in which Whisper predicts the
+    language token, and returns the most likely language with its probability and the
+    top_k candidates. Works for torch and ONNX Runtime Whisper models.
+    """
+    import torch
+
+    lang_to_id = getattr(model.generation_config, "lang_to_id", None)
+    if not lang_to_id:
+        raise LanguageDetectionUnsupportedError("This model cannot identify languages; pass language instead")
+
+    features = processor.feature_extractor(
+        audio[:DETECTION_WINDOW_S * SAMPLING_RATE],
+        sampling_rate=SAMPLING_RATE,
+        return_tensors="pt",
+    ).input_features
+    dtype = getattr(model, "dtype", None)
+    features = features.to(model.device, dtype=dtype) if isinstance(dtype, torch.dtype) else features.to(model.device)
+    decoder_input_ids = torch.tensor([[model.generation_config.decoder_start_token_id]], device=model.device)
+    with torch.inference_mode():
+        logits = model(input_features=features, decoder_input_ids=decoder_input_ids).logits[0, -1]
+
+    codes = [token.strip("<|>") for token in lang_to_id]
+    probabilities = logits.float().cpu()[list(lang_to_id.values())].softmax(-1)
+    top = probabilities.topk(min(top_k, len(codes)))
+    candidates = {codes[i]: round(p, 4) for p, i in zip(top.values.tolist(), top.indices.tolist())}
+    language = next(iter(candidates))
+    return {"language": language, "probability": candidates[language], "probabilities": candidates}
+
+def detect_loaded_language(loaded: Any, audio: np.ndarray) -> Dict:
+    """detect_language for a LoadedModel, wherever its weights live"""
+    if loaded.language_detector is not None:
+        return loaded.language_detector(audio)
+    if loaded.model is None:
+        raise LanguageDetectionUnsupportedError("This model cannot identify languages; pass language instead")
+    return detect_language(loaded.model, loaded.processor, audio)
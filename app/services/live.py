@@ -0,0 +1,154 @@
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+import numpy as np
+from app.services.segmentation import MAX_WINDOW_S, find_cut
+from app.services.vad import EnergyVAD
+
+@dataclass
+class LiveUpdate:
+    # Words newly committed since the previous update; they will not change again
+    stable: str
+    # The current guess for the rest of the utterance; may still be revised
+    tentative: str
+    # Seconds between receiving the newest decoded audio and producing this update
+    latency_s: float
+    final: bool = False
+
+def _common_prefix_length(a: List[str], b: List[str]) -> int:
+    length = 0
+    for left, right in zip(a, b):
+        if left != right:
+            break
+        length += 1
+    return length
+
+class LiveTranscriptionSession:
+    """Incremental transcription of a continuous audio stream.
+
+    Audio is accumulated into the current utterance and the whole utterance is
+    re-decoded every step_s seconds of new audio. Words that two consecutive
+    hypotheses agree on are committed as stable; the rest is reported as
+    tentative. An utterance ends, and everything in it is committed, after
+    min_silence_s of silence or once it reaches max_window_s (at most Whisper's 30 s).
+
+    Silence is never sent to the model. If inference falls behind by more than
+    max_backlog_s, the oldest undecoded audio is dropped so latency stays bounded.
+    """
+
+    def __init__(
+        self,
+        transcribe: Callable[[np.ndarray], Awaitable[str]],
+        sampling_rate: int,
+        step_s: float = 1.0,
+        max_window_s: float = 15.0,
+        min_silence_s: float = 0.6,
+        max_backlog_s: float = 10.0,
+        vad: Optional[EnergyVAD] = None,
+    ):
+        self.transcribe = transcribe
+        self.sampling_rate = sampling_rate
+        self.step = int(step_s * sampling_rate)
+        self.max_window = int(min(max_window_s, MAX_WINDOW_S) * sampling_rate)
+        self.min_silence_s = min_silence_s
+        self.max_backlog = int(max_backlog_s * sampling_rate)
+        self.vad = vad or EnergyVAD(sampling_rate)
+
+        self._pending: List[np.ndarray] = []
+        self._pending_samples = 0
+        self._last_received_at = time.monotonic()
+        self._utterance = np.zeros(0, dtype=np.float32)
+        self._hypothesis: List[str] = []
+        self._committed: List[str] = []
+        self.transcript: List[str] = []
+        self.dropped_samples = 0
+
+    @property
+    def backlog_s(self) -> float:
+        """Seconds of received audio not yet decoded"""
+        return self._pending_samples / self.sampling_rate
+
+    @property
+    def ready(self) -> bool:
+        """Whether enough new audio has arrived to decode again"""
+        return self._pending_samples >= self.step
+
+    def feed(self, samples: np.ndarray) -> int:
+        """Queue received audio; returns how many samples were dropped to stay within the backlog"""
+        self._pending.append(samples)
+        self._pending_samples += len(samples)
+        self._last_received_at = time.monotonic()
+
+        dropped = 0
+        while self._pending_samples > self.max_backlog:
+            excess = self._pending_samples - self.max_backlog
+            oldest = self._pending[0]
+            if len(oldest) <= excess:
+                self._pending.pop(0)
+                removed = len(oldest)
+            else:
+                self._pending[0] = oldest[excess:]
+                removed = excess
+            self._pending_samples -= removed
+            dropped += removed
+        self.dropped_samples += dropped
+        return dropped
+
+    async def advance(self, final: bool = False) -> Optional[LiveUpdate]:
+        """Decode the current utterance with all queued audio; None when there is nothing to report"""
+        received_at = self._last_received_at
+        if self._pending:
+            self._utterance = np.concatenate([self._utterance, *self._pending])
+            self._pending = []
+            self._pending_samples = 0
+        overflow = len(self._utterance) > self.max_window
+        if overflow:
+            # Audio queued during the last decode can push the utterance past the window;
+            # decode up to a quiet point and start the next utterance with the rest
+            cut = find_cut(self._utterance[:self.max_window], self.sampling_rate)
+            self._utterance, rest = self._utterance[:cut], self._utterance[cut:]
+            self._pending = [rest]
+            self._pending_samples = len(rest)
+
+        if not self.vad.has_speech(self._utterance):
+            # Keep a little audio so the onset of the next word is not lost
+            self._utterance = self._utterance[-self.step:]
+            if final and self._hypothesis:
+                return self._commit_all(received_at)
+            return None
+
+        words = (await self.transcribe(self._utterance)).split()
+        utterance_ended = (
+            final
+            or overflow
+            or len(self._utterance) >= self.max_window
+            or self.vad.trailing_silence_s(self._utterance) >= self.min_silence_s
+        )
+        if utterance_ended:
+            self._hypothesis = words
+            return self._commit_all(received_at, final)
+
+        # Local agreement: commit what this hypothesis and the previous one share
+        agreed = _common_prefix_length(words, self._hypothesis)
+        newly_stable = words[len(self._committed):agreed] if agreed > len(self._committed) else []
+        self._committed += newly_stable
+        self.transcript += newly_stable
+        self._hypothesis = words
+        return LiveUpdate(
+            stable=" ".join(newly_stable),
+            tentative=" ".join(words[len(self._committed):]),
+            latency_s=time.monotonic() - received_at,
+        )
+
+    def _commit_all(self, received_at: float, final: bool = False) -> LiveUpdate:
+        newly_stable = self._hypothesis[len(self._committed):]
+        self.transcript += newly_stable
+        self._utterance = np.zeros(0, dtype=np.float32)
+        self._hypothesis = []
+        self._committed = []
+        return LiveUpdate(
+            stable=" ".join(newly_stable),
+            tentative="",
+            latency_s=time.monotonic() - received_at,
+            final=final,
+        )
@@ -0,0 +1,201 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from prometheus_client import Counter, Gauge, Histogram
+
+# Stage durations range from milliseconds (segmentation) to minutes (long downloads)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+REQUEST_SECONDS = Histogram(
+    "transcriber_request_seconds",
+    "End-to-end request latency, by endpoint and HTTP status",
+    ["endpoint", "status"],
+    buckets=STAGE_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "transcriber_stage_seconds",
+    "Seconds one request spent in each stage; model stages are the request's share of its batches",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+BATCH_STAGE_SECONDS = Histogram(
+    "transcriber_batch_stage_seconds",
+    "Seconds one model batch spent in each stage",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+BATCH_SIZE = Histogram(
+    "transcriber_batch_size",
+    "Inputs per model batch",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+AUDIO_SECONDS = Counter(
+    "transcriber_audio_seconds",
+    "Seconds of audio transcribed, by source",
+    ["source"],
+)
+REAL_TIME_FACTOR = Histogram(
+    "transcriber_real_time_factor",
+    "Processing time divided by audio duration, per request",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+QUEUE_DEPTH = Gauge("transcriber_queue_depth", "Admitted requests waiting for an inference worker")
+BATCH_QUEUE_DEPTH = Gauge("transcriber_batch_queue_depth", "Inputs waiting to join a model batch")
+IN_FLIGHT = Gauge("transcriber_in_flight_requests", "Admitted requests, running or waiting")
+MODEL_MEMORY = Gauge("transcriber_model_memory_bytes", "Memory held by loaded model weights")
+LOADED_MODELS = Gauge("transcriber_loaded_models", "Number of models currently loaded")
+
+class StageTimings:
+    """Wall-clock seconds one request spent in each stage.
+
+    Stages can overlap: while a YouTube stream is downloading, its first windows are
+    already being transcribed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.audio_s = 0.0
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    @property
+    def total_s(self) -> float:
+        return time.perf_counter() - self.started
+
+    def report(self) -> Dict[str, Any]:
+        """The debug field of a TranscriptionResponse"""
+        total_s = self.total_s
+        return {
+            "timings_s": {
+                **{stage: round(seconds, 4) for stage, seconds in self.stages.items()},
+                "total": round(total_s, 4),
+            },
+            "audio_s": round(self.audio_s, 2),
+            "real_time_factor": round(total_s / self.audio_s, 4) if self.audio_s else None,
+        }
+
+# The timings of the request being handled; set by the transcription service and
+# inherited by the tasks it starts
+current_timings: ContextVar[Optional[StageTimings]] = ContextVar("current_timings", default=None)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time a stage of the current request, if there is one"""
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    with timings.stage(name):
+        yield
+
+def add_stage_time(stage: str, seconds: float) -> None:
+    timings = current_timings.get()
+    if timings is not None:
+        timings.add(stage, seconds)
+
+def record_audio(seconds: float) -> None:
+    """Set the duration of the current request's audio"""
+    timings = current_timings.get()
+    if timings is not None:
+        timings.audio_s = seconds
+
+def observe_request(timings: StageTimings, source: str) -> None:
+    """Record a finished request's stage timings, audio duration and real-time factor"""
+    for name, seconds in timings.stages.items():
+        STAGE_SECONDS.labels(name).observe(seconds)
+    AUDIO_SECONDS.labels(source).inc(timings.audio_s)
+    if timings.audio_s:
+        REAL_TIME_FACTOR.observe(timings.total_s / timings.audio_s)
+
+# Model stages are timed on the inference thread running the batch
+_batch = threading.local()
+
+@contextmanager
+def batch_stage_times() -> Iterator[Dict[str, float]]:
+    """Collect the seconds the batch run on this thread spends in feature extraction and the encoder"""
+    _batch.times = {}
+    try:
+        yield _batch.times
+    finally:
+        _batch.times = None
+
+def _add_batch_time(stage: str, seconds: float) -> None:
+    times = getattr(_batch, "times", None)
+    if times is not None:
+        times[stage] = times.get(stage, 0.0) + seconds
+
+class TimedFeatureExtractor:
+    """Delegates to a feature extractor, timing each call into the current batch"""
+
+    def __init__(self, feature_extractor: Any):
+        self._feature_extractor = feature_extractor
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._feature_extractor(*args, **kwargs)
+        finally:
+            _add_batch_time("feature_extraction", time.perf_counter() - start)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._feature_extractor, name)
+
+def _encoder_pre_hook(module, args) -> None:
+    _batch.encoder_started = time.perf_counter()
+
+def _encoder_hook(module, args, output) -> None:
+    started = getattr(_batch, "encoder_started", None)
+    if started is not None:
+        _add_batch_time("encoder", time.perf_counter() - started)
+        _batch.encoder_started = None
+
+# Inference threads instrument a pipeline on their first batch, possibly at the same time
+_instrument_lock = threading.Lock()
+
+def instrument_pipeline(transcriber: Any) -> None:
+    """Time feature extraction and the encoder of an ASR pipeline; safe to call repeatedly and from any thread.
+
+    Pipelines that run elsewhere (worker processes) or models without a torch encoder
+    are left alone, and their batches are only timed as a whole.
+    """
+    if transcriber is None or getattr(transcriber, "_stage_timed", False):
+        return
+    with _instrument_lock:
+        if not getattr(transcriber, "_stage_timed", False):
+            _instrument(transcriber)
+
+def _instrument(transcriber: Any) -> None:
+    feature_extractor = getattr(transcriber, "feature_extractor", None)
+    if feature_extractor is not None and not isinstance(feature_extractor, TimedFeatureExtractor):
+        transcriber.feature_extractor = TimedFeatureExtractor(feature_extractor)
+    get_encoder = getattr(getattr(transcriber, "model", None), "get_encoder", None)
+    encoder = get_encoder() if get_encoder is not None else None
+    if hasattr(encoder, "register_forward_hook"):
+        encoder.register_forward_pre_hook(_encoder_pre_hook)
+        encoder.register_forward_hook(_encoder_hook)
+    transcriber._stage_timed = True
+
+def observe_batch(times: Dict[str, float], batch_size: int) -> None:
+    BATCH_SIZE.observe(batch_size)
+    for name, seconds in times.items():
+        BATCH_STAGE_SECONDS.labels(name).observe(seconds)
+
+def bind_service(service: Any) -> None:
+    """Read queue depth, in-flight requests and model memory from a WhisperTranscriptionService at scrape time"""
+    QUEUE_DEPTH.set_function(lambda: service.inference_pool.queued)
+    BATCH_QUEUE_DEPTH.set_function(lambda: service.batcher.pending)
+    IN_FLIGHT.set_function(lambda: service.inference_pool.pending)
+    MODEL_MEMORY.set_function(lambda: service.registry.loaded_bytes)
+    LOADED_MODELS.set_function(lambda: len(service.registry.loaded_models))
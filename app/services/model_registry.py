@@ -0,0 +1,176 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional
+
+# torch and transformers are imported where models are built, so processes that only
+# talk to an inference broker never load them
+if TYPE_CHECKING:
+    import torch
+
+# Short names accepted in TranscriptionOptions.model
+MODEL_ALIASES = {
+    "distil-large-v3": "distil-whisper/distil-large-v3",
+    "distil-large-v2": "distil-whisper/distil-large-v2",
+    "tiny": "openai/whisper-tiny",
+    "base": "openai/whisper-base",
+}
+
+class UnknownModelError(ValueError):
+    """Raised when a request names a model the server is not configured to serve"""
+
+@dataclass
+class LoadedModel:
+    model_id: str
+    model: Any
+    processor: Any
+    transcriber: Any
+    size_bytes: int
+    engine: str = "transformers"
+    # Set by loaders whose model lives in another process; called with audio, returns the detection
+    language_detector: Any = None
+
+def model_size_bytes(model: Any) -> int:
+    """Memory held by a torch model's weights, including dynamically quantized linear layers"""
+    import torch
+
+    size_bytes = sum(t.numel() * t.element_size() for t in model.parameters())
+    size_bytes += sum(t.numel() * t.element_size() for t in model.buffers())
+    for module in model.modules():
+        # Quantized weights are packed and not reported as parameters
+        if isinstance(module, torch.ao.nn.quantized.dynamic.Linear):
+            weight, bias = module._weight_bias()
+            size_bytes += weight.numel() * weight.element_size()
+            if bias is not None:
+                size_bytes += bias.numel() * bias.element_size()
+    return size_bytes
+
+def build_asr_pipeline(
+    model: Any,
+    processor: Any,
+    device: str,
+    torch_dtype: Optional["torch.dtype"] = None,
+    assistant_model: Optional[Any] = None,
+) -> Any:
+    """Wrap a loaded model in the ASR pipeline every engine is called through"""
+    from transformers import pipeline
+
+    kwargs = {"assistant_model": assistant_model} if assistant_model is not None else {}
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor,
+        max_new_tokens=128,
+        torch_dtype=torch_dtype,
+        device=device,
+        **kwargs,
+    )
+
+def load_whisper_model(model_id: str) -> LoadedModel:
+    """Load a Whisper-family model and wrap it in an ASR pipeline"""
+    import torch
+    from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor
+
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+
+    model = AutoModelForSpeechSeq2Seq.from_pretrained(
+        model_id,
+        torch_dtype=torch_dtype,
+        low_cpu_mem_usage=True,
+        use_safetensors=True
+    )
+    model.to(device)
+    processor = AutoProcessor.from_pretrained(model_id)
+
+    transcriber = build_asr_pipeline(model, processor, device, torch_dtype)
+    return LoadedModel(model_id, model, processor, transcriber, model_size_bytes(model))
+
+class ModelRegistry:
+    """Process-wide cache of loaded models.
+
+    Models are loaded on first use (or during warm-up) and kept in LRU order. When the
+    combined size of loaded models exceeds the memory budget, the least recently used
+    models are evicted. The default model and the most recently used model are never
+    evicted, so a warm server stays warm.
+    """
+
+    def __init__(
+        self,
+        default_model: str = MODEL_ALIASES["distil-large-v3"],
+        allowed_models: Optional[Iterable[str]] = None,
+        memory_budget_bytes: int = 8 * 1024**3,
+        loader: Callable[[str], LoadedModel] = load_whisper_model,
+    ):
+        self.default_model = MODEL_ALIASES.get(default_model, default_model)
+        self.allowed_models = set(allowed_models or MODEL_ALIASES.values())
+        self.allowed_models.add(self.default_model)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.loader = loader
+        self._models: "OrderedDict[str, LoadedModel]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        """True once the default model has been loaded"""
+        return self._ready.is_set()
+
+    @property
+    def loaded_models(self) -> List[str]:
+        with self._lock:
+            return list(self._models)
+
+    @property
+    def loaded_bytes(self) -> int:
+        with self._lock:
+            return sum(m.size_bytes for m in self._models.values())
+
+    def resolve(self, name: Optional[str]) -> str:
+        """Map an alias or model ID (None meaning the default) to a served model ID"""
+        if name is None:
+            return self.default_model
+        model_id = MODEL_ALIASES.get(name, name)
+        if model_id not in self.allowed_models:
+            raise UnknownModelError(
+                f"Unknown model '{name}'. Supported models: {', '.join(sorted(self.allowed_models))}"
+            )
+        return model_id
+
+    def get(self, name: Optional[str] = None) -> LoadedModel:
+        """Return a loaded model, loading it on this thread if necessary"""
+        model_id = self.resolve(name)
+        with self._lock:
+            if model_id in self._models:
+                self._models.move_to_end(model_id)
+                return self._models[model_id]
+            load_lock = self._load_locks.setdefault(model_id, threading.Lock())
+
+        # Only one thread loads a given model; others wait for it instead of loading a copy
+        with load_lock:
+            with self._lock:
+                if model_id in self._models:
+                    self._models.move_to_end(model_id)
+                    return self._models[model_id]
+            loaded = self.loader(model_id)
+            with self._lock:
+                self._models[model_id] = loaded
+                self._evict()
+            if model_id == self.default_model:
+                self._ready.set()
+            return loaded
+
+    def warm_up(self, names: Iterable[Optional[str]] = ()) -> None:
+        """Load the default model plus any extra models ahead of the first request"""
+        for name in [None, *names]:
+            self.get(name)
+
+    def _evict(self) -> None:
+        total = sum(m.size_bytes for m in self._models.values())
+        candidates = [m for m in list(self._models)[:-1] if m != self.default_model]
+        for model_id in candidates:
+            if total <= self.memory_budget_bytes:
+                break
+            total -= self._models.pop(model_id).size_bytes
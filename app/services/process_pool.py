@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import torch
+import numpy as np
+from app.services.language import detect_loaded_language
+from app.services.model_registry import LoadedModel, ModelRegistry
+
+# How long a worker waits for the others to load a model before giving up
+LOAD_TIMEOUT_S = 600
+
+# Set in each worker process by _init_worker
+_registry: Optional[ModelRegistry] = None
+_load_barrier: Optional[Any] = None
+
+def _init_worker(
+    loader: Callable[[str], LoadedModel],
+    default_model: str,
+    allowed_models: List[str],
+    memory_budget_bytes: int,
+    torch_threads: int,
+    load_barrier: Any,
+) -> None:
+    global _registry, _load_barrier
+    _load_barrier = load_barrier
+    # Workers split the cores between them instead of each spawning a thread per core
+    torch.set_num_threads(torch_threads)
+    _registry = ModelRegistry(
+        default_model=default_model,
+        allowed_models=allowed_models,
+        memory_budget_bytes=memory_budget_bytes,
+        loader=loader,
+    )
+
+def _load_in_worker(model_id: str) -> int:
+    try:
+        _registry.get(model_id)
+    except BaseException:
+        # Release the workers waiting for this one
+        _load_barrier.abort()
+        raise
+    # Hold this worker until every worker has a load task, so no worker runs two of them
+    _load_barrier.wait(LOAD_TIMEOUT_S)
+    return os.getpid()
+
+def _transcribe_in_worker(model_id: str, inputs: List[Dict], kwargs: Dict[str, Any]) -> List:
+    return list(_registry.get(model_id).transcriber(inputs, **kwargs))
+
+def _detect_language_in_worker(model_id: str, audio: np.ndarray) -> Dict:
+    return detect_loaded_language(_registry.get(model_id), audio)
+
+class ModelProcessPool:
+    """Runs model inference in worker processes, each holding its own copy of the weights.
+
+    Used as the ModelRegistry's loader: loading a model loads it in the workers and
+    returns a LoadedModel whose transcriber splits each batch across all workers, so the
+    windows of one long file are decoded in parallel. Workers are spawned rather than
+    forked, since forking a process that has started torch threads is unsafe.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        loader: Callable[[str], LoadedModel],
+        default_model: str,
+        allowed_models: Iterable[str],
+        memory_budget_bytes: int,
+    ):
+        self.processes = processes
+        torch_threads = max(1, (os.cpu_count() or 1) // processes)
+        context = multiprocessing.get_context("spawn")
+        self._load_barrier = context.Barrier(processes)
+        self.executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                loader, default_model, sorted(allowed_models), memory_budget_bytes, torch_threads,
+                self._load_barrier,
+            ),
+        )
+        # The workers share one barrier, so only one model is loaded across them at a time
+        self._load_lock = threading.Lock()
+
+    def load(self, model_id: str) -> LoadedModel:
+        """Load a model in every worker and return a proxy that runs it there.
+
+        Returns once all workers hold the model, so none of them pays for loading it on
+        a request after the registry reports it ready.
+        """
+        with self._load_lock:
+            futures = [self.executor.submit(_load_in_worker, model_id) for _ in range(self.processes)]
+            wait(futures)
+            errors = [future.exception() for future in futures if future.exception() is not None]
+            if errors:
+                # Ready the barrier for the next load, and report why this one failed rather
+                # than the workers it released
+                self._load_barrier.reset()
+                raise next((e for e in errors if not isinstance(e, threading.BrokenBarrierError)), errors[0])
+            pids = {future.result() for future in futures}
+        if len(pids) != self.processes:
+            raise RuntimeError(f"{model_id} was loaded in {len(pids)} of {self.processes} worker processes")
+
+        def transcriber(inputs: List[Dict], **kwargs: Any) -> List:
+            return self.transcribe(model_id, inputs, **kwargs)
+
+        def language_detector(audio: np.ndarray) -> Dict:
+            return self.executor.submit(_detect_language_in_worker, model_id, audio).result()
+
+        # The weights live in the workers, not in this process
+        return LoadedModel(model_id, None, None, transcriber, 0, engine="process", language_detector=language_detector)
+
+    def transcribe(self, model_id: str, inputs: List[Dict], **kwargs: Any) -> List:
+        """Split a batch into one contiguous part per worker and run the parts in parallel"""
+        part_size = -(-len(inputs) // self.processes)
+        futures = [
+            self.executor.submit(_transcribe_in_worker, model_id, inputs[start:start + part_size], kwargs)
+            for start in range(0, len(inputs), part_size)
+        ]
+        return [result for future in futures for result in future.result()]
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
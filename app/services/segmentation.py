@@ -0,0 +1,81 @@
+from typing import List, Tuple
+import numpy as np
+
+Window = Tuple[int, int]
+
+# Longest window Whisper can attend to in one forward pass
+MAX_WINDOW_S = 30
+
+def frame_energies(audio: np.ndarray, frame_length: int) -> np.ndarray:
+    """RMS energy of consecutive non-overlapping frames (a trailing partial frame is dropped)"""
+    n_frames = len(audio) // frame_length
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[:n_frames * frame_length].reshape(n_frames, frame_length)
+    return np.sqrt(np.mean(np.square(frames, dtype=np.float32), axis=1))
+
+def find_cut(
+    window: np.ndarray,
+    sampling_rate: int,
+    search_s: float = 5.0,
+    frame_ms: int = 20,
+) -> int:
+    """Index at which to end a window: the middle of its quietest frame within the last search_s seconds"""
+    frame_length = max(1, sampling_rate * frame_ms // 1000)
+    search = min(int(search_s * sampling_rate), len(window) // 2)
+    energies = frame_energies(window[len(window) - search:], frame_length)
+    if len(energies) == 0:
+        return len(window)
+    quietest = int(np.argmin(energies))
+    return len(window) - search + quietest * frame_length + frame_length // 2
+
+def split_on_silence(
+    audio: np.ndarray,
+    sampling_rate: int,
+    max_window_s: float = 30.0,
+    search_s: float = 5.0,
+    frame_ms: int = 20,
+) -> List[Window]:
+    """Split audio into consecutive windows of at most max_window_s seconds.
+
+    Each cut is placed at the quietest frame within the last search_s seconds of the
+    window, so words are rarely split between windows. Returns (start, end) sample
+    indices; slicing the audio with them gives views, not copies.
+    """
+    max_window = int(max_window_s * sampling_rate)
+    windows = []
+    start = 0
+    while len(audio) - start > max_window:
+        cut = start + find_cut(audio[start:start + max_window], sampling_rate, search_s, frame_ms)
+        windows.append((start, cut))
+        start = cut
+    windows.append((start, len(audio)))
+    return windows
+
+def pack_speech_regions(
+    audio: np.ndarray,
+    regions: List[Window],
+    sampling_rate: int,
+    max_window_s: float = 30.0,
+) -> List[List[Window]]:
+    """Group consecutive speech regions into windows holding at most max_window_s seconds of speech.
+
+    Each window is a list of regions to be concatenated before inference, so the silence
+    between them costs nothing. Regions longer than a window are split on silence first.
+    """
+    max_window = int(max_window_s * sampling_rate)
+    packed: List[List[Window]] = []
+    current: List[Window] = []
+    current_length = 0
+    for region_start, region_end in regions:
+        pieces = split_on_silence(audio[region_start:region_end], sampling_rate, max_window_s)
+        for start, end in pieces:
+            start, end = region_start + start, region_start + end
+            if current and current_length + end - start > max_window:
+                packed.append(current)
+                current, current_length = [], 0
+            current.append((start, end))
+            current_length += end - start
+    if current:
+        packed.append(current)
+    return packed
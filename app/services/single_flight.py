@@ -0,0 +1,83 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+Listener = Callable[[Any], None]
+
+@dataclass
+class SingleFlightStats:
+    started: int = 0
+    # Calls that attached to one already in flight instead of starting their own
+    joined: int = 0
+    # Calls abandoned by all of their callers before they finished
+    cancelled: int = 0
+
+@dataclass
+class _Flight:
+    task: Optional[asyncio.Future] = None
+    waiters: int = 0
+    history: List[Any] = field(default_factory=list)
+    listeners: List[Listener] = field(default_factory=list)
+
+    def report(self, event: Any) -> None:
+        self.history.append(event)
+        for listener in list(self.listeners):
+            listener(event)
+
+class SingleFlight:
+    """Runs at most one call per key at a time; concurrent callers with the same key share it.
+
+    The call runs as its own task and callers only wait on it, so a caller that is
+    cancelled (its client disconnected) leaves the others unaffected. The call itself is
+    cancelled once its last caller has gone. Progress events the call reports reach
+    every caller still waiting, and are replayed to callers that join late.
+    """
+
+    def __init__(self):
+        self.stats = SingleFlightStats()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(
+        self,
+        key: Hashable,
+        fn: Callable[[Listener], Awaitable[T]],
+        progress: Optional[Listener] = None
+    ) -> Tuple[T, bool]:
+        """Return fn's result, and whether this caller started fn rather than joining it.
+
+        fn is called with a function that reports a progress event to every caller.
+        """
+        flight = self._flights.get(key)
+        started = flight is None
+        if started:
+            flight = self._flights[key] = _Flight()
+            flight.task = asyncio.ensure_future(fn(flight.report))
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.stats.started += 1
+        else:
+            self.stats.joined += 1
+            if progress:
+                for event in flight.history:
+                    progress(event)
+        if progress:
+            flight.listeners.append(progress)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), started
+        finally:
+            flight.waiters -= 1
+            if progress:
+                flight.listeners.remove(progress)
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody wants the result any more; later callers start afresh
+                self._forget(key, flight)
+                flight.task.cancel()
+                self.stats.cancelled += 1
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
@@ -1,13 +1,48 @@
-import yt_dlp
-from pathlib import Path
-import torch
+import numpy as np
 from abc import ABC, abstractmethod
 from fastapi import UploadFile
 from app.models.transcription import TranscriptionOptions
-from typing import Union, Dict, List, Optional
-from transformers import pipeline, AutoModelForSpeechSeq2Seq, AutoProcessor
-import tempfile
-import os
+from app.config import Settings
+from app.services.inference_pool import InferencePool, InferenceQueueFullError
+from app.services.batching import MicroBatcher
+from app.services.model_registry import MODEL_ALIASES, ModelRegistry
+from app.services.broker import RemoteEngine, broker_authkey
+from app.services.language import DETECTION_WINDOW_S, LanguageDetectionUnsupportedError, detect_loaded_language
+from app.services import metrics
+from app.services.audio import (
+    SAMPLING_RATE,
+    AudioDecodeError,
+    UploadTooLargeError,
+    decode_audio,
+    decode_audio_file,
+    stream_decode_audio,
+    stream_decode_audio_file,
+)
+from app.services.segmentation import MAX_WINDOW_S, Window, find_cut, pack_speech_regions, split_on_silence
+from app.services.vad import EnergyVAD
+from app.services.youtube import YoutubeAudio, resolve_youtube_audio, youtube_video_id
+from app.services.artifacts import ArtifactWriter, AudioArtifactStore
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Union, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import functools
+import math
+import threading
+import time
+
+# Decoded blocks (one second each) buffered between a download and the model
+STREAM_QUEUE_BLOCKS = 64
+
+@dataclass
+class TranscriptionProgress:
+    chunks_done: int
+    chunks_total: int
+    # Output of the chunk that just finished: index, start, end, text and, when
+    # timestamps were requested, segments on the full audio's timeline
+    chunk: Optional[Dict] = None
+
+ProgressCallback = Callable[[TranscriptionProgress], None]
 
 class TranscriptionService(ABC):
     @abstractmethod
@@ -15,94 +50,615 @@ class TranscriptionService(ABC):
         self, 
         source: Union[UploadFile, str], 
         options: TranscriptionOptions,
-        is_youtube: bool = False
+        is_youtube: bool = False,
+        progress: Optional[ProgressCallback] = None
     ) -> Union[str, Dict, List]:
-        """Transcribe an audio file or YouTube video to text"""
+        """Transcribe an audio file or YouTube video to text, reporting progress per chunk"""
         pass
 
+    async def transcribe_array(self, audio: np.ndarray, options: TranscriptionOptions) -> Dict:
+        """Transcribe up to 30 s of already decoded 16 kHz mono audio (used for live audio)"""
+        raise NotImplementedError(f"{type(self).__name__} does not support raw audio input")
+
+    async def detect_language(
+        self,
+        source: Union[UploadFile, str],
+        model: Optional[str] = None,
+        is_youtube: bool = False
+    ) -> Dict:
+        """Identify the language of the first 30 s: language, probability and the top candidates"""
+        raise NotImplementedError(f"{type(self).__name__} does not support language detection")
+
+def _window_pieces(window: Union[Window, List[Window]]) -> List[Window]:
+    return window if isinstance(window, list) else [window]
+
+def _window_audio(audio: np.ndarray, pieces: List[Window]) -> np.ndarray:
+    if len(pieces) == 1:
+        start, end = pieces[0]
+        return audio[start:end]
+    return np.concatenate([audio[start:end] for start, end in pieces])
+
+def _original_time(t: float, pieces: List[Window], sampling_rate: int) -> float:
+    """Map a time within concatenated pieces back onto the full audio's timeline"""
+    elapsed = 0.0
+    for start, end in pieces:
+        length = (end - start) / sampling_rate
+        if t < elapsed + length:
+            return start / sampling_rate + (t - elapsed)
+        elapsed += length
+    return pieces[-1][1] / sampling_rate
+
+# A word ending in one of these, or followed by a pause this long, ends its segment
+SENTENCE_ENDINGS = (".", "?", "!", "。", "？", "！")
+SEGMENT_PAUSE_S = 1.0
+
+def _group_words(words: List[Tuple[float, float, str]]) -> List[Dict]:
+    """Group one window's timed words into sentence-like segments"""
+    segments: List[Dict] = []
+    current: List[Tuple[float, float, str]] = []
+
+    def flush() -> None:
+        segments.append({
+            "start": current[0][0],
+            "end": current[-1][1],
+            # Word texts carry their own leading space, if the language uses them
+            "text": "".join(text for _, _, text in current).strip(),
+            "words": [{"start": start, "end": end, "text": text.strip()} for start, end, text in current],
+        })
+        current.clear()
+
+    for word in words:
+        if current and word[0] - current[-1][1] > SEGMENT_PAUSE_S:
+            flush()
+        current.append(word)
+        if word[2].rstrip().endswith(SENTENCE_ENDINGS):
+            flush()
+    if current:
+        flush()
+    return segments
+
+def merge_window_results(
+    results: List[Dict],
+    windows: List[Union[Window, List[Window]]],
+    sampling_rate: int = SAMPLING_RATE,
+    word_timestamps: bool = False
+) -> Dict:
+    """Join per-window pipeline outputs into one result, shifting timestamps to the full audio.
+
+    A window is either a (start, end) range or a list of ranges that were concatenated
+    into one model input (speech regions with the silence between them removed). With
+    word_timestamps the pipeline's chunks are words, which are grouped into segments.
+    """
+    texts = [result["text"].strip() for result in results]
+    merged = {"text": " ".join(text for text in texts if text)}
+    if any("chunks" in result for result in results):
+        segments = []
+        for result, window in zip(results, windows):
+            pieces = _window_pieces(window)
+            window_end = pieces[-1][1] / sampling_rate
+            spans = []
+            for chunk in result.get("chunks", []):
+                chunk_start, chunk_end = chunk["timestamp"]
+                start = _original_time(chunk_start or 0.0, pieces, sampling_rate)
+                # Whisper leaves the last timestamp open when a window ends mid-speech
+                end = _original_time(chunk_end, pieces, sampling_rate) if chunk_end is not None else window_end
+                spans.append((round(start, 2), round(end, 2), chunk["text"]))
+            if word_timestamps:
+                segments.extend(_group_words(spans))
+            else:
+                segments.extend({"start": start, "end": end, "text": text.strip()} for start, end, text in spans)
+        merged["segments"] = segments
+    return merged
+
 class WhisperTranscriptionService(TranscriptionService):
-    def __init__(self):
-        self.device = "cuda:0" if torch.cuda.is_available() else "cpu"
-        self.torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
-        self.model_id = "distil-whisper/distil-large-v3"
-        
-        # Initialize model for transcription
-        self.model = AutoModelForSpeechSeq2Seq.from_pretrained(
-            self.model_id, 
-            torch_dtype=self.torch_dtype, 
-            low_cpu_mem_usage=True, 
-            use_safetensors=True
+    def __init__(
+        self,
+        settings: Optional[Settings] = None,
+        inference_pool: Optional[InferencePool] = None,
+        registry: Optional[ModelRegistry] = None,
+        youtube_resolver: Callable[[str], YoutubeAudio] = resolve_youtube_audio,
+    ):
+        self.settings = settings or Settings()
+        self.inference_pool = inference_pool or InferencePool(
+            max_workers=self.settings.inference_workers,
+            max_queue_size=self.settings.inference_queue_size,
+            retry_after=self.settings.retry_after_s,
+        )
+        memory_budget_bytes = self.settings.model_memory_budget_mb * 1024**2
+        self.encoder_cache = None
+        self.process_pool = None
+        self.remote_engine = None
+        if registry is None and self.settings.inference_broker:
+            # Models live in the broker process, shared by every HTTP worker; the
+            # engine, assistant model and encoder cache are configured there
+            self.remote_engine = RemoteEngine(self.settings.inference_broker, broker_authkey(self.settings))
+            loader = self.remote_engine.load
+        else:
+            # Imported here: they pull in torch, which a broker client never needs
+            from app.services.encoder_cache import load_with_encoder_cache, shared_encoder_cache
+            from app.services.engines import get_engine_loader
+            from app.services.process_pool import ModelProcessPool
+
+            loader = get_engine_loader(self.settings.inference_engine, self.settings.assistant_model)
+            if self.settings.encoder_cache_mb:
+                encoder_cache_args = (
+                    self.settings.encoder_cache_mb * 1024**2,
+                    self.settings.encoder_cache_dir,
+                    self.settings.encoder_cache_disk_mb * 1024**2,
+                )
+                loader = functools.partial(load_with_encoder_cache, loader, *encoder_cache_args)
+            if registry is None and self.settings.inference_processes:
+                # Long files are split into windows anyway; decode them on every core at once
+                self.process_pool = ModelProcessPool(
+                    self.settings.inference_processes,
+                    loader,
+                    default_model=self.settings.default_model,
+                    allowed_models=[*MODEL_ALIASES.values(), self.settings.default_model],
+                    memory_budget_bytes=memory_budget_bytes,
+                )
+                loader = self.process_pool.load
+            elif self.settings.encoder_cache_mb:
+                # The cache the loader attaches to models in this process; workers keep their own
+                self.encoder_cache = shared_encoder_cache(*encoder_cache_args)
+        # Models are loaded lazily by the registry (or by the app's warm-up), not here
+        self.registry = registry or ModelRegistry(
+            default_model=self.settings.default_model,
+            memory_budget_bytes=memory_budget_bytes,
+            loader=loader,
+        )
+
+        # Requests with matching model and decoding options share pipeline calls, so
+        # chunks from all in-flight requests are batched through the model together
+        self.batcher = MicroBatcher(
+            self._run_batch,
+            max_batch_size=self.settings.batch_max_size,
+            max_wait_ms=self.settings.batch_max_wait_ms,
+        )
+        self.vad = EnergyVAD(SAMPLING_RATE, threshold=self.settings.vad_threshold)
+        # Decoded YouTube audio, so transcribing a video again (e.g. with other options) skips the download
+        self.artifacts = AudioArtifactStore(
+            self.settings.artifact_dir,
+            self.settings.artifact_max_mb * 1024**2,
+        ) if self.settings.artifact_max_mb else None
+
+        # Downloads run on their own workers so a slow network never holds up inference;
+        # each stream occupies one worker, which caps concurrent downloads
+        self.youtube_resolver = youtube_resolver
+        self.download_executor = ThreadPoolExecutor(
+            max_workers=self.settings.max_concurrent_downloads,
+            thread_name_prefix="download",
         )
-        self.model.to(self.device)
-        self.processor = AutoProcessor.from_pretrained(self.model_id)
-        
-        # Pipeline for transcription
-        self.transcriber = pipeline(
-            "automatic-speech-recognition",
-            model=self.model,
-            tokenizer=self.processor.tokenizer,
-            feature_extractor=self.processor.feature_extractor,
-            max_new_tokens=128,
-            torch_dtype=self.torch_dtype,
-            device=self.device,
+
+    async def _run_batch(self, key: tuple, inputs: List[np.ndarray]) -> List[Tuple[Dict, Dict[str, float]]]:
+        """Run one pipeline call over inputs that share the same model and decoding options.
+
+        Each output comes with its input's share of the batch's stage timings.
+        """
+        return await self.inference_pool.run(self._transcribe_inputs, key, inputs)
+
+    def _transcribe_inputs(self, key: tuple, inputs: List[np.ndarray]) -> List[Tuple[Dict, Dict[str, float]]]:
+        model_id, return_timestamps, language = key
+        transcriber = self.registry.get(model_id).transcriber
+        metrics.instrument_pipeline(transcriber)
+        with metrics.batch_stage_times() as times:
+            start = time.perf_counter()
+            results = list(transcriber(
+                # Raw arrays skip the pipeline's own file read and ffmpeg decode
+                [{"raw": audio, "sampling_rate": SAMPLING_RATE} for audio in inputs],
+                # Assisted generation verifies one sequence at a time
+                batch_size=1 if self.settings.assistant_model else self.settings.batch_max_size,
+                return_timestamps=return_timestamps,
+                generate_kwargs={"language": language} if language else {}
+            ))
+            times = dict(times, inference=time.perf_counter() - start)
+        if "encoder" in times:
+            # Whatever generate spent outside the encoder is decoding
+            times["decoder"] = max(0.0, times["inference"] - times["encoder"] - times.get("feature_extraction", 0.0))
+        metrics.observe_batch(times, len(inputs))
+        share = {stage: seconds / len(inputs) for stage, seconds in times.items()}
+        return [(result, share) for result in results]
+
+    async def _submit(self, batch_key: tuple, audio: np.ndarray) -> Dict:
+        """Transcribe one window through the batcher, adding its share of the batch to the request's timings"""
+        result, share = await self.batcher.submit(batch_key, audio)
+        for stage, seconds in share.items():
+            metrics.add_stage_time(stage, seconds)
+        return result
+
+    def _batch_key(self, options: TranscriptionOptions) -> tuple:
+        return (
+            self.registry.resolve(options.model),
+            # The pipeline's chunks are then words instead of segments
+            "word" if options.word_timestamps else options.return_timestamps,
+            options.language,
         )
 
-    async def _download_youtube_audio(self, url: str) -> tuple[str, str]:
-        """Download audio from YouTube video and return path to audio file and video title"""
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': '192',
-            }],
-            'outtmpl': '%(title)s.%(ext)s',
-        }
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
-            video_title = info['title']
-            audio_path = Path(f"{video_title}.mp3")
-            return str(audio_path), video_title
+    async def transcribe_array(self, audio: np.ndarray, options: TranscriptionOptions) -> Dict:
+        # Admitted like any request, so live decodes count against the queue and are turned
+        # away when it is full; the batcher lets them share forward passes with other requests
+        async with self.inference_pool.slot():
+            result = await self._submit(self._batch_key(options), audio)
+        metrics.AUDIO_SECONDS.labels("live").inc(len(audio) / SAMPLING_RATE)
+        return result
+
+    def _detect_language_sync(self, model_id: str, audio: np.ndarray) -> Dict:
+        return detect_loaded_language(self.registry.get(model_id), audio)
+
+    async def _identify_language(self, model_id: str, audio: np.ndarray) -> Optional[Dict]:
+        """Language of a request's first window, or None when the model cannot identify languages"""
+        with metrics.stage("language_detection"):
+            try:
+                return await self.inference_pool.run(self._detect_language_sync, model_id, audio)
+            except LanguageDetectionUnsupportedError:
+                return None
+
+    async def _transcribe_windows(
+        self,
+        windows: AsyncIterator[Tuple[List[Window], np.ndarray]],
+        batch_key: tuple,
+        chunks_total: int,
+        progress: Optional[ProgressCallback] = None
+    ) -> Tuple[Dict, List[List[Window]]]:
+        """Submit each window for inference as soon as it is produced, reporting each finished window.
+
+        At most as many windows as the inference workers can batch at once are in flight,
+        so the producer (e.g. a download) is only read as fast as the model keeps up and
+        decoded audio does not pile up in memory. With a progress callback, windows in
+        flight are further capped at one more than have finished: the first window runs
+        alone so its chunk arrives after one window's inference, and batches then double
+        in size up to that limit.
+        chunks_total is an estimate while windows are still being produced (e.g. from a
+        video's duration) and exact once they all are. Returns the merged result and the
+        windows, as lists of (start, end) ranges on the full audio's timeline.
+        """
+        word_timestamps = batch_key[1] == "word"
+        detection = None
+        produced: List[List[Window]] = []
+        tasks: List[asyncio.Future] = []
+        done = 0
+        max_in_flight = self.settings.batch_max_size * self.settings.inference_workers
+        if progress:
+            progress(TranscriptionProgress(done, chunks_total))
+
+        async def transcribe_window(index: int, pieces: List[Window], audio: np.ndarray) -> Dict:
+            nonlocal done
+            result = await self._submit(batch_key, audio)
+            done += 1
+            if progress:
+                chunk = {
+                    "index": index,
+                    "start": round(pieces[0][0] / SAMPLING_RATE, 2),
+                    "end": round(pieces[-1][1] / SAMPLING_RATE, 2),
+                    **merge_window_results([result], [pieces], word_timestamps=word_timestamps),
+                }
+                progress(TranscriptionProgress(done, max(chunks_total, len(produced)), chunk))
+            return result
+
+        async def wait_for_slot() -> None:
+            while True:
+                in_flight = [task for task in tasks if not task.done()]
+                limit = max_in_flight
+                if progress:
+                    limit = min(limit, len(tasks) - len(in_flight) + 1)
+                if len(in_flight) < limit:
+                    return
+                finished, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    # Stop submitting once a window has failed
+                    task.result()
+
+        try:
+            with metrics.stage("transcription"):
+                async for pieces, audio in windows:
+                    await wait_for_slot()
+                    if not produced and batch_key[2] is None and self.settings.language_detection:
+                        # Identified once up front, so no window is decoded in a misdetected language
+                        detection = await self._identify_language(batch_key[0], audio)
+                        if detection:
+                            batch_key = (*batch_key[:2], detection["language"])
+                    tasks.append(asyncio.ensure_future(transcribe_window(len(produced), pieces, audio)))
+                    produced.append(pieces)
+                chunks_total = len(produced)
+                results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        merged = merge_window_results(list(results), produced, word_timestamps=word_timestamps)
+        if batch_key[2]:
+            merged["language"] = batch_key[2]
+        if detection:
+            merged["language_probability"] = detection["probability"]
+        return merged, produced
+
+    async def _transcribe_audio(
+        self,
+        audio: np.ndarray,
+        options: TranscriptionOptions,
+        batch_key: tuple,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """Transcribe fully decoded audio window by window"""
+        # Whisper sees at most 30 s at a time; cutting at quiet points keeps words whole
+        max_window_s = min(options.chunk_length_s, MAX_WINDOW_S)
+        with metrics.stage("segmentation"):
+            if options.vad:
+                # Only speech reaches the model: regions are packed into windows with the
+                # silence between them cut out, so cost follows speech duration
+                regions = await asyncio.to_thread(self.vad.speech_regions, audio)
+                windows = pack_speech_regions(audio, regions, SAMPLING_RATE, max_window_s)
+            else:
+                windows = [[window] for window in split_on_silence(audio, SAMPLING_RATE, max_window_s)]
+
+        async def window_audio() -> AsyncIterator[Tuple[List[Window], np.ndarray]]:
+            for pieces in windows:
+                yield pieces, _window_audio(audio, pieces)
+
+        metrics.record_audio(len(audio) / SAMPLING_RATE)
+        merged, _ = await self._transcribe_windows(window_audio(), batch_key, len(windows), progress)
+        if options.vad:
+            speech_samples = sum(end - start for pieces in windows for start, end in pieces)
+            merged["silence_skipped_s"] = round((len(audio) - speech_samples) / SAMPLING_RATE, 2)
+        return merged
+
+    async def _transcribe_stream(
+        self,
+        blocks: AsyncIterator[np.ndarray],
+        options: TranscriptionOptions,
+        batch_key: tuple,
+        progress: Optional[ProgressCallback] = None,
+        duration_s: Optional[float] = None
+    ) -> Dict:
+        """Transcribe audio while it is still being decoded.
+
+        A window is cut and sent to the model as soon as enough audio has arrived, so
+        download, decode and inference overlap. Only the audio after the last cut is
+        kept in memory.
+        """
+        max_window_s = min(options.chunk_length_s, MAX_WINDOW_S)
+        max_window = int(max_window_s * SAMPLING_RATE)
+
+        async def windows() -> AsyncIterator[Tuple[List[Window], np.ndarray]]:
+            pending = np.zeros(0, dtype=np.float32)
+            offset = 0
+            async for block in blocks:
+                pending = np.concatenate([pending, block])
+                while len(pending) > max_window:
+                    cut = find_cut(pending[:max_window], SAMPLING_RATE)
+                    yield [(offset, offset + cut)], pending[:cut]
+                    offset += cut
+                    pending = pending[cut:]
+            if len(pending):
+                yield [(offset, offset + len(pending))], pending
+            metrics.record_audio((offset + len(pending)) / SAMPLING_RATE)
+
+        estimate = math.ceil(duration_s / max_window_s) if duration_s else 0
+        merged, _ = await self._transcribe_windows(windows(), batch_key, estimate, progress)
+        return merged
+
+    def _produce_blocks(
+        self,
+        blocks: Iterator[np.ndarray],
+        queue: asyncio.Queue,
+        loop: asyncio.AbstractEventLoop,
+        stop: threading.Event,
+        writer: Optional[ArtifactWriter] = None
+    ) -> None:
+        """Move decoded blocks into queue (and writer, if given); runs on a worker thread"""
+        committed = False
+        try:
+            for block in blocks:
+                if writer is not None:
+                    writer.write(block)
+                # Blocks while the queue is full; windows in flight are bounded, so the queue
+                # fills and a slow model slows the download down
+                asyncio.run_coroutine_threadsafe(queue.put(block), loop).result()
+                if stop.is_set():
+                    break
+            else:
+                if writer is not None:
+                    writer.commit()
+                    committed = True
+        finally:
+            blocks.close()
+            # Only complete downloads are stored
+            if writer is not None and not committed:
+                writer.abort()
+
+    async def _stream_blocks(
+        self,
+        blocks: Iterator[np.ndarray],
+        stage: str,
+        executor: Optional[ThreadPoolExecutor] = None,
+        writer: Optional[ArtifactWriter] = None,
+        on_done: Optional[Callable[[], None]] = None
+    ) -> AsyncIterator[np.ndarray]:
+        """Yield decoded blocks as a worker thread pulls them from ffmpeg.
+
+        Time spent on them is recorded under stage. on_done is called once decoding has
+        ended, successfully or not.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_BLOCKS)
+        stop = threading.Event()
+        producer = loop.run_in_executor(executor, self._produce_blocks, blocks, queue, loop, stop, writer)
+        try:
+            # Includes the little time the consumer spends between blocks
+            with metrics.stage(stage):
+                while True:
+                    get = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({get, producer}, return_when=asyncio.FIRST_COMPLETED)
+                    if get.done():
+                        yield get.result()
+                        continue
+                    get.cancel()
+                    while not queue.empty():
+                        yield queue.get_nowait()
+                    # Raises the decode error, if the stream failed
+                    producer.result()
+                    return
+        finally:
+            # Unblock and stop the producer if transcription ended early
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+            if on_done is not None:
+                on_done()
+
+    def _youtube_blocks(
+        self,
+        youtube_audio: YoutubeAudio,
+        writer: Optional[ArtifactWriter] = None,
+        on_done: Optional[Callable[[], None]] = None
+    ) -> AsyncIterator[np.ndarray]:
+        """Decoded blocks of a YouTube audio stream as it downloads; each stream occupies a download worker"""
+        blocks = stream_decode_audio(youtube_audio.url, youtube_audio.http_headers)
+        return self._stream_blocks(blocks, "download_decode", self.download_executor, writer, on_done)
+
+    async def _resolve_youtube(self, url: str) -> YoutubeAudio:
+        loop = asyncio.get_running_loop()
+        with metrics.stage("resolve"):
+            return await loop.run_in_executor(self.download_executor, self.youtube_resolver, url)
+
+    async def _transcribe_youtube_audio(
+        self,
+        youtube_audio: YoutubeAudio,
+        options: TranscriptionOptions,
+        batch_key: tuple,
+        progress: Optional[ProgressCallback] = None,
+        writer: Optional[ArtifactWriter] = None,
+        on_done: Optional[Callable[[], None]] = None
+    ) -> Dict:
+        blocks = self._youtube_blocks(youtube_audio, writer, on_done)
+        if options.vad:
+            # Packing speech regions needs all of them, so decode everything first
+            audio = np.concatenate([block async for block in blocks])
+            result = await self._transcribe_audio(audio, options, batch_key, progress)
+        else:
+            result = await self._transcribe_stream(
+                blocks, options, batch_key, progress, duration_s=youtube_audio.duration_s,
+            )
+        result['video_title'] = youtube_audio.title
+        return result
+
+    async def _transcribe_youtube(
+        self,
+        url: str,
+        options: TranscriptionOptions,
+        batch_key: tuple,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """Transcribe a YouTube video from the artifact store, or download it into the store while transcribing"""
+        video_id = youtube_video_id(url) if self.artifacts is not None else None
+        if video_id is None:
+            return await self._transcribe_youtube_audio(await self._resolve_youtube(url), options, batch_key, progress)
+
+        # Requests for the same video wait here while the first one downloads it. The lock
+        # is released once the download is stored, not when that first transcription ends
+        lock = self.artifacts.lock(video_id)
+        await lock.acquire()
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                lock.release()
+
+        try:
+            artifact = self.artifacts.get(video_id)
+            if artifact is None:
+                youtube_audio = await self._resolve_youtube(url)
+                writer = self.artifacts.writer(
+                    video_id, {"title": youtube_audio.title, "duration_s": youtube_audio.duration_s}
+                )
+                return await self._transcribe_youtube_audio(youtube_audio, options, batch_key, progress, writer, release)
+        finally:
+            release()
+        result = await self._transcribe_audio(artifact.audio, options, batch_key, progress)
+        result['video_title'] = artifact.meta["title"]
+        return result
+
+    def _check_upload_size(self, upload: UploadFile) -> None:
+        # Oversized requests are normally turned away by UploadSizeLimitMiddleware before
+        # parsing; this catches those sent without a Content-Length
+        max_bytes = self.settings.max_upload_mb * 1024**2
+        if upload.size is not None and upload.size > max_bytes:
+            raise UploadTooLargeError(max_bytes)
+
+    async def _load_upload_audio(self, upload: UploadFile, max_duration_s: Optional[float] = None) -> np.ndarray:
+        """Decode an upload (or only its start) to one 16 kHz float32 array.
+
+        ffmpeg reads the file the multipart parser already wrote rather than a copy of it.
+        """
+        self._check_upload_size(upload)
+        with metrics.stage("decode"):
+            return await asyncio.to_thread(decode_audio_file, upload.file, max_duration_s=max_duration_s)
+
+    async def _transcribe_upload(
+        self,
+        upload: UploadFile,
+        options: TranscriptionOptions,
+        batch_key: tuple,
+        progress: Optional[ProgressCallback] = None
+    ) -> Dict:
+        """Transcribe an upload while ffmpeg decodes it, so memory stays bounded however long it is"""
+        if options.vad:
+            # Packing speech regions needs all of them, so decode everything first
+            audio = await self._load_upload_audio(upload)
+            return await self._transcribe_audio(audio, options, batch_key, progress)
+        self._check_upload_size(upload)
+        blocks = self._stream_blocks(stream_decode_audio_file(upload.file), "decode")
+        return await self._transcribe_stream(blocks, options, batch_key, progress)
 
     async def transcribe(
         self, 
         source: Union[UploadFile, str], 
         options: TranscriptionOptions,
-        is_youtube: bool = False
+        is_youtube: bool = False,
+        progress: Optional[ProgressCallback] = None
     ) -> Union[str, Dict, List]:
+        # Reject unknown models before doing any download or upload work
+        batch_key = self._batch_key(options)
+        timings = metrics.StageTimings()
+        token = metrics.current_timings.set(timings)
         try:
-            if is_youtube:
-                audio_path, video_title = await self._download_youtube_audio(source)
-                try:
-                    result = self.transcriber(
-                        audio_path,
-                        chunk_length_s=options.chunk_length_s,
-                        return_timestamps=options.return_timestamps,
-                        generate_kwargs={"language": options.language} if options.language else {}
-                    )
-                    if isinstance(result, dict):
-                        result['video_title'] = video_title
-                    return result
-                finally:
-                    # Clean up downloaded file
-                    Path(audio_path).unlink(missing_ok=True)
-            else:
-                # Existing file upload logic
-                with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-                    content = await source.read()
-                    temp_file.write(content)
-                    temp_file.flush()
-                    
-                    try:
-                        return self.transcriber(
-                            temp_file.name,
-                            chunk_length_s=options.chunk_length_s,
-                            return_timestamps=options.return_timestamps,
-                            generate_kwargs={"language": options.language} if options.language else {}
-                        )
-                    finally:
-                        os.unlink(temp_file.name)
+            async with self.inference_pool.slot():
+                if is_youtube:
+                    result = await self._transcribe_youtube(source, options, batch_key, progress)
+                else:
+                    result = await self._transcribe_upload(source, options, batch_key, progress)
+        except (InferenceQueueFullError, UploadTooLargeError, AudioDecodeError):
+            raise
         except Exception as e:
             raise RuntimeError(f"Transcription failed: {str(e)}")
+        finally:
+            metrics.current_timings.reset(token)
+        metrics.observe_request(timings, "youtube" if is_youtube else "upload")
+        if options.debug:
+            result["debug"] = timings.report()
+        return result
 
+    async def detect_language(
+        self,
+        source: Union[UploadFile, str],
+        model: Optional[str] = None,
+        is_youtube: bool = False
+    ) -> Dict:
+        model_id = self.registry.resolve(model)
+        async with self.inference_pool.slot():
+            # Only the first window is decoded, and for YouTube only that much is downloaded
+            video_id = youtube_video_id(source) if is_youtube and self.artifacts is not None else None
+            artifact = self.artifacts.get(video_id) if video_id else None
+            if artifact is not None:
+                audio = artifact.audio[:DETECTION_WINDOW_S * SAMPLING_RATE]
+            elif is_youtube:
+                youtube_audio = await self._resolve_youtube(source)
+                loop = asyncio.get_running_loop()
+                audio = await loop.run_in_executor(self.download_executor, functools.partial(
+                    decode_audio, youtube_audio.url,
+                    headers=youtube_audio.http_headers, max_duration_s=DETECTION_WINDOW_S,
+                ))
+            else:
+                audio = await self._load_upload_audio(source, max_duration_s=DETECTION_WINDOW_S)
+            return await self.inference_pool.run(self._detect_language_sync, model_id, audio)
@@ -0,0 +1,65 @@
+from typing import List
+import numpy as np
+from app.services.segmentation import Window, frame_energies
+
+class EnergyVAD:
+    """Frame-level voice activity detection by RMS energy.
+
+    Cheap enough to run on every incoming audio frame. A frame counts as speech when
+    its RMS energy exceeds threshold (0.01 is roughly -40 dBFS).
+    """
+
+    def __init__(self, sampling_rate: int, threshold: float = 0.01, frame_ms: int = 30):
+        self.sampling_rate = sampling_rate
+        self.threshold = threshold
+        self.frame_length = max(1, sampling_rate * frame_ms // 1000)
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """One boolean per whole frame of audio: True where the frame is speech"""
+        return frame_energies(audio, self.frame_length) > self.threshold
+
+    def has_speech(self, audio: np.ndarray, min_speech_s: float = 0.1) -> bool:
+        min_frames = max(1, int(min_speech_s * self.sampling_rate / self.frame_length))
+        return int(self.speech_mask(audio).sum()) >= min_frames
+
+    def trailing_silence_s(self, audio: np.ndarray) -> float:
+        """Length of the silence at the end of audio, in seconds"""
+        mask = self.speech_mask(audio)
+        speech_frames = np.flatnonzero(mask)
+        silent_frames = len(mask) - (speech_frames[-1] + 1 if len(speech_frames) else 0)
+        return silent_frames * self.frame_length / self.sampling_rate
+
+    def speech_regions(
+        self,
+        audio: np.ndarray,
+        min_silence_s: float = 0.5,
+        padding_s: float = 0.2,
+        min_speech_s: float = 0.1,
+    ) -> List[Window]:
+        """(start, end) sample ranges of speech, in order.
+
+        Pauses shorter than min_silence_s are kept inside a region, each region is padded
+        by padding_s on both sides so word onsets and endings survive, and bursts shorter
+        than min_speech_s (clicks, bumps) are dropped.
+        """
+        speech_frames = np.flatnonzero(self.speech_mask(audio))
+        if len(speech_frames) == 0:
+            return []
+        max_gap = int(min_silence_s * self.sampling_rate / self.frame_length)
+        breaks = np.flatnonzero(np.diff(speech_frames) > max_gap + 1)
+        first_frames = speech_frames[np.concatenate([[0], breaks + 1])]
+        last_frames = speech_frames[np.concatenate([breaks, [len(speech_frames) - 1]])]
+
+        min_frames = max(1, int(min_speech_s * self.sampling_rate / self.frame_length))
+        padding = int(padding_s * self.sampling_rate)
+        regions: List[Window] = []
+        for first, last in zip(first_frames, last_frames):
+            if last - first + 1 < min_frames:
+                continue
+            start = max(0, int(first) * self.frame_length - padding)
+            end = min(len(audio), (int(last) + 1) * self.frame_length + padding)
+            if regions and start <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], end)
+            else:
+                regions.append((start, end))
+        return regions
@@ -0,0 +1,78 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+import yt_dlp
+
+@dataclass
+class YoutubeAudio:
+    # Direct URL of the audio stream, readable by ffmpeg
+    url: str
+    title: str
+    duration_s: Optional[float] = None
+    # Headers the stream must be requested with (YouTube rejects some requests without them)
+    http_headers: Dict[str, str] = field(default_factory=dict)
+
+def resolve_youtube_audio(url: str) -> YoutubeAudio:
+    """Look up the best audio stream of a video without downloading it"""
+    ydl_opts = {
+        'format': 'bestaudio/best',
+        'quiet': True,
+        'noplaylist': True,
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        return YoutubeAudio(
+            url=info['url'],
+            title=info.get('title') or '',
+            duration_s=info.get('duration'),
+            http_headers=info.get('http_headers') or {},
+        )
+
+# Every YouTube video ID is 11 characters of the URL-safe base64 alphabet
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+def _is_youtube_host(host: str) -> bool:
+    return host == "youtube.com" or host.endswith(".youtube.com")
+
+def youtube_video_id(url: str) -> Optional[str]:
+    """Extract the canonical video ID from the common YouTube URL forms.
+
+    The ID keys cached results and stored audio, so anything that is not a
+    well-formed ID on a YouTube host yields None.
+    """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    video_id = None
+    if host == "youtu.be":
+        video_id = parsed.path.lstrip("/").split("/")[0]
+    elif _is_youtube_host(host):
+        if parsed.path == "/watch":
+            video_id = parse_qs(parsed.query).get("v", [None])[0]
+        else:
+            parts = parsed.path.strip("/").split("/")
+            if len(parts) >= 2 and parts[0] in ("shorts", "embed", "live", "v"):
+                video_id = parts[1]
+    return video_id if video_id and VIDEO_ID_PATTERN.match(video_id) else None
+
+def is_playlist_url(url: str) -> bool:
+    """Whether a URL names a YouTube playlist rather than a single video"""
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    return _is_youtube_host(host) and parsed.path == "/playlist" and "list" in parse_qs(parsed.query)
+
+def expand_playlist(url: str) -> List[str]:
+    """Watch URLs of every video in a playlist, listed without resolving each video"""
+    ydl_opts = {
+        'quiet': True,
+        'extract_flat': 'in_playlist',
+    }
+
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(url, download=False)
+        return [
+            f"https://www.youtube.com/watch?v={entry['id']}"
+            for entry in info.get('entries') or []
+            if entry and entry.get('id')
+        ]
@@ -0,0 +1,64 @@
+"""Compare two benchmark reports written by benchmarks.run.
+
+    python -m benchmarks.compare base.json head.json --threshold 0.1
+
+Exits with status 1 when any latency or real-time factor got worse by more than the
+threshold (a fraction), so it can gate CI.
+"""
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Lower is better for all of these
+COMPARED_METRICS = ["latency_p50_s", "latency_p95_s", "rtf"]
+
+def result_key(result: dict) -> str:
+    return f"{result['target']}/{result['audio']}/{result['duration_s']:g}s/c{result['concurrency']}"
+
+def compare(base: dict, head: dict, threshold: float = 0.1) -> Tuple[List[dict], List[dict]]:
+    """Relative change of each metric for results present in both reports, and the regressions among them"""
+    base_results: Dict[str, dict] = {result_key(r): r for r in base["results"]}
+    rows, regressions = [], []
+    for result in head["results"]:
+        key = result_key(result)
+        if key not in base_results:
+            continue
+        for metric in COMPARED_METRICS:
+            before, after = base_results[key][metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            row = {"key": key, "metric": metric, "base": before, "head": after, "change": change}
+            rows.append(row)
+            if change > threshold:
+                regressions.append(row)
+    for metric in ("model_load_s", "peak_rss_mb"):
+        before, after = base[metric], head[metric]
+        change = (after - before) / before if before else 0.0
+        row = {"key": "overall", "metric": metric, "base": before, "head": after, "change": change}
+        rows.append(row)
+        if change > threshold:
+            regressions.append(row)
+    return rows, regressions
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports")
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Relative slowdown counted as a regression (default: 0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    rows, regressions = compare(base, head, args.threshold)
+
+    print(f"{base['meta'].get('commit')} -> {head['meta'].get('commit')}")
+    for row in rows:
+        flag = "  REGRESSION" if row in regressions else ""
+        print(f"{row['key']:<40} {row['metric']:<14} {row['base']:>10.4g} {row['head']:>10.4g} {row['change']:>+8.1%}{flag}")
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Performance benchmarks for the transcription service.
+
+Measures model load time, latency percentiles, real-time factor, throughput and peak
+memory, both calling WhisperTranscriptionService directly and through the HTTP routes,
+and writes the results as JSON for comparison between commits:
+
+    python -m benchmarks.run --model openai/whisper-tiny --durations 10,60 --concurrency 1,4 -o head.json
+    python -m benchmarks.compare base.json head.json
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import time
+import wave
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+import httpx
+import numpy as np
+from fastapi import FastAPI, UploadFile
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.routers.transcription import create_router
+from app.services.audio import SAMPLING_RATE
+from app.services.transcription_service import WhisperTranscriptionService
+from benchmarks.compare import result_key
+
+@dataclass
+class BenchmarkResult:
+    # "service" calls WhisperTranscriptionService.transcribe; "http" posts to /api/v1/transcribe
+    target: str
+    audio: str
+    duration_s: float
+    concurrency: int
+    requests: int
+    latency_p50_s: float
+    latency_p95_s: float
+    latency_p99_s: float
+    # Median processing time per second of audio; below 1 is faster than real time
+    rtf: float
+    # Seconds of audio transcribed per wall-clock second, across all concurrent requests
+    throughput_audio_s_per_s: float
+    requests_per_s: float
+
+    @property
+    def key(self) -> str:
+        """The key benchmarks.compare matches results between reports by"""
+        return result_key(asdict(self))
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linear-interpolation percentile (q in 0..100) of a non-empty sequence"""
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024**2 if platform.system() == "Darwin" else 1024)
+
+def synthetic_speech(duration_s: float, seed: int = 0) -> np.ndarray:
+    """Syllable-like harmonic bursts separated by short pauses, so windows are cut at silences"""
+    rng = np.random.default_rng(seed)
+    audio = np.zeros(int(duration_s * SAMPLING_RATE), dtype=np.float32)
+    position = 0
+    while position < len(audio):
+        length = int(rng.uniform(0.15, 0.4) * SAMPLING_RATE)
+        t = np.arange(min(length, len(audio) - position)) / SAMPLING_RATE
+        pitch = rng.uniform(100, 250)
+        burst = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        audio[position:position + len(t)] = 0.2 * burst * np.hanning(len(t))
+        position += length + int(rng.choice([0.05, 0.1, 0.6]) * SAMPLING_RATE)
+    return audio
+
+def load_audio_file(path: str, duration_s: float) -> np.ndarray:
+    """A recording decoded to 16 kHz, looped or trimmed to duration_s"""
+    from app.services.audio import decode_audio
+
+    audio = decode_audio(path)
+    repeats = int(np.ceil(duration_s * SAMPLING_RATE / len(audio)))
+    return np.tile(audio, repeats)[:int(duration_s * SAMPLING_RATE)]
+
+def to_wav_bytes(audio: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLING_RATE)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+async def measure(request, concurrency: int, requests: int) -> tuple[List[float], float]:
+    """Run requests calls of request() with at most concurrency in flight; returns latencies and wall time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed():
+        async with semaphore:
+            start = time.perf_counter()
+            await request()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(timed() for _ in range(requests)))
+    return latencies, time.perf_counter() - start
+
+def summarize(target: str, audio: str, duration_s: float, concurrency: int,
+              latencies: List[float], wall_s: float) -> BenchmarkResult:
+    return BenchmarkResult(
+        target=target,
+        audio=audio,
+        duration_s=duration_s,
+        concurrency=concurrency,
+        requests=len(latencies),
+        latency_p50_s=round(percentile(latencies, 50), 4),
+        latency_p95_s=round(percentile(latencies, 95), 4),
+        latency_p99_s=round(percentile(latencies, 99), 4),
+        rtf=round(statistics.median(latencies) / duration_s, 4),
+        throughput_audio_s_per_s=round(duration_s * len(latencies) / wall_s, 3),
+        requests_per_s=round(len(latencies) / wall_s, 3),
+    )
+
+async def benchmark_service(
+    service: WhisperTranscriptionService,
+    clips: Dict[str, bytes],
+    durations: Dict[str, float],
+    concurrency_levels: Sequence[int],
+    requests: int,
+    targets: Sequence[str] = ("service", "http"),
+    warm_up_requests: int = 1,
+) -> List[BenchmarkResult]:
+    """Benchmark every clip at every concurrency level against each target"""
+    app = FastAPI()
+    app.include_router(create_router(service), prefix="/api/v1")
+    results = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, wav in clips.items():
+            async def call_service():
+                await service.transcribe(UploadFile(file=io.BytesIO(wav), filename=f"{name}.wav"), TranscriptionOptions())
+
+            async def call_http():
+                response = await client.post(
+                    "/api/v1/transcribe",
+                    files={"file": (f"{name}.wav", wav, "audio/wav")},
+                    timeout=None,
+                )
+                response.raise_for_status()
+
+            calls = {"service": call_service, "http": call_http}
+            for target in targets:
+                # Untimed runs first, so one-off costs (lazy loads, allocator growth) are not measured
+                for _ in range(warm_up_requests):
+                    await calls[target]()
+                for concurrency in concurrency_levels:
+                    latencies, wall_s = await measure(calls[target], concurrency, max(requests, concurrency))
+                    results.append(summarize(target, name, durations[name], concurrency, latencies, wall_s))
+    return results
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(args: argparse.Namespace) -> dict:
+    settings = Settings.from_env().model_copy(update={
+        "default_model": args.model,
+        "inference_engine": args.engine,
+        "assistant_model": args.assistant_model,
+        "inference_workers": max(args.concurrency),
+        # Let every concurrent request in; rejections would skew latencies
+        "inference_queue_size": max(args.concurrency) * 2,
+        # The same clips are sent over and over; every request must reach the model
+        "encoder_cache_mb": 0,
+        "artifact_max_mb": 0,
+    })
+    service = WhisperTranscriptionService(settings)
+
+    start = time.perf_counter()
+    service.registry.warm_up()
+    model_load_s = time.perf_counter() - start
+
+    clips, durations = {}, {}
+    for duration_s in args.durations:
+        clips[f"synthetic-{duration_s:g}s"] = to_wav_bytes(synthetic_speech(duration_s))
+        durations[f"synthetic-{duration_s:g}s"] = duration_s
+        for path in args.audio:
+            name = f"{os.path.splitext(os.path.basename(path))[0]}-{duration_s:g}s"
+            clips[name] = to_wav_bytes(load_audio_file(path, duration_s))
+            durations[name] = duration_s
+
+    try:
+        results = asyncio.run(benchmark_service(
+            service, clips, durations, args.concurrency, args.requests, args.targets
+        ))
+    finally:
+        service.inference_pool.shutdown(wait=False)
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "model": args.model,
+            "engine": args.engine,
+            "assistant_model": args.assistant_model,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "model_load_s": round(model_load_s, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": [asdict(result) for result in results],
+    }
+
+def parse_list(value: str, cast=float) -> list:
+    return [cast(item) for item in value.split(",") if item]
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the transcription service")
+    parser.add_argument("--model", default="openai/whisper-tiny", help="Model to benchmark")
+    parser.add_argument("--engine", default="transformers", choices=["transformers", "int8", "onnx"])
+    parser.add_argument("--assistant-model", default="",
+                        help="Draft model for speculative decoding (default: none)")
+    parser.add_argument("--durations", type=parse_list, default=[5.0, 30.0, 120.0],
+                        help="Comma-separated audio lengths in seconds")
+    parser.add_argument("--audio", action="append", default=[],
+                        help="Recording to benchmark as well, looped or trimmed to each duration (repeatable)")
+    parser.add_argument("--concurrency", type=lambda v: parse_list(v, int), default=[1, 4],
+                        help="Comma-separated numbers of requests in flight")
+    parser.add_argument("--requests", type=int, default=8, help="Timed requests per measurement")
+    parser.add_argument("--targets", type=lambda v: parse_list(v, str), default=["service", "http"],
+                        help="Comma-separated targets: service, http")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Speculative decoding benchmark: the same model with and without an assistant model.
+
+Transcribes each clip with plain greedy decoding and with a small draft model proposing
+tokens, reports the median latency of both and the speedup, and checks that the
+transcripts are identical:
+
+    python -m benchmarks.speculative --model openai/whisper-large-v3 \\
+        --assistant-model distil-whisper/distil-large-v3 --audio speech.wav -o speculative.json
+
+Exits with status 1 if any transcript differs. Use real speech: on noise or silence
+the models agree on almost nothing and drafting only adds work.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from app.services.audio import SAMPLING_RATE
+from app.services.engines import get_engine_loader
+from benchmarks.run import git_commit, load_audio_file, parse_list, peak_rss_mb, synthetic_speech
+
+@dataclass
+class SpeculativeResult:
+    audio: str
+    duration_s: float
+    baseline_p50_s: float
+    assisted_p50_s: float
+    # Baseline latency divided by assisted latency; above 1 means drafting helped
+    speedup: float
+    identical: bool
+
+def time_transcriber(transcriber, audio: np.ndarray, repeats: int) -> tuple[List[float], str]:
+    """Latencies of repeats calls (after one untimed warm-up call) and the transcript"""
+    inputs = {"raw": audio, "sampling_rate": SAMPLING_RATE}
+    text = transcriber(dict(inputs), batch_size=1)["text"]
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        transcriber(dict(inputs), batch_size=1)
+        latencies.append(time.perf_counter() - start)
+    return latencies, text
+
+def compare_decoding(baseline, assisted, clips: Dict[str, np.ndarray], repeats: int) -> List[SpeculativeResult]:
+    results = []
+    for name, audio in clips.items():
+        baseline_latencies, baseline_text = time_transcriber(baseline, audio, repeats)
+        assisted_latencies, assisted_text = time_transcriber(assisted, audio, repeats)
+        baseline_p50 = statistics.median(baseline_latencies)
+        assisted_p50 = statistics.median(assisted_latencies)
+        results.append(SpeculativeResult(
+            audio=name,
+            duration_s=round(len(audio) / SAMPLING_RATE, 2),
+            baseline_p50_s=round(baseline_p50, 4),
+            assisted_p50_s=round(assisted_p50, 4),
+            speedup=round(baseline_p50 / assisted_p50, 3),
+            identical=baseline_text == assisted_text,
+        ))
+    return results
+
+def run(args: argparse.Namespace) -> dict:
+    start = time.perf_counter()
+    baseline = get_engine_loader(args.engine)(args.model)
+    assisted = get_engine_loader(args.engine, args.assistant_model)(args.model)
+    load_s = time.perf_counter() - start
+
+    clips = {}
+    for duration_s in args.durations:
+        clips[f"synthetic-{duration_s:g}s"] = synthetic_speech(duration_s)
+        for path in args.audio:
+            clips[f"{os.path.splitext(os.path.basename(path))[0]}-{duration_s:g}s"] = load_audio_file(path, duration_s)
+
+    results = compare_decoding(baseline.transcriber, assisted.transcriber, clips, args.repeats)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "model": args.model,
+            "assistant_model": args.assistant_model,
+            "engine": args.engine,
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "model_load_s": round(load_s, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "results": [asdict(result) for result in results],
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark speculative decoding against plain greedy decoding")
+    parser.add_argument("--model", default="openai/whisper-large-v3", help="Model to speed up")
+    parser.add_argument("--assistant-model", default="distil-whisper/distil-large-v3",
+                        help="Draft model; must share the main model's tokenizer")
+    parser.add_argument("--engine", default="transformers", choices=["transformers", "int8"])
+    parser.add_argument("--durations", type=parse_list, default=[10.0, 30.0],
+                        help="Comma-separated clip lengths in seconds (at most 30: one model window)")
+    parser.add_argument("--audio", action="append", default=[],
+                        help="Recording to benchmark, looped or trimmed to each duration (repeatable)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per clip and mode")
+    parser.add_argument("-o", "--output", help="Write results to this JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+    if max(args.durations) > 30:
+        parser.error("durations must be at most 30 s")
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for result in report["results"]:
+        print(f"{result['audio']:<30} {result['baseline_p50_s']:>8.3f}s {result['assisted_p50_s']:>8.3f}s "
+              f"x{result['speedup']:<6} {'identical' if result['identical'] else 'DIFFERENT'}")
+    raise SystemExit(0 if all(result["identical"] for result in report["results"]) else 1)
+
+if __name__ == "__main__":
+    main()
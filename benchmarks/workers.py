@@ -0,0 +1,181 @@
+"""Memory against HTTP worker count, with models in every worker or in one inference broker.
+
+Starts `uvicorn app.main:app --workers N` for each N, once loading the model in every
+worker ("inprocess") and once with the workers forwarding to `python -m app.services.broker`
+("broker"), drives concurrent requests through it, and reports the memory of the whole
+process tree next to throughput and latency:
+
+    python -m benchmarks.workers --model openai/whisper-tiny --workers 1,2,4 -o workers.json
+
+RSS counts shared pages (libraries, the model in a forked process) once per process and
+so overstates the total; PSS splits them between the processes sharing them. Linux only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+import httpx
+from benchmarks.run import git_commit, measure, parse_list, percentile, synthetic_speech, to_wav_bytes
+
+MODES = ("inprocess", "broker")
+
+def process_tree(root: int) -> List[int]:
+    """root and all of its descendants"""
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name is parenthesized and may contain spaces
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, pending = [], [root]
+    while pending:
+        pid = pending.pop()
+        tree.append(pid)
+        pending.extend(children.get(pid, []))
+    return tree
+
+def memory_mb(pids: Sequence[int]) -> Tuple[float, float]:
+    """Summed RSS and PSS of processes, in MB"""
+    rss_kb = pss_kb = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    name, value = line.split()[:2]
+                    if name == "Rss:":
+                        rss_kb += int(value)
+                    elif name == "Pss:":
+                        pss_kb += int(value)
+        except (OSError, ValueError):
+            continue
+    return round(rss_kb / 1024, 1), round(pss_kb / 1024, 1)
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_ready(url: str, processes: Sequence[subprocess.Popen], timeout_s: float) -> None:
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        for process in processes:
+            if process.poll() is not None:
+                raise RuntimeError(f"{' '.join(process.args)} exited with status {process.returncode}")
+        try:
+            if httpx.get(f"{url}/ready", timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"{url} was not ready after {timeout_s:g} s")
+
+def stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+async def drive(url: str, wav: bytes, concurrency: int, requests: int) -> Tuple[List[float], float]:
+    async with httpx.AsyncClient(base_url=url, timeout=None) as client:
+        async def request():
+            response = await client.post("/api/v1/transcribe", files={"file": ("clip.wav", wav, "audio/wav")})
+            response.raise_for_status()
+
+        return await measure(request, concurrency, requests)
+
+def run_deployment(mode: str, workers: int, args: argparse.Namespace, wav: bytes) -> dict:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "TRANSCRIBER_DEFAULT_MODEL": args.model,
+        "TRANSCRIBER_INFERENCE_ENGINE": args.engine,
+        # Every request must reach the model
+        "TRANSCRIBER_CACHE_BACKEND": "none",
+        "TRANSCRIBER_COALESCE_REQUESTS": "false",
+        "TRANSCRIBER_ENCODER_CACHE_MB": "0",
+        "TRANSCRIBER_INFERENCE_QUEUE_SIZE": str(args.concurrency * 2),
+    }
+    processes = []
+    with tempfile.TemporaryDirectory() as run_dir:
+        env["TRANSCRIBER_JOBS_PATH"] = os.path.join(run_dir, "jobs.sqlite3")
+        env["TRANSCRIBER_JOBS_UPLOAD_DIR"] = os.path.join(run_dir, "uploads")
+        try:
+            if mode == "broker":
+                env["TRANSCRIBER_INFERENCE_BROKER"] = os.path.join(run_dir, "broker.sock")
+                processes.append(subprocess.Popen([sys.executable, "-m", "app.services.broker"], env=env))
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+                 "--workers", str(workers), "--log-level", "warning"],
+                env=env,
+            ))
+            wait_ready(url, processes, args.startup_timeout_s)
+            # Untimed requests, so every worker has served (and loaded what it needs) first
+            asyncio.run(drive(url, wav, args.concurrency, workers * 4))
+            latencies, wall_s = asyncio.run(drive(url, wav, args.concurrency, args.requests))
+            rss_mb, pss_mb = memory_mb([pid for p in processes for pid in process_tree(p.pid)])
+        finally:
+            for process in reversed(processes):
+                stop(process)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "rss_mb": rss_mb,
+        "pss_mb": pss_mb,
+        "requests_per_s": round(len(latencies) / wall_s, 3),
+        "latency_p50_s": round(percentile(latencies, 50), 4),
+        "latency_p95_s": round(percentile(latencies, 95), 4),
+    }
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Measure memory against HTTP worker count")
+    parser.add_argument("--model", default="openai/whisper-tiny", help="Model to serve")
+    parser.add_argument("--engine", default="transformers", choices=["transformers", "int8", "onnx"])
+    parser.add_argument("--workers", type=lambda v: parse_list(v, int), default=[1, 2, 4],
+                        help="Comma-separated uvicorn worker counts")
+    parser.add_argument("--modes", type=lambda v: parse_list(v, str), default=list(MODES),
+                        help="Comma-separated deployments: inprocess, broker")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of audio per request")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=32, help="Timed requests per deployment")
+    parser.add_argument("--startup-timeout-s", type=float, default=600.0)
+    parser.add_argument("-o", "--output", help="Write results to this JSON file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    wav = to_wav_bytes(synthetic_speech(args.duration))
+    results = [run_deployment(mode, workers, args, wav) for mode in args.modes for workers in args.workers]
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "model": args.model,
+            "engine": args.engine,
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for result in results:
+        print(f"{result['mode']:<10} workers={result['workers']:<3} rss={result['rss_mb']:>8.1f} MB "
+              f"pss={result['pss_mb']:>8.1f} MB {result['requests_per_s']:>7.2f} req/s "
+              f"p50={result['latency_p50_s']:.3f}s", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
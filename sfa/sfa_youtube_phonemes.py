@@ -1,7 +1,6 @@
 # /// script
 # dependencies = [
 #   "yt-dlp>=2024.3.10",
-#   "pydub>=0.25.1",
 #   "openai-whisper>=20231117",
 #   "phonemizer>=3.2.1",
 # ]
@@ -16,109 +15,177 @@ uv run sfa_youtube_phonemes.py --url "https://youtube.com/watch?v=example" --out
 # Customize chunk duration (in seconds)
 uv run sfa_youtube_phonemes.py --url "https://youtube.com/watch?v=example" --chunk-duration 45
 
+# Decode more chunks per model call (chunks of up to 30 seconds are decoded in batches)
+uv run sfa_youtube_phonemes.py --url "https://youtube.com/watch?v=example" --batch-size 16
+
 # Use specific language for phonemization
 uv run sfa_youtube_phonemes.py --url "https://youtube.com/watch?v=example" --language "en-us"
 
+# Phonemize on 4 processes and keep the word cache somewhere else
+uv run sfa_youtube_phonemes.py --url "https://youtube.com/watch?v=example" --phoneme-jobs 4 \
+    --phoneme-cache ./phonemes-cache.json
+
 ///
 """
 
 import os
+import re
+import json
 import argparse
-from typing import List
+import tempfile
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List
+import numpy as np
+import torch
 import yt_dlp
-from pydub import AudioSegment
 import whisper
-from phonemizer import phonemize
+from phonemizer.backend import EspeakBackend
+from phonemizer.separator import Separator
 from rich.console import Console
 from rich.progress import Progress
 
 # Initialize rich console for nice output
 console = Console()
 
-def download_audio(url: str, output_path: str = "temp_audio.mp3") -> str:
-    """Download audio from YouTube video."""
+DEFAULT_PHONEME_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "sfa_youtube_phonemes", "words.json")
+WORD_PATTERN = re.compile(r"[\w']+")
+
+def download_audio(url: str, output_dir: str) -> str:
+    """Download audio from YouTube video into output_dir, as-is (ffmpeg decodes any format)."""
     console.log(f"Downloading audio from: {url}")
     
     ydl_opts = {
         'format': 'bestaudio/best',
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
-        'outtmpl': output_path,
+        'outtmpl': os.path.join(output_dir, 'audio.%(ext)s'),
     }
     
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    
-    return output_path
+        info = ydl.extract_info(url, download=True)
+        return ydl.prepare_filename(info)
 
-def chunk_audio(audio_path: str, chunk_duration: int = 30) -> List[str]:
-    """Split audio file into chunks of specified duration."""
+def chunk_audio(audio: np.ndarray, chunk_duration: int = 30) -> List[np.ndarray]:
+    """Split decoded 16 kHz audio into chunks of specified duration (views, not copies)."""
     console.log(f"Chunking audio into {chunk_duration}-second segments")
     
-    audio = AudioSegment.from_mp3(audio_path)
-    chunk_length_ms = chunk_duration * 1000
-    chunks = []
-    
-    with Progress() as progress:
-        task = progress.add_task("Chunking audio...", total=len(audio))
-        
-        for i, chunk_start in enumerate(range(0, len(audio), chunk_length_ms)):
-            chunk = audio[chunk_start:chunk_start + chunk_length_ms]
-            chunk_path = f"chunk_{i}.mp3"
-            chunk.export(chunk_path, format="mp3")
-            chunks.append(chunk_path)
-            progress.update(task, advance=chunk_length_ms)
-    
-    return chunks
+    chunk_length = chunk_duration * whisper.audio.SAMPLE_RATE
+    return [audio[start:start + chunk_length] for start in range(0, len(audio), chunk_length)]
 
-def transcribe_chunks(chunk_paths: List[str], model_name: str = "base") -> List[str]:
-    """Transcribe audio chunks using Whisper."""
+def transcribe_chunks(chunks: List[np.ndarray], model_name: str = "base", batch_size: int = 8) -> List[str]:
+    """Transcribe audio chunks using Whisper, several chunks per model call."""
     console.log("Transcribing audio chunks")
     
     model = whisper.load_model(model_name)
+    # One 30 s window per chunk, so chunks can be decoded as a batch
+    batched = all(len(chunk) <= whisper.audio.N_SAMPLES for chunk in chunks)
+    options = whisper.DecodingOptions(fp16=model.device.type == "cuda")
     transcriptions = []
     
     with Progress() as progress:
-        task = progress.add_task("Transcribing...", total=len(chunk_paths))
+        task = progress.add_task("Transcribing...", total=len(chunks))
+        
+        if not batched:
+            # Longer chunks need Whisper's sliding-window transcription, one at a time
+            for chunk in chunks:
+                transcriptions.append(model.transcribe(chunk)["text"])
+                progress.update(task, advance=1)
+            return transcriptions
         
-        for chunk_path in chunk_paths:
-            result = model.transcribe(chunk_path)
-            transcriptions.append(result["text"])
-            progress.update(task, advance=1)
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            mels = torch.stack([
+                whisper.log_mel_spectrogram(whisper.pad_or_trim(chunk), model.dims.n_mels)
+                for chunk in batch
+            ]).to(model.device)
+            results = whisper.decode(model, mels, options)
+            transcriptions += [result.text for result in results]
+            progress.update(task, advance=len(batch))
     
     return transcriptions
 
-def generate_phonemes(texts: List[str], language: str = "en-us") -> List[str]:
-    """Convert transcribed text to phonemes."""
-    console.log("Generating phonemes")
+class PhonemeCache:
+    """Word-to-phonemes memo for one language, persisted as JSON and capped in LRU order."""
     
-    phonemes = []
-    with Progress() as progress:
-        task = progress.add_task("Generating phonemes...", total=len(texts))
-        
-        for text in texts:
-            phoneme_text = phonemize(
-                text,
-                language=language,
-                backend="espeak",
-                strip=True
-            )
-            phonemes.append(phoneme_text)
-            progress.update(task, advance=1)
+    def __init__(self, path: str, language: str, max_words: int = 200_000):
+        self.path = path
+        self.language = language
+        self.max_words = max_words
+        self.words: "OrderedDict[str, str]" = OrderedDict()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.words.update(json.load(f).get(language, {}))
+    
+    def get(self, word: str):
+        phonemes = self.words.get(word)
+        if phonemes is not None:
+            self.words.move_to_end(word)
+        return phonemes
+    
+    def update(self, phonemes: Dict[str, str]):
+        self.words.update(phonemes)
+        while len(self.words) > self.max_words:
+            self.words.popitem(last=False)
     
-    return phonemes
+    def save(self):
+        """Write the cache atomically, keeping other languages' entries."""
+        data = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        data[self.language] = self.words
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+
+@lru_cache(maxsize=None)
+def get_backend(language: str) -> EspeakBackend:
+    """One espeak backend per language, reused for every call in this process."""
+    return EspeakBackend(language, preserve_punctuation=False, with_stress=False)
+
+def split_words(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+def phonemize_words(words: Iterable[str], language: str, jobs: int = 1) -> Dict[str, str]:
+    """Phonemize many words in one backend call."""
+    words = list(words)
+    if not words:
+        return {}
+    phonemes = get_backend(language).phonemize(
+        words,
+        separator=Separator(phone="", word=" "),
+        strip=True,
+        njobs=jobs,
+    )
+    return dict(zip(words, phonemes))
 
-def cleanup_temp_files(chunk_paths: List[str], audio_path: str):
-    """Remove temporary files."""
-    for chunk_path in chunk_paths:
-        if os.path.exists(chunk_path):
-            os.remove(chunk_path)
+def generate_phonemes(
+    texts: List[str],
+    language: str = "en-us",
+    cache_path: str = DEFAULT_PHONEME_CACHE,
+    jobs: int = 1,
+) -> List[str]:
+    """Convert transcribed text to phonemes, word by word.
     
-    if os.path.exists(audio_path):
-        os.remove(audio_path)
+    Only words missing from the persistent cache are phonemized, all in one batched
+    call. Words are phonemized out of context, so cross-word effects espeak would
+    apply inside a sentence are not reproduced.
+    """
+    console.log("Generating phonemes")
+    
+    cache = PhonemeCache(cache_path, language)
+    chunk_words = [split_words(text) for text in texts]
+    known = {word: cache.get(word) for words in chunk_words for word in words}
+    missing = [word for word, phonemes in known.items() if phonemes is None]
+    console.log(f"Phonemizing {len(missing)} new words ({len(known) - len(missing)} cached)")
+    
+    new_phonemes = phonemize_words(missing, language, jobs)
+    known.update(new_phonemes)
+    cache.update(new_phonemes)
+    cache.save()
+    
+    return [" ".join(known[word] for word in words if known[word]) for words in chunk_words]
 
 def main():
     parser = argparse.ArgumentParser(description="Process YouTube video audio into phonemes")
@@ -127,20 +194,25 @@ def main():
     parser.add_argument("--chunk-duration", type=int, default=30, help="Duration of audio chunks in seconds")
     parser.add_argument("--language", default="en-us", help="Language for phonemization")
     parser.add_argument("--model", default="base", help="Whisper model to use (tiny, base, small, medium, large)")
+    parser.add_argument("--batch-size", type=int, default=8, help="Chunks decoded per model call")
+    parser.add_argument("--phoneme-jobs", type=int, default=1, help="Processes used to phonemize new words")
+    parser.add_argument("--phoneme-cache", default=DEFAULT_PHONEME_CACHE, help="JSON file caching word phonemes across runs")
     args = parser.parse_args()
 
-    try:
-        # Download audio
-        audio_path = download_audio(args.url)
+    # A private directory per run, removed afterwards, so concurrent runs never collide
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Download audio and decode it once
+        audio_path = download_audio(args.url, temp_dir)
+        audio = whisper.load_audio(audio_path)
         
         # Split into chunks
-        chunk_paths = chunk_audio(audio_path, args.chunk_duration)
+        chunks = chunk_audio(audio, args.chunk_duration)
         
         # Transcribe chunks
-        transcriptions = transcribe_chunks(chunk_paths, args.model)
+        transcriptions = transcribe_chunks(chunks, args.model, args.batch_size)
         
         # Generate phonemes
-        phonemes = generate_phonemes(transcriptions, args.language)
+        phonemes = generate_phonemes(transcriptions, args.language, args.phoneme_cache, args.phoneme_jobs)
         
         # Save results
         with open(args.output, "w", encoding="utf-8") as f:
@@ -150,10 +222,6 @@ def main():
                 f.write(f"Phonemes: {phoneme}\n\n")
         
         console.log(f"[green]Results saved to {args.output}[/green]")
-        
-    finally:
-        # Cleanup
-        cleanup_temp_files(chunk_paths, audio_path)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
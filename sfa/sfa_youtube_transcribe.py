@@ -16,22 +16,47 @@ uv run sfa_youtube_transcribe.py "https://www.youtube.com/watch?v=VIDEO_ID"
 # Transcribe with custom output file
 uv run sfa_youtube_transcribe.py "https://www.youtube.com/watch?v=VIDEO_ID" -o transcript.txt
 
+# Transcribe a long video on 4 processes, each decoding different parts of the audio
+uv run sfa_youtube_transcribe.py "https://www.youtube.com/watch?v=VIDEO_ID" --workers 4
+
+# Transcribe a playlist, several videos and a local file with one model, one JSON line per item
+uv run sfa_youtube_transcribe.py "https://www.youtube.com/playlist?list=PLAYLIST_ID" \
+    "https://youtu.be/VIDEO_ID" talk.mp3 --jsonl transcripts.jsonl
+
+# Transcribe every URL or path listed in a file; rerunning skips items already completed
+uv run sfa_youtube_transcribe.py --batch-file videos.txt --jsonl transcripts.jsonl
+
+# Same, decoding each item's windows on 4 processes
+uv run sfa_youtube_transcribe.py --batch-file videos.txt --jsonl transcripts.jsonl --workers 4
+
 ///
 """
 
 import os
 import sys
+import json
 import argparse
+import contextlib
+import tempfile
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 from rich.console import Console
 from rich.progress import Progress
 import yt_dlp
 import torch
 from transformers import AutoModelForSpeechSeq2Seq, AutoProcessor, pipeline
+from transformers.pipelines.audio_utils import ffmpeg_read
+
+SAMPLING_RATE = 16000
+MODEL_ID = "distil-whisper/distil-large-v2"
 
 # Initialize rich console
 console = Console()
 
-def download_audio(url: str) -> str:
+def download_audio(url: str, output_path: str = "temp_audio") -> str:
     """Downloads audio from YouTube video."""
     
     ydl_opts = {
@@ -40,64 +65,260 @@ def download_audio(url: str) -> str:
             'key': 'FFmpegExtractAudio',
             'preferredcodec': 'wav',
         }],
-        'outtmpl': 'temp_audio.%(ext)s'
+        'outtmpl': f'{output_path}.%(ext)s'
     }
     
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         console.log(f"[blue]Downloading audio from: {url}[/blue]")
         ydl.download([url])
         
-    return "temp_audio.wav"
+    return f"{output_path}.wav"
 
-def transcribe_audio(audio_path: str) -> str:
-    """Transcribes audio file using distil-whisper."""
+def expand_sources(sources: List[str]) -> Tuple[List[str], Dict[str, str]]:
+    """Expands playlists into their videos and drops repeated videos and files.
+
+    Returns the expanded sources and, by source, the error of each one that could not be
+    looked up (a private or removed video, say), so one dead link does not stop a batch.
+    """
     
-    device = "cuda:0" if torch.cuda.is_available() else "cpu"
-    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+    expanded = []
+    failed = {}
+    with yt_dlp.YoutubeDL({'quiet': True, 'extract_flat': 'in_playlist'}) as ydl:
+        for source in sources:
+            if os.path.exists(source):
+                expanded.append(os.path.abspath(source))
+                continue
+            try:
+                info = ydl.extract_info(source, download=False)
+            except Exception as e:
+                failed[source] = str(e)
+                continue
+            entries = info.get('entries') if info.get('_type') == 'playlist' else [info]
+            # Canonical watch URLs, so different links to one video are deduplicated
+            expanded += [
+                f"https://www.youtube.com/watch?v={entry['id']}" if entry.get('id') else source
+                for entry in entries or [] if entry
+            ]
+    return list(dict.fromkeys(expanded)), failed
+
+def completed_sources(jsonl_path: str) -> set:
+    """Sources already transcribed successfully in an existing JSONL output."""
+    
+    if not os.path.exists(jsonl_path):
+        return set()
+    with open(jsonl_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return {record["source"] for record in records if record.get("status") == "completed"}
+
+def transcribe_batch(
+    sources: List[str],
+    jsonl_path: str,
+    download_workers: int = 2,
+    failed: Optional[Dict[str, str]] = None,
+    workers: int = 1
+):
+    """Transcribes many sources with one loaded model, appending one JSON line per source.
 
-    console.log("[blue]Loading distil-whisper model...[/blue]")
+    Downloads run ahead on a few threads, at most 2 per worker queued, while the model
+    transcribes the audio that is already on disk. With more than one worker, each item's
+    windows are decoded on that many processes, which load the model once for the whole
+    batch. Sources in failed, which could not be looked up, are recorded as failed up front.
+    """
+    
+    if failed:
+        with open(jsonl_path, "a", encoding="utf-8") as out:
+            for source, error in failed.items():
+                console.log(f"[red]Skipping {source}: {error}[/red]")
+                out.write(json.dumps({"source": source, "status": "failed", "error": error}) + "\n")
+    
+    done = completed_sources(jsonl_path)
+    todo = [source for source in sources if source not in done]
+    if done:
+        console.log(f"[blue]Skipping {len(sources) - len(todo)} sources already in {jsonl_path}[/blue]")
+    if not todo:
+        return
+    
+    if workers > 1:
+        console.log(f"[blue]Loading distil-whisper model on {workers} processes...[/blue]")
+        pipe = None
+    else:
+        console.log("[blue]Loading distil-whisper model...[/blue]")
+        pipe = load_pipeline()
     
-    model_id = "distil-whisper/distil-large-v2"
+    with (start_worker_pool(workers) if workers > 1 else contextlib.nullcontext()) as pool, \
+            tempfile.TemporaryDirectory() as temp_dir, \
+            ThreadPoolExecutor(download_workers) as downloads, \
+            open(jsonl_path, "a", encoding="utf-8") as out, \
+            Progress() as progress:
+        task = progress.add_task("Transcribing...", total=len(todo))
+        
+        def fetch(index: int, source: str) -> str:
+            if os.path.exists(source):
+                return source
+            return download_audio(source, os.path.join(temp_dir, f"audio_{index}"))
+        
+        queued = iter(enumerate(todo))
+        pending = deque()
+        
+        def fill():
+            while len(pending) < download_workers * 2:
+                item = next(queued, None)
+                if item is None:
+                    return
+                pending.append((item[1], downloads.submit(fetch, *item)))
+        
+        fill()
+        while pending:
+            source, download = pending.popleft()
+            fill()
+            try:
+                audio_path = download.result()
+                if pool is not None:
+                    text = transcribe_in_pool(pool, audio_path, progress)
+                else:
+                    text = pipe(audio_path, return_timestamps=True)["text"]
+                record = {"source": source, "status": "completed", "text": text.strip()}
+                if audio_path.startswith(temp_dir):
+                    os.remove(audio_path)
+            except Exception as e:
+                record = {"source": source, "status": "failed", "error": str(e)}
+            # Written as each item finishes, so an interrupted run loses nothing
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+            progress.update(task, advance=1)
+
+def load_pipeline(chunk_length_s: int = 30):
+    """Loads distil-whisper wrapped in an ASR pipeline."""
     
+    device = "cuda:0" if torch.cuda.is_available() else "cpu"
+    torch_dtype = torch.float16 if torch.cuda.is_available() else torch.float32
+
     model = AutoModelForSpeechSeq2Seq.from_pretrained(
-        model_id, 
+        MODEL_ID, 
         torch_dtype=torch_dtype,
         low_cpu_mem_usage=True,
         use_safetensors=True
     )
     model.to(device)
 
-    processor = AutoProcessor.from_pretrained(model_id)
+    processor = AutoProcessor.from_pretrained(MODEL_ID)
     
-    pipe = pipeline(
+    return pipeline(
         "automatic-speech-recognition",
         model=model,
         tokenizer=processor.tokenizer,
         feature_extractor=processor.feature_extractor,
         max_new_tokens=128,
-        chunk_length_s=30,
+        chunk_length_s=chunk_length_s,
         batch_size=16,
         torch_dtype=torch_dtype,
         device=device,
     )
+
+def transcribe_audio(audio_path: str, pipe: Optional[object] = None) -> str:
+    """Transcribes audio file using distil-whisper."""
+    
+    if pipe is None:
+        console.log("[blue]Loading distil-whisper model...[/blue]")
+        pipe = load_pipeline()
     
     console.log("[blue]Transcribing audio...[/blue]")
     result = pipe(audio_path, return_timestamps=True)
     
     return result["text"]
 
+# A copy of split_on_silence in app/services/segmentation.py: this script runs on its own with
+# only the inline dependencies above, so it cannot import the app package
+def split_on_silence(audio: np.ndarray, max_window_s: int = 30, search_s: int = 5) -> List[Tuple[int, int]]:
+    """Splits audio into windows of at most max_window_s, cutting at the quietest 20 ms in the last search_s of each."""
+    max_window = max_window_s * SAMPLING_RATE
+    frame = SAMPLING_RATE // 50
+    windows = []
+    start = 0
+    while len(audio) - start > max_window:
+        search = audio[start + max_window - search_s * SAMPLING_RATE:start + max_window]
+        frames = search[:len(search) // frame * frame].reshape(-1, frame)
+        quietest = int(np.argmin(np.square(frames).mean(axis=1)))
+        cut = start + max_window - search_s * SAMPLING_RATE + quietest * frame + frame // 2
+        windows.append((start, cut))
+        start = cut
+    windows.append((start, len(audio)))
+    return windows
+
+_worker_pipe = None
+
+def _init_worker(threads: int):
+    global _worker_pipe
+    torch.set_num_threads(threads)
+    # Windows are at most 30 s, so the pipeline never needs to chunk them itself
+    _worker_pipe = load_pipeline(chunk_length_s=0)
+
+def _transcribe_window(window: np.ndarray) -> dict:
+    return _worker_pipe({"raw": window, "sampling_rate": SAMPLING_RATE}, return_timestamps=True)
+
+def start_worker_pool(workers: int):
+    """Starts processes that each load the model, splitting the cores between them."""
+    
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+    return context.Pool(workers, initializer=_init_worker, initargs=(threads,))
+
+def transcribe_in_pool(pool, audio_path: str, progress: Progress) -> str:
+    """Transcribes audio file by splitting it at silences and decoding the windows on the pool's processes."""
+    
+    with open(audio_path, "rb") as f:
+        audio = ffmpeg_read(f.read(), SAMPLING_RATE)
+    windows = split_on_silence(audio)
+    task = progress.add_task(f"{len(windows)} windows", total=len(windows))
+    texts = []
+    # Windows do not overlap, so results only need joining in order
+    for result in pool.imap(_transcribe_window, (audio[start:end] for start, end in windows)):
+        texts.append(result["text"].strip())
+        progress.update(task, advance=1)
+    progress.remove_task(task)
+    
+    return " ".join(text for text in texts if text)
+
+def transcribe_audio_parallel(audio_path: str, workers: int) -> str:
+    """Transcribes audio file on several processes, each decoding different windows."""
+    
+    console.log(f"[blue]Transcribing on {workers} processes...[/blue]")
+    with start_worker_pool(workers) as pool, Progress() as progress:
+        return transcribe_in_pool(pool, audio_path, progress)
+
 def main():
     parser = argparse.ArgumentParser(description="YouTube Video Transcriber")
-    parser.add_argument("url", help="YouTube video URL to transcribe")
+    parser.add_argument("url", nargs="*", help="YouTube video or playlist URLs, or local audio files, to transcribe")
     parser.add_argument("-o", "--output", help="Output file path", default="transcript.txt")
+    parser.add_argument("--workers", type=int, default=1, help="Processes to transcribe with, each loading its own copy of the model (also in batch mode)")
+    parser.add_argument("--batch-file", help="File listing one URL or audio file per line")
+    parser.add_argument("--jsonl", help="Batch mode: append one JSON result per video or file to this path")
+    parser.add_argument("--download-workers", type=int, default=2, help="Batch mode: downloads running ahead of the model")
     args = parser.parse_args()
     
+    sources = list(args.url)
+    if args.batch_file:
+        with open(args.batch_file, encoding="utf-8") as f:
+            sources += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if not sources:
+        parser.error("give at least one URL or file, or --batch-file")
+    
     try:
+        if args.jsonl or args.batch_file or len(sources) > 1:
+            sources, failed = expand_sources(sources)
+            jsonl_path = args.jsonl or "transcripts.jsonl"
+            transcribe_batch(sources, jsonl_path, args.download_workers, failed, args.workers)
+            console.print(f"\n[green]Transcripts saved to: {jsonl_path}[/green]")
+            return
+        
         # Download audio
-        audio_path = download_audio(args.url)
+        audio_path = download_audio(sources[0])
         
         # Transcribe
-        transcript = transcribe_audio(audio_path)
+        if args.workers > 1:
+            transcript = transcribe_audio_parallel(audio_path, args.workers)
+        else:
+            transcript = transcribe_audio(audio_path)
         
         # Save transcript
         with open(args.output, "w") as f:
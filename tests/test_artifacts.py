@@ -0,0 +1,95 @@
+import asyncio
+import os
+import numpy as np
+import pytest
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services.artifacts import AudioArtifactStore
+from app.services.youtube import YoutubeAudio
+from benchmarks.run import synthetic_speech, to_wav_bytes
+from tests.test_audio import requires_ffmpeg
+from tests.utils import make_whisper_service
+
+# Store keys are YouTube video IDs
+A, B, C = "dQw4w9WgXcQ", "9bZkp7q19f0", "jNQXAC9IVRw"
+
+def store_audio(store, key, audio, title="title"):
+    writer = store.writer(key, {"title": title})
+    for block in np.array_split(audio, 3):
+        writer.write(block)
+    writer.commit()
+
+def test_entries_are_memory_mapped_and_survive_a_restart(tmp_path):
+    store = AudioArtifactStore(str(tmp_path), max_bytes=10**6)
+    audio = np.arange(1000, dtype=np.float32)
+    store_audio(store, A, audio)
+
+    artifact = AudioArtifactStore(str(tmp_path), max_bytes=10**6).get(A)
+    assert isinstance(artifact.audio, np.memmap)
+    np.testing.assert_array_equal(artifact.audio, audio)
+    assert artifact.meta == {"title": "title", "samples": 1000}
+    assert store.get(C) is None
+    assert (store.stats.hits, store.stats.misses) == (0, 1)
+
+def test_aborted_and_interrupted_writes_leave_nothing(tmp_path):
+    store = AudioArtifactStore(str(tmp_path), max_bytes=10**6)
+    writer = store.writer(A, {"title": "title"})
+    writer.write(np.ones(10, dtype=np.float32))
+    assert store.get(A) is None
+    writer.abort()
+
+    # A process that died mid-download leaves its temporary file behind
+    store.writer(B, {}).write(np.ones(10, dtype=np.float32))
+    AudioArtifactStore(str(tmp_path), max_bytes=10**6)
+    assert os.listdir(tmp_path) == []
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    store = AudioArtifactStore(str(tmp_path), max_bytes=2 * 4000)
+    store_audio(store, A, np.zeros(1000, dtype=np.float32))
+    store_audio(store, B, np.zeros(1000, dtype=np.float32))
+    store.get(A)
+    store_audio(store, C, np.zeros(1000, dtype=np.float32))
+
+    assert store.get(B) is None
+    assert store.get(A) is not None and store.get(C) is not None
+    assert store.size_bytes == 8000 and len(store) == 2
+    assert store.stats.evicted == 1
+    assert sorted(os.listdir(tmp_path)) == [f"{A}.f32", f"{A}.json", f"{C}.f32", f"{C}.json"]
+
+def test_keys_that_are_not_video_ids_never_reach_the_filesystem(tmp_path):
+    store = AudioArtifactStore(str(tmp_path / "audio"), max_bytes=10**6)
+    for key in ["../../../tmp/pwn", "../outside", "dQw4w9WgXcQ/x", ""]:
+        with pytest.raises(ValueError):
+            store.get(key)
+        with pytest.raises(ValueError):
+            store.writer(key, {})
+    assert os.listdir(tmp_path) == []
+
+@requires_ffmpeg
+def test_concurrent_requests_for_one_video_download_it_once(tmp_path):
+    """Test that the second request waits for the first download and later ones skip it entirely"""
+    path = tmp_path / "video.wav"
+    path.write_bytes(to_wav_bytes(synthetic_speech(3)))
+    resolved = []
+
+    def resolver(url):
+        resolved.append(url)
+        return YoutubeAudio(url=str(path), title="Video", duration_s=3)
+
+    settings = Settings(artifact_dir=str(tmp_path / "audio"), language_detection=False)
+    service = make_whisper_service(settings=settings, youtube_resolver=resolver)
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    async def run():
+        first = await asyncio.gather(
+            service.transcribe(url, TranscriptionOptions(), is_youtube=True),
+            service.transcribe(url, TranscriptionOptions(return_timestamps=True), is_youtube=True),
+        )
+        return [*first, await service.transcribe(url, TranscriptionOptions(vad=True), is_youtube=True)]
+
+    results = asyncio.run(run())
+    service.inference_pool.shutdown()
+
+    assert resolved == [url]
+    assert [(result["text"], result["video_title"]) for result in results] == [("hi", "Video")] * 3
+    assert len(service.artifacts.get("dQw4w9WgXcQ").audio) == 3 * 16000
@@ -0,0 +1,157 @@
+import asyncio
+import io
+import shutil
+import wave
+import numpy as np
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services import transcription_service
+from app.services.audio import (
+    SAMPLING_RATE,
+    AudioDecodeError,
+    UploadSizeLimitMiddleware,
+    UploadTooLargeError,
+    decode_audio,
+    decode_audio_file,
+    ffmpeg_decode_command,
+    spool_upload,
+    stream_decode_audio_file,
+)
+from tests.utils import make_whisper_service
+
+class RecordingUpload(UploadFile):
+    """UploadFile that records the size of every read"""
+
+    def __init__(self, content: bytes, size=None):
+        super().__init__(file=io.BytesIO(content), size=size, filename="test.mp3")
+        self.read_sizes = []
+
+    async def read(self, size: int = -1) -> bytes:
+        self.read_sizes.append(size)
+        return await super().read(size)
+
+def test_spool_upload_copies_in_chunks():
+    """Test that uploads are copied chunk by chunk, never read whole"""
+    upload = RecordingUpload(b"a" * 10_000)
+    dest = io.BytesIO()
+    written = asyncio.run(spool_upload(upload, dest, max_bytes=20_000, chunk_size=4096))
+    assert written == 10_000
+    assert dest.getvalue() == b"a" * 10_000
+    assert upload.read_sizes == [4096, 4096, 4096, 4096]
+
+def test_spool_upload_enforces_limit_while_streaming():
+    """Test that oversized uploads fail as soon as the limit is crossed"""
+    upload = RecordingUpload(b"a" * 100_000)
+    dest = io.BytesIO()
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload, dest, max_bytes=10_000, chunk_size=4096))
+    assert len(upload.read_sizes) == 3
+    assert len(dest.getvalue()) <= 10_000
+
+def test_spool_upload_rejects_known_size_upfront():
+    """Test that uploads with a known oversized length are rejected before reading"""
+    upload = RecordingUpload(b"a" * 100, size=50_000)
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool_upload(upload, io.BytesIO(), max_bytes=10_000))
+    assert upload.read_sizes == []
+
+def test_oversized_requests_are_rejected_before_parsing():
+    """Test that a Content-Length over the limit gets a 413 without the body reaching the endpoint"""
+    app = FastAPI()
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=10_000)
+    received = []
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        received.append(file.filename)
+        return {}
+
+    client = TestClient(app)
+    response = client.post("/upload", files={"file": ("big.wav", b"a" * 20_000, "audio/wav")})
+    assert response.status_code == 413
+    assert "maximum size" in response.json()["detail"]
+    assert client.post("/upload", files={"file": ("small.wav", b"a" * 1000, "audio/wav")}).status_code == 200
+    assert received == ["small.wav"]
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg is not installed")
+
+def write_wav(path, seconds: float, sampling_rate: int = 8000, channels: int = 2):
+    """Write a 440 Hz sine wave as 16-bit PCM WAV"""
+    t = np.arange(int(seconds * sampling_rate)) / sampling_rate
+    samples = (np.sin(2 * np.pi * 440 * t) * 0.5 * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sampling_rate)
+        wav.writeframes(np.repeat(samples, channels).tobytes())
+
+@requires_ffmpeg
+def test_decode_audio_resamples_to_mono_float32(tmp_path):
+    """Test that audio is decoded once to 16 kHz mono float32 samples"""
+    path = tmp_path / "tone.wav"
+    write_wav(path, seconds=2.0)
+    audio = decode_audio(str(path))
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert abs(len(audio) - 2 * SAMPLING_RATE) < SAMPLING_RATE // 100
+    assert 0.3 < np.abs(audio).max() <= 1.0
+
+@requires_ffmpeg
+def test_decode_audio_rejects_invalid_audio(tmp_path):
+    """Test that undecodable input raises AudioDecodeError"""
+    path = tmp_path / "garbage.mp3"
+    path.write_bytes(b"0" * 1000)
+    with pytest.raises(AudioDecodeError):
+        decode_audio(str(path))
+
+@requires_ffmpeg
+def test_urls_are_limited_to_network_protocols(tmp_path):
+    """Test that a URL handed over by an extractor cannot make ffmpeg read local files"""
+    path = tmp_path / "tone.wav"
+    write_wav(path, seconds=1.0)
+    assert "-protocol_whitelist" in ffmpeg_decode_command("https://media.example/audio")
+    assert "-protocol_whitelist" not in ffmpeg_decode_command(str(path))
+    assert len(decode_audio(str(path))) == SAMPLING_RATE
+    for url in (f"file://{path}", f"concat:{path}"):
+        with pytest.raises(AudioDecodeError):
+            decode_audio(url)
+
+@requires_ffmpeg
+def test_decode_audio_file_reads_open_and_in_memory_files(tmp_path):
+    """Test that open files are decoded in place, wherever their position, and in-memory ones too"""
+    path = tmp_path / "tone.wav"
+    write_wav(path, seconds=2.0)
+    expected = decode_audio(str(path))
+    with open(path, "rb") as f:
+        f.read(100)
+        np.testing.assert_array_equal(decode_audio_file(f), expected)
+    np.testing.assert_array_equal(decode_audio_file(io.BytesIO(path.read_bytes())), expected)
+    with open(path, "rb") as f:
+        f.read(100)
+        np.testing.assert_array_equal(np.concatenate(list(stream_decode_audio_file(f))), expected)
+    blocks = list(stream_decode_audio_file(io.BytesIO(path.read_bytes()), block_samples=8000))
+    assert [len(block) for block in blocks] == [8000] * 4
+
+@requires_ffmpeg
+def test_uploads_are_transcribed_while_they_decode(tmp_path, monkeypatch):
+    """Test that without VAD an upload is cut into windows as it decodes, never decoded whole"""
+    def decode_whole(*args, **kwargs):
+        raise AssertionError("upload was decoded in one piece")
+
+    monkeypatch.setattr(transcription_service, "decode_audio_file", decode_whole)
+    path = tmp_path / "talk.wav"
+    write_wav(path, seconds=70.0)
+    service = make_whisper_service(settings=Settings(language_detection=False))
+    with open(path, "rb") as f:
+        upload = UploadFile(file=f, filename="talk.wav")
+        result = asyncio.run(service.transcribe(upload, TranscriptionOptions()))
+    service.inference_pool.shutdown()
+    assert result["text"] == "hi hi hi"
+    # VAD needs every speech region before packing windows, so it still decodes whole
+    with pytest.raises(RuntimeError, match="one piece"):
+        with open(path, "rb") as f:
+            upload = UploadFile(file=f, filename="talk.wav")
+            asyncio.run(service.transcribe(upload, TranscriptionOptions(vad=True)))
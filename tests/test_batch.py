@@ -0,0 +1,74 @@
+import asyncio
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.transcription import TranscriptionOptions
+from app.routers.transcription import create_router
+from app.services.batch import BatchTranscriber, dedupe_urls
+from tests.utils import TestTranscriptionService
+
+class ConcurrencyTrackingService(TestTranscriptionService):
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.calls = []
+
+    async def transcribe(self, source, options, is_youtube=False, progress=None):
+        self.calls.append(source)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(0.01)
+            return await super().transcribe(source, options, is_youtube)
+        finally:
+            self.running -= 1
+
+def test_dedupe_urls_matches_video_ids():
+    urls = [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=9bZkp7q19f0",
+    ]
+    assert dedupe_urls(urls) == [urls[0], urls[2]]
+
+def test_batch_expands_playlists_and_bounds_concurrency():
+    """Test that playlists are expanded, duplicates skipped, and at most N videos run at once"""
+    service = ConcurrencyTrackingService()
+    playlist = [f"https://www.youtube.com/watch?v=video{n:06d}" for n in range(6)]
+    batch = BatchTranscriber(service, concurrency=2, playlist_expander=lambda url: playlist)
+
+    async def run():
+        urls = ["https://www.youtube.com/playlist?list=PL123", "https://youtu.be/video000001"]
+        return [item async for item in batch.run(urls, TranscriptionOptions())]
+
+    results = asyncio.run(run())
+    assert sorted(item.index for item in results) == list(range(6))
+    assert sorted(service.calls) == playlist
+    assert service.max_running == 2
+
+def test_batch_endpoint_streams_one_line_per_video():
+    """Test that results and failures are streamed as JSON lines without stopping the batch"""
+    app = FastAPI()
+    app.include_router(create_router(TestTranscriptionService()), prefix="/api/v1")
+    client = TestClient(app)
+    request = {"urls": [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ",
+        "https://www.youtube.com/watch?v=nonexistentvideo",
+    ]}
+    response = client.post("/api/v1/transcribe/batch", json=request)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda line: line["index"])
+    assert len(lines) == 2
+    assert lines[0]["status"] == "completed"
+    assert lines[0]["video_id"] == "dQw4w9WgXcQ"
+    assert lines[0]["result"]["video_title"] == "Test Video Title"
+    assert lines[1]["status"] == "failed"
+    assert "Video unavailable" in lines[1]["error"]
+
+def test_batch_endpoint_rejects_empty_list():
+    app = FastAPI()
+    app.include_router(create_router(TestTranscriptionService()), prefix="/api/v1")
+    assert TestClient(app).post("/api/v1/transcribe/batch", json={"urls": []}).status_code == 422
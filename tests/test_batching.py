@@ -0,0 +1,66 @@
+import asyncio
+from app.services.batching import MicroBatcher
+
+class RecordingRunner:
+    """Batch runner that records each batch it receives and echoes inputs back"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    async def __call__(self, key, items):
+        self.batches.append((key, list(items)))
+        if self.fail_on in items:
+            raise ValueError(f"bad input: {self.fail_on}")
+        return [f"{key}:{item}" for item in items]
+
+def test_concurrent_requests_share_one_batch():
+    """Test that inputs submitted together are run in a single batch, in order"""
+    async def scenario():
+        runner = RecordingRunner()
+        batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=10)
+        results = await asyncio.gather(*(batcher.submit("en", i) for i in range(5)))
+        assert results == [f"en:{i}" for i in range(5)]
+        assert runner.batches == [("en", [0, 1, 2, 3, 4])]
+
+    asyncio.run(scenario())
+
+def test_batches_split_at_max_size():
+    """Test that a full batch is dispatched without waiting for the timer"""
+    async def scenario():
+        runner = RecordingRunner()
+        batcher = MicroBatcher(runner, max_batch_size=2, max_wait_ms=10_000)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit("en", i) for i in range(4))),
+            timeout=1
+        )
+        assert results == ["en:0", "en:1", "en:2", "en:3"]
+        assert [items for _, items in runner.batches] == [[0, 1], [2, 3]]
+
+    asyncio.run(scenario())
+
+def test_different_keys_are_not_mixed():
+    """Test that inputs with different decoding options run in separate batches"""
+    async def scenario():
+        runner = RecordingRunner()
+        batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=10)
+        results = await asyncio.gather(
+            batcher.submit("en", 1), batcher.submit("fr", 2), batcher.submit("en", 3)
+        )
+        assert results == ["en:1", "fr:2", "en:3"]
+        assert sorted(runner.batches) == [("en", [1, 3]), ("fr", [2])]
+
+    asyncio.run(scenario())
+
+def test_failing_input_only_fails_its_own_request():
+    """Test that one bad input does not fail the other requests in its batch"""
+    async def scenario():
+        runner = RecordingRunner(fail_on=1)
+        batcher = MicroBatcher(runner, max_batch_size=8, max_wait_ms=10)
+        results = await asyncio.gather(
+            *(batcher.submit("en", i) for i in range(3)), return_exceptions=True
+        )
+        assert results[0] == "en:0" and results[2] == "en:2"
+        assert isinstance(results[1], ValueError)
+
+    asyncio.run(scenario())
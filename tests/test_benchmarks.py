@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from benchmarks.compare import compare
+from benchmarks.run import benchmark_service, percentile, synthetic_speech, to_wav_bytes
+from app.services.audio import SAMPLING_RATE
+from tests.test_audio import requires_ffmpeg
+from tests.utils import make_whisper_service
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 95) == pytest.approx(4.8)
+    assert percentile([2.0], 99) == 2.0
+
+def test_synthetic_speech_has_pauses():
+    audio = synthetic_speech(10)
+    assert len(audio) == 10 * SAMPLING_RATE
+    assert (audio == 0).mean() > 0.1 and abs(audio).max() > 0.1
+
+@requires_ffmpeg
+def test_harness_reports_every_target_and_concurrency():
+    """Test an end-to-end run of the harness against a fake model"""
+    service = make_whisper_service()
+    clips = {"synthetic-3s": to_wav_bytes(synthetic_speech(3))}
+    results = asyncio.run(benchmark_service(service, clips, {"synthetic-3s": 3.0}, [1, 2], requests=2))
+    service.inference_pool.shutdown()
+
+    assert [(r.target, r.concurrency) for r in results] == [("service", 1), ("service", 2), ("http", 1), ("http", 2)]
+    assert results[0].key == "service/synthetic-3s/3s/c1"
+    for result in results:
+        assert result.requests == 2
+        assert 0 < result.latency_p50_s <= result.latency_p99_s
+        assert result.rtf == pytest.approx(result.latency_p50_s / 3.0, rel=0.01)
+
+def report(p50, rss=100.0):
+    return {
+        "meta": {"commit": "abc"},
+        "model_load_s": 1.0,
+        "peak_rss_mb": rss,
+        "results": [{"target": "service", "audio": "a", "duration_s": 5.0, "concurrency": 1,
+                     "latency_p50_s": p50, "latency_p95_s": 1.0, "rtf": 0.1}],
+    }
+
+def test_compare_flags_regressions_beyond_threshold():
+    _, regressions = compare(report(1.0), report(1.05), threshold=0.1)
+    assert regressions == []
+    _, regressions = compare(report(1.0), report(1.5, rss=300.0), threshold=0.1)
+    assert {row["metric"] for row in regressions} == {"latency_p50_s", "peak_rss_mb"}
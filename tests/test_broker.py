@@ -0,0 +1,122 @@
+import os
+import subprocess
+import sys
+import threading
+import numpy as np
+import pytest
+from multiprocessing import AuthenticationError
+from app.services.broker import BrokerError, InferenceBroker, RemoteEngine, parse_address
+from app.services.language import LanguageDetectionUnsupportedError
+from app.services.model_registry import LoadedModel, ModelRegistry
+
+AUTHKEY = b"test"
+
+def fake_pipeline(inputs, **kwargs):
+    if kwargs.get("fail"):
+        raise ValueError("bad input")
+    return [{"text": str(len(item["raw"])), "language": kwargs.get("language")} for item in inputs]
+
+def start_broker(path) -> InferenceBroker:
+    registry = ModelRegistry(
+        default_model="openai/whisper-tiny",
+        loader=lambda model_id: LoadedModel(model_id, None, None, fake_pipeline, 1),
+    )
+    broker = InferenceBroker(registry, str(path), AUTHKEY, max_concurrency=2)
+    threading.Thread(target=broker.serve_forever, daemon=True).start()
+    return broker
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return tmp_path / "broker.sock"
+
+def test_parse_address():
+    assert parse_address("127.0.0.1:7070") == ("127.0.0.1", 7070)
+    assert parse_address(":7070") == ("127.0.0.1", 7070)
+    assert parse_address("/run/transcriber.sock") == "/run/transcriber.sock"
+
+def test_models_run_in_the_broker(socket_path):
+    """Test that a registry backed by a RemoteEngine loads and runs models through the broker"""
+    broker = start_broker(socket_path)
+    engine = RemoteEngine(str(socket_path), AUTHKEY)
+    registry = ModelRegistry(default_model="openai/whisper-tiny", loader=engine.load)
+    inputs = [{"raw": np.zeros(n, dtype=np.float32), "sampling_rate": 16000} for n in (3, 5)]
+
+    results = registry.get().transcriber(inputs, language="en")
+    assert results == [{"text": "3", "language": "en"}, {"text": "5", "language": "en"}]
+    assert broker.registry.loaded_models == ["openai/whisper-tiny"]
+    assert registry.loaded_bytes == 0
+
+    with pytest.raises(BrokerError, match="bad input"):
+        registry.get().transcriber(inputs, fail=True)
+    engine.shutdown()
+    broker.close()
+
+def test_language_detection_runs_in_the_broker(socket_path):
+    broker = start_broker(socket_path)
+    engine = RemoteEngine(str(socket_path), AUTHKEY)
+    loaded = engine.load("openai/whisper-tiny")
+    audio = np.zeros(16000, dtype=np.float32)
+    # Kept as its own type, so transcription can fall back to per-window detection
+    with pytest.raises(LanguageDetectionUnsupportedError):
+        loaded.language_detector(audio)
+
+    detection = {"language": "de", "probability": 1.0, "probabilities": {"de": 1.0}}
+    broker.registry.get().language_detector = lambda audio: detection
+    assert loaded.language_detector(audio) == detection
+    engine.shutdown()
+    broker.close()
+
+def test_concurrent_calls_use_separate_connections(socket_path):
+    broker = start_broker(socket_path)
+    engine = RemoteEngine(str(socket_path), AUTHKEY)
+    transcriber = engine.load("openai/whisper-tiny").transcriber
+    results = [None] * 8
+
+    def call(i):
+        results[i] = transcriber([{"raw": np.zeros(i, dtype=np.float32)}])[0]["text"]
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [str(i) for i in range(8)]
+    engine.shutdown()
+    broker.close()
+
+def test_clients_reconnect_after_broker_restart(socket_path):
+    broker = start_broker(socket_path)
+    engine = RemoteEngine(str(socket_path), AUTHKEY)
+    transcriber = engine.load("openai/whisper-tiny").transcriber
+    broker.close()
+    broker = start_broker(socket_path)
+
+    assert transcriber([{"raw": np.zeros(2, dtype=np.float32)}])[0]["text"] == "2"
+    assert broker.registry.loaded_models == ["openai/whisper-tiny"]
+    engine.shutdown()
+    broker.close()
+
+def test_wrong_authkey_is_rejected(socket_path):
+    broker = start_broker(socket_path)
+    with pytest.raises(AuthenticationError):
+        RemoteEngine(str(socket_path), b"wrong").load("openai/whisper-tiny")
+    broker.close()
+
+def test_tcp_broker_requires_an_authkey():
+    registry = ModelRegistry(default_model="openai/whisper-tiny", loader=lambda model_id: None)
+    with pytest.raises(ValueError, match="AUTHKEY"):
+        InferenceBroker(registry, "127.0.0.1:0", None)
+    with pytest.raises(ValueError, match="AUTHKEY"):
+        RemoteEngine("127.0.0.1:7070", None)
+
+def test_unix_socket_is_private_to_its_user(socket_path):
+    broker = start_broker(socket_path)
+    assert os.stat(socket_path).st_mode & 0o777 == 0o600
+    broker.close()
+
+def test_broker_clients_do_not_import_torch(socket_path):
+    """Test that HTTP workers in broker mode leave the model libraries to the broker"""
+    env = {**os.environ, "TRANSCRIBER_INFERENCE_BROKER": str(socket_path), "TRANSCRIBER_WARM_UP": "false"}
+    code = "import sys, app.main; print(sorted(m for m in ('torch', 'transformers') if m in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
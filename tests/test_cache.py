@@ -0,0 +1,185 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.transcription import create_router
+from app.models.transcription import TranscriptionOptions
+from app.services.cache import (
+    CachingTranscriptionService,
+    MemoryCache,
+    SQLiteCache,
+    youtube_video_id,
+)
+from tests.utils import TestTranscriptionService
+
+class CountingTranscriptionService(TestTranscriptionService):
+    """Test service that counts how often inference actually runs"""
+
+    def __init__(self, delay_s: float = 0):
+        self.calls = 0
+        self.delay_s = delay_s
+
+    async def transcribe(self, source, options, is_youtube=False, progress=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay_s)
+        result = await super().transcribe(source, options, is_youtube, progress)
+        if options.debug:
+            result["debug"] = {"timings": {}}
+        return result
+
+@pytest.fixture
+def inner():
+    return CountingTranscriptionService()
+
+@pytest.fixture
+def cached_service(inner):
+    return CachingTranscriptionService(inner, MemoryCache())
+
+@pytest.fixture
+def client(cached_service):
+    app = FastAPI()
+    app.include_router(create_router(cached_service), prefix="/api/v1")
+    return TestClient(app)
+
+def test_memory_cache_evicts_least_recently_used():
+    """Test that the in-memory backend keeps only the most recently used entries"""
+    cache = MemoryCache(max_entries=2)
+    cache.set("a", {"text": "a"})
+    cache.set("b", {"text": "b"})
+    cache.get("a")
+    cache.set("c", {"text": "c"})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"text": "a"}
+    assert cache.get("c") == {"text": "c"}
+
+def test_sqlite_cache_persists_and_evicts_by_size(tmp_path):
+    """Test that the on-disk backend survives reopening and stays under its size cap"""
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SQLiteCache(path, max_bytes=200)
+    cache.set("old", {"text": "x" * 80})
+    cache.set("new", {"text": "y" * 80})
+    cache.set("newest", {"text": "z" * 80})
+    assert cache.get("old") is None
+
+    reopened = SQLiteCache(path, max_bytes=200)
+    assert reopened.get("newest") == {"text": "z" * 80}
+
+@pytest.mark.parametrize("url", [
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+    "https://youtube.com/watch?v=dQw4w9WgXcQ&t=42s",
+    "https://youtu.be/dQw4w9WgXcQ",
+    "https://m.youtube.com/shorts/dQw4w9WgXcQ",
+])
+def test_youtube_video_id_is_canonical(url):
+    """Test that different URL forms of one video map to the same ID"""
+    assert youtube_video_id(url) == "dQw4w9WgXcQ"
+
+@pytest.mark.parametrize("url", [
+    "https://evilyoutube.com/watch?v=dQw4w9WgXcQ",
+    "https://notyoutube.com/shorts/dQw4w9WgXcQ",
+    "https://youtu.be.example.com/dQw4w9WgXcQ",
+    "https://www.youtube.com/watch?v=../../../tmp/pwn",
+    "https://www.youtube.com/watch?v=dQw4w9WgXcQx",
+    "https://youtu.be/dQw4w9W%2FXcQ",
+])
+def test_youtube_video_id_rejects_lookalike_hosts_and_malformed_ids(url):
+    """Test that only well-formed IDs on YouTube hosts are used as keys"""
+    assert youtube_video_id(url) is None
+
+def test_repeated_upload_is_served_from_cache(client, inner, cached_service):
+    """Test that identical uploads with identical options run inference once"""
+    files = {"file": ("test.mp3", b"0" * 1000, "audio/mpeg")}
+    first = client.post("/api/v1/transcribe", files=files)
+    second = client.post("/api/v1/transcribe", files={"file": ("renamed.mp3", b"0" * 1000, "audio/mpeg")})
+    assert first.json() == second.json()
+    assert inner.calls == 1
+    assert (cached_service.stats.hits, cached_service.stats.misses) == (1, 1)
+
+def test_changed_options_miss_the_cache(client, inner):
+    """Test that a different language or content is transcribed again"""
+    files = {"file": ("test.mp3", b"0" * 1000, "audio/mpeg")}
+    client.post("/api/v1/transcribe", files=files)
+    client.post("/api/v1/transcribe", files=files, params={"language": "fr"})
+    client.post("/api/v1/transcribe", files={"file": ("test.mp3", b"1" * 1000, "audio/mpeg")})
+    assert inner.calls == 3
+
+def test_youtube_url_forms_share_cache_entry(client, inner):
+    """Test that the same video requested by different URLs is transcribed once"""
+    client.post("/api/v1/transcribe/youtube", json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"})
+    response = client.post("/api/v1/transcribe/youtube", json={"url": "https://youtu.be/dQw4w9WgXcQ"})
+    assert response.status_code == 200
+    assert inner.calls == 1
+
+def test_failed_transcription_is_not_cached(client, inner):
+    """Test that errors are not stored and the next request retries"""
+    request = {"url": "https://www.youtube.com/watch?v=nonexistentvideo"}
+    assert client.post("/api/v1/transcribe/youtube", json=request).status_code == 500
+    assert client.post("/api/v1/transcribe/youtube", json=request).status_code == 500
+    assert inner.calls == 2
+
+def test_concurrent_identical_requests_share_one_transcription():
+    """Test that identical in-flight requests are coalesced even without a result cache"""
+    inner = CountingTranscriptionService(delay_s=0.05)
+    service = CachingTranscriptionService(inner, None)
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    async def main():
+        return await asyncio.gather(
+            service.transcribe(url, TranscriptionOptions(debug=True), is_youtube=True),
+            service.transcribe("https://youtu.be/dQw4w9WgXcQ", TranscriptionOptions(debug=True), is_youtube=True),
+            service.transcribe(url, TranscriptionOptions(), is_youtube=True),
+            service.transcribe(url, TranscriptionOptions(language="fr"), is_youtube=True),
+        )
+
+    leader, joined_debug, joined, french = asyncio.run(main())
+    assert inner.calls == 2
+    assert leader["debug"] == {"timings": {}}
+    assert joined_debug["debug"] == {"coalesced": True}
+    assert "debug" not in joined
+    assert joined["text"] == leader["text"]
+    assert french["language"] == "fr"
+    assert service.flights.stats.joined == 2
+
+def test_disconnected_request_does_not_cancel_shared_transcription(inner):
+    """Test that a waiter leaving early leaves the others' result and the cache entry intact"""
+    inner.delay_s = 0.05
+    service = CachingTranscriptionService(inner, MemoryCache())
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+    async def main():
+        leaver = asyncio.create_task(service.transcribe(url, TranscriptionOptions(), is_youtube=True))
+        stayer = asyncio.create_task(service.transcribe(url, TranscriptionOptions(), is_youtube=True))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+        result = await stayer
+        return result, await service.transcribe(url, TranscriptionOptions(), is_youtube=True)
+
+    result, cached = asyncio.run(main())
+    assert result == cached
+    assert inner.calls == 1
+    assert service.stats.hits == 1
+
+def test_streamed_and_plain_requests_coalesce_separately():
+    """Test that only streamed requests hand the service a progress callback"""
+    received = []
+
+    class RecordingService(CountingTranscriptionService):
+        async def transcribe(self, source, options, is_youtube=False, progress=None):
+            received.append(progress is not None)
+            return await super().transcribe(source, options, is_youtube, progress)
+
+    inner = RecordingService(delay_s=0.05)
+    service = CachingTranscriptionService(inner, None)
+    url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+    chunks = []
+
+    async def main():
+        await asyncio.gather(
+            service.transcribe(url, TranscriptionOptions(), is_youtube=True),
+            service.transcribe(url, TranscriptionOptions(), is_youtube=True),
+            service.transcribe(url, TranscriptionOptions(), is_youtube=True, progress=chunks.append),
+        )
+
+    asyncio.run(main())
+    assert sorted(received) == [False, True]
+    assert len(chunks) == 1
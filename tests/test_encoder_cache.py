@@ -0,0 +1,60 @@
+import numpy as np
+import torch
+from app.services.encoder_cache import CachingEncoder, EncoderCache, load_with_encoder_cache
+from app.services.model_registry import LoadedModel
+from tests.test_engines import tiny_whisper
+
+def entry(value: float) -> np.ndarray:
+    return np.full(250, value, dtype=np.float32)  # 1000 bytes
+
+def test_least_recently_used_entries_are_spilled_and_read_back(tmp_path):
+    cache = EncoderCache(memory_budget_bytes=2500, spill_dir=str(tmp_path))
+    cache.put("a", entry(1))
+    cache.put("b", entry(2))
+    cache.get("a")
+    cache.put("c", entry(3))
+
+    assert cache.stats.spilled == 1 and cache.disk_bytes == 1000
+    assert len(list(tmp_path.glob("encoder-*/b.npy"))) == 1
+    # A spilled entry comes back from disk and moves to memory, spilling another
+    restored = cache.get("b")
+    assert np.array_equal(restored, entry(2)) and not isinstance(restored, np.memmap)
+    assert list(tmp_path.glob("encoder-*/b.npy")) == []
+    assert cache.memory_bytes == 2000
+    assert cache.get("missing") is None
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+def test_without_spill_dir_evicted_entries_are_dropped():
+    cache = EncoderCache(memory_budget_bytes=1500)
+    cache.put("a", entry(1))
+    cache.put("b", entry(2))
+    assert cache.get("a") is None
+    assert cache.disk_bytes == 0
+
+def test_spilled_entries_beyond_disk_budget_are_deleted(tmp_path):
+    cache = EncoderCache(memory_budget_bytes=1000, spill_dir=str(tmp_path), disk_budget_bytes=2000)
+    for key in "abcd":
+        cache.put(key, entry(ord(key)))
+    assert cache.disk_bytes == 2000
+    assert cache.get("a") is None
+    assert np.array_equal(cache.get("c"), entry(ord("c")))
+
+def test_cached_encoder_output_is_reused_across_decoding_options():
+    """Test that decoding the same features again skips the encoder and decodes identically"""
+    model = tiny_whisper()
+    features = torch.randn(2, 80, 3000)
+    expected = model.generate(features, max_new_tokens=5)
+
+    calls = []
+    model.model.encoder.register_forward_hook(lambda module, args, output: calls.append(len(args[0])))
+    model.model.encoder = CachingEncoder(model.model.encoder, EncoderCache(10**8), "tiny")
+
+    assert torch.equal(model.generate(features, max_new_tokens=5), expected)
+    assert torch.equal(model.generate(features, max_new_tokens=3), expected[:, :3])
+    # Only the new window of a partly cached batch is encoded
+    model.generate(torch.cat([features[:1], torch.randn(1, 80, 3000)]), max_new_tokens=3)
+    assert calls == [2, 1]
+
+def test_models_without_a_torch_encoder_load_unchanged():
+    loaded = load_with_encoder_cache(lambda model_id: LoadedModel(model_id, None, None, None, 1), 10**6, "", 10**6, "m")
+    assert loaded.model is None
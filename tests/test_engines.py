@@ -0,0 +1,121 @@
+import os
+import numpy as np
+import pytest
+import torch
+from transformers import WhisperConfig, WhisperForConditionalGeneration
+from app.services import engines
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services.engines import check_assistant_compatible, get_engine_loader, quantize_int8, word_error_rate
+from app.services.model_registry import LoadedModel, model_size_bytes
+from tests.utils import make_whisper_service
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    assert word_error_rate("Hello, world.", "hello world") == 0.0
+    assert word_error_rate("the cat sat on the mat", "the cat sat on mat") == pytest.approx(1 / 6)
+    assert word_error_rate("a b", "x a b y") == 1.0
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        get_engine_loader("tensorrt")
+
+def test_missing_engine_dependency_fails_fast(monkeypatch):
+    """Test that selecting the ONNX engine without optimum fails at startup, not on the first request"""
+    monkeypatch.setattr(engines.importlib.util, "find_spec", lambda name: None)
+    with pytest.raises(ImportError, match="optimum"):
+        get_engine_loader("onnx")
+
+def tiny_whisper(layers: int = 1, vocab_size: int = 100, seed: int = 0) -> WhisperForConditionalGeneration:
+    torch.manual_seed(seed)
+    config = WhisperConfig(
+        d_model=64, encoder_layers=layers, decoder_layers=layers,
+        encoder_attention_heads=2, decoder_attention_heads=2,
+        encoder_ffn_dim=256, decoder_ffn_dim=256, vocab_size=vocab_size,
+        max_target_positions=32, decoder_start_token_id=1,
+        pad_token_id=0, eos_token_id=2, bos_token_id=1,
+    )
+    return WhisperForConditionalGeneration(config).eval()
+
+def test_int8_quantization_shrinks_linear_layers():
+    """Test that quantized models are smaller, still generate, and report their real size"""
+    model = tiny_whisper()
+    full_size = model_size_bytes(model)
+    quantized = quantize_int8(model)
+    assert model_size_bytes(quantized) < full_size
+    features = torch.randn(1, 80, 3000)
+    assert quantized.generate(features, max_new_tokens=3).shape[0] == 1
+
+@pytest.mark.parametrize("int8", [False, True])
+def test_assisted_generation_matches_greedy(int8):
+    """Test that drafting tokens with a smaller model leaves greedy output unchanged"""
+    model, assistant = tiny_whisper(layers=3, seed=0), tiny_whisper(layers=1, seed=1)
+    if int8:
+        model, assistant = quantize_int8(model), quantize_int8(assistant)
+    features = torch.randn(1, 80, 3000)
+    expected = model.generate(features, max_new_tokens=10, do_sample=False)
+    assisted = model.generate(features, max_new_tokens=10, do_sample=False, assistant_model=assistant)
+    assert torch.equal(assisted, expected)
+
+def test_assistant_must_share_the_vocabulary():
+    with pytest.raises(ValueError, match="vocab_size"):
+        check_assistant_compatible(tiny_whisper(), tiny_whisper(vocab_size=120))
+
+def test_assistant_requires_a_torch_engine(monkeypatch):
+    monkeypatch.setattr(engines.importlib.util, "find_spec", lambda name: object())
+    with pytest.raises(ValueError, match="onnx"):
+        get_engine_loader("onnx", assistant_model="tiny")
+    assert get_engine_loader("int8", assistant_model="tiny").args[1] == "openai/whisper-tiny"
+
+def test_assistant_is_loaded_once_and_skipped_for_other_tokenizers(monkeypatch, caplog):
+    """Test that compatible models share one assistant, and an incompatible one loads without it"""
+    vocab_sizes = {"assistant": 100, "large": 100, "medium": 100, "other": 120}
+    loads = []
+
+    def loader(model_id):
+        loads.append(model_id)
+        transcriber = type("Pipeline", (), {"device": "cpu"})()
+        return LoadedModel(model_id, tiny_whisper(vocab_size=vocab_sizes[model_id]), None, transcriber, 10)
+
+    monkeypatch.setattr(engines, "_assistants", {})
+    monkeypatch.setattr(engines, "build_asr_pipeline", lambda model, processor, device, assistant_model: assistant_model)
+    large, medium, other = (engines.load_with_assistant(loader, "assistant", m) for m in ("large", "medium", "other"))
+
+    assert loads == ["large", "assistant", "medium", "other"]
+    assert large.transcriber is medium.transcriber is not None
+    assert (large.size_bytes, medium.size_bytes) == (20, 10)
+    assert other.transcriber.device == "cpu" and other.size_bytes == 10
+    assert "Loading other without speculative decoding" in caplog.text
+
+def test_assisted_service_decodes_one_input_at_a_time():
+    """Test that assisted decoding, which cannot batch, is not handed batches"""
+    calls = []
+
+    def transcriber(inputs, **kwargs):
+        calls.append(kwargs["batch_size"])
+        return [{"text": "hi"} for _ in inputs]
+
+    service = make_whisper_service(transcriber, Settings(assistant_model="tiny"))
+    audio = np.zeros(16000, dtype=np.float32)
+    service._transcribe_inputs(service._batch_key(TranscriptionOptions()), [audio, audio])
+    service.inference_pool.shutdown()
+    assert calls == [1]
+
+PARITY_CLIP = os.environ.get("TRANSCRIBER_PARITY_CLIP")
+
+@pytest.mark.skipif(not PARITY_CLIP, reason="set TRANSCRIBER_PARITY_CLIP and TRANSCRIBER_PARITY_TEXT to run")
+@pytest.mark.parametrize("engine", ["int8", "onnx"])
+def test_engine_wer_parity(engine):
+    """Test that an engine transcribes a reference clip about as well as the transformers engine"""
+    from app.services.audio import SAMPLING_RATE, decode_audio
+
+    try:
+        loader = get_engine_loader(engine)
+    except ImportError as e:
+        pytest.skip(str(e))
+    model_id = os.environ.get("TRANSCRIBER_PARITY_MODEL", "openai/whisper-tiny")
+    reference = os.environ["TRANSCRIBER_PARITY_TEXT"]
+    audio = {"raw": decode_audio(PARITY_CLIP), "sampling_rate": SAMPLING_RATE}
+
+    baseline = get_engine_loader("transformers")(model_id).transcriber(audio)["text"]
+    candidate = loader(model_id).transcriber(audio)["text"]
+    assert word_error_rate(reference, candidate) <= word_error_rate(reference, baseline) + 0.02
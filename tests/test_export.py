@@ -0,0 +1,70 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.transcription import TranscriptionResponse, build_transcription_response
+from app.routers.transcription import create_router
+from app.services.export import MissingTimestampsError, to_columns, to_srt, to_vtt
+from tests.utils import TestTranscriptionService
+
+RESPONSE = TranscriptionResponse(
+    text="Hello there. A <b> & c",
+    language="en",
+    segments=[
+        {"start": 0.0, "end": 1.5, "text": "Hello there.", "words": [
+            {"start": 0.0, "end": 0.6, "text": "Hello"},
+            {"start": 0.7, "end": 1.5, "text": "there."},
+        ]},
+        {"start": 3661.25, "end": 3662.0, "text": "A <b> & c", "words": [
+            {"start": 3661.25, "end": 3662.0, "text": "A <b> & c"},
+        ]},
+    ],
+)
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(create_router(TestTranscriptionService()), prefix="/api/v1")
+    return TestClient(app)
+
+def test_srt():
+    assert to_srt(RESPONSE) == (
+        "1\n00:00:00,000 --> 00:00:01,500\nHello there.\n\n"
+        "2\n01:01:01,250 --> 01:01:02,000\nA <b> & c\n\n"
+    )
+
+def test_vtt_escapes_cue_text():
+    assert to_vtt(RESPONSE) == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:01.500\nHello there.\n\n"
+        "01:01:01.250 --> 01:01:02.000\nA &lt;b> &amp; c\n\n"
+    )
+
+def test_subtitles_need_segments():
+    with pytest.raises(MissingTimestampsError):
+        to_srt(TranscriptionResponse(text="no timestamps"))
+
+def test_columns_flatten_segments_and_words():
+    columns = to_columns(RESPONSE)
+    assert columns.segments.start == [0.0, 3661.25]
+    assert columns.segments.text == ["Hello there.", "A <b> & c"]
+    assert columns.words.text == ["Hello", "there.", "A <b> & c"]
+    assert columns.words.segment == [0, 0, 1]
+    assert to_columns(TranscriptionResponse(text="", segments=[])).words is None
+
+def test_pipeline_chunks_become_typed_segments():
+    response = build_transcription_response([{"timestamp": (1.0, None), "text": " open end"}])
+    assert response.text == "open end"
+    assert response.segments[0].model_dump() == {"start": 1.0, "end": 1.0, "text": "open end", "words": None}
+
+def test_export_endpoints(client):
+    files = {"file": ("test.mp3", b"0" * 100, "audio/mpeg")}
+    srt = client.post("/api/v1/transcribe/export/srt", files=files)
+    assert srt.status_code == 200
+    assert srt.headers["content-type"].startswith("application/x-subrip")
+    assert srt.text == "1\n00:00:00,000 --> 00:00:01,000\nTest segment\n\n"
+
+    youtube = client.post("/api/v1/transcribe/youtube/export/json", json={"url": "https://youtube.com/watch?v=x"})
+    assert youtube.json()["segments"] == {"start": [0.0], "end": [1.0], "text": ["Test segment"]}
+    assert youtube.json()["video_title"] == "Test Video Title"
+
+    assert client.post("/api/v1/transcribe/export/docx", files=files).status_code == 422
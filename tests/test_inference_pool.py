@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.transcription import create_router
+from app.services.inference_pool import InferencePool, InferenceQueueFullError
+from tests.utils import TestTranscriptionService
+
+class SaturatedTranscriptionService(TestTranscriptionService):
+    """Test service whose inference pool never has room for another request"""
+
+    def __init__(self):
+        self.inference_pool = InferencePool(max_workers=1, max_queue_size=0, retry_after=7)
+        self.inference_pool._pending = self.inference_pool.max_pending
+
+    async def transcribe(self, source, options, is_youtube=False, progress=None):
+        async with self.inference_pool.slot():
+            return await super().transcribe(source, options, is_youtube, progress)
+
+@pytest.fixture
+def saturated_client():
+    app = FastAPI()
+    app.include_router(create_router(SaturatedTranscriptionService()), prefix="/api/v1")
+    return TestClient(app)
+
+def test_pool_rejects_when_saturated():
+    """Test that admission fails fast once workers and queue are full"""
+    async def scenario():
+        pool = InferencePool(max_workers=1, max_queue_size=1, retry_after=3)
+        async with pool.slot():
+            async with pool.slot():
+                assert pool.saturated
+                assert pool.queued == 1
+                with pytest.raises(InferenceQueueFullError) as exc_info:
+                    async with pool.slot():
+                        pass
+                assert exc_info.value.retry_after == 3
+        assert pool.pending == 0
+
+    asyncio.run(scenario())
+
+def test_pool_runs_off_event_loop():
+    """Test that blocking calls run on a worker thread, not the event loop thread"""
+    async def scenario():
+        pool = InferencePool(max_workers=2)
+        try:
+            worker_thread = await pool.run(lambda: threading.current_thread().name)
+            assert worker_thread.startswith("inference")
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+def test_pool_keeps_event_loop_responsive():
+    """Test that other coroutines make progress while inference is running"""
+    async def scenario():
+        pool = InferencePool(max_workers=1)
+        release = threading.Event()
+        try:
+            inference = asyncio.ensure_future(pool.run(release.wait, 5))
+            await asyncio.sleep(0)
+            ticks = 0
+            for _ in range(3):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert ticks == 3 and not inference.done()
+            release.set()
+            assert await inference is True
+        finally:
+            pool.shutdown()
+
+    asyncio.run(scenario())
+
+def test_transcribe_returns_503_when_queue_full(saturated_client):
+    """Test that a saturated inference queue maps to 503 with Retry-After"""
+    files = {"file": ("test.mp3", b"0" * 10, "audio/mpeg")}
+    response = saturated_client.post("/api/v1/transcribe", files=files)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+
+def test_transcribe_youtube_returns_503_when_queue_full(saturated_client):
+    """Test that YouTube requests are also rejected when the queue is full"""
+    request = {"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+    response = saturated_client.post("/api/v1/transcribe/youtube", json=request)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
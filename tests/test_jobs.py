@@ -0,0 +1,167 @@
+import asyncio
+import time
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.jobs import JobStatus
+from app.models.transcription import TranscriptionOptions
+from app.routers.jobs import create_jobs_router
+from app.services.jobs import Job, JobManager, JobStore
+from app.services.transcription_service import TranscriptionProgress
+from tests.utils import TestTranscriptionService
+
+class GatedTranscriptionService(TestTranscriptionService):
+    """Test service that reports three chunks and waits for a gate before finishing"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.calls = 0
+
+    async def transcribe(self, source, options, is_youtube=False, progress=None):
+        self.calls += 1
+        progress(TranscriptionProgress(0, 3))
+        progress(TranscriptionProgress(1, 3))
+        await self.gate.wait()
+        progress(TranscriptionProgress(3, 3))
+        return await super().transcribe(source, options, is_youtube)
+
+def wait_for_status(client, job_id, statuses, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(f"/api/v1/jobs/{job_id}").json()
+        if body["status"] in statuses:
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} never reached {statuses}")
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+def make_client(service, store, tmp_path):
+    manager = JobManager(service, store, upload_dir=str(tmp_path / "uploads"))
+    app = FastAPI(on_startup=[manager.start], on_shutdown=[manager.shutdown])
+    app.include_router(create_jobs_router(manager), prefix="/api/v1")
+    return TestClient(app)
+
+def test_youtube_job_reports_progress_and_result(store, tmp_path):
+    """Test that a submitted job returns immediately, reports progress, then its result"""
+    service = GatedTranscriptionService()
+    with make_client(service, store, tmp_path) as client:
+        response = client.post(
+            "/api/v1/jobs/transcribe/youtube",
+            json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+        )
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+
+        running = wait_for_status(client, job_id, {"running"})
+        assert running["progress"]["chunks_total"] == 3
+        assert client.get(f"/api/v1/jobs/{job_id}/result").status_code == 409
+
+        client.portal.call(service.gate.set)
+        done = wait_for_status(client, job_id, {"completed"})
+        assert done["progress"] == {"chunks_done": 3, "chunks_total": 3}
+
+        result = client.get(f"/api/v1/jobs/{job_id}/result")
+        assert result.status_code == 200
+        assert result.json()["video_title"] == "Test Video Title"
+
+def test_upload_job_completes(store, tmp_path):
+    """Test that uploaded audio is kept until its job has run, then removed"""
+    service = GatedTranscriptionService()
+    with make_client(service, store, tmp_path) as client:
+        files = {"file": ("test.mp3", b"0" * 1000, "audio/mpeg")}
+        job_id = client.post("/api/v1/jobs/transcribe", files=files).json()["id"]
+        client.portal.call(service.gate.set)
+        wait_for_status(client, job_id, {"completed"})
+        result = client.get(f"/api/v1/jobs/{job_id}/result").json()
+        assert result["text"] == "Test transcription for file size: 1000 bytes"
+    assert list((tmp_path / "uploads").iterdir()) == []
+
+def test_cancel_running_job(store, tmp_path):
+    """Test that a running job can be cancelled and never produces a result"""
+    service = GatedTranscriptionService()
+    with make_client(service, store, tmp_path) as client:
+        job_id = client.post(
+            "/api/v1/jobs/transcribe/youtube",
+            json={"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+        ).json()["id"]
+        wait_for_status(client, job_id, {"running"})
+
+        assert client.delete(f"/api/v1/jobs/{job_id}").json()["status"] == "cancelled"
+        client.portal.call(service.gate.set)
+        assert wait_for_status(client, job_id, {"cancelled"})["status"] == "cancelled"
+        assert client.get(f"/api/v1/jobs/{job_id}/result").status_code == 409
+
+def test_failed_job_reports_error(store, tmp_path):
+    """Test that transcription errors are recorded on the job"""
+    with make_client(TestTranscriptionService(), store, tmp_path) as client:
+        job_id = client.post(
+            "/api/v1/jobs/transcribe/youtube",
+            json={"url": "https://www.youtube.com/watch?v=nonexistentvideo"}
+        ).json()["id"]
+        failed = wait_for_status(client, job_id, {"failed"})
+        assert "Video unavailable" in failed["error"]
+
+def test_unknown_job_returns_404(store, tmp_path):
+    with make_client(TestTranscriptionService(), store, tmp_path) as client:
+        assert client.get("/api/v1/jobs/missing").status_code == 404
+        assert client.get("/api/v1/jobs/missing/result").status_code == 404
+
+def test_jobs_survive_restart(store, tmp_path):
+    """Test that finished results persist and interrupted jobs resume after a restart"""
+    options = TranscriptionOptions()
+    finished = Job(id="finished", is_youtube=True, source="https://youtu.be/a", options=options,
+                   status=JobStatus.COMPLETED, result={"text": "kept"})
+    interrupted = Job(id="interrupted", is_youtube=True, source="https://youtu.be/dQw4w9WgXcQ",
+                      options=options, status=JobStatus.RUNNING, chunks_done=2, chunks_total=5)
+    store.save(finished)
+    store.save(interrupted)
+
+    with make_client(TestTranscriptionService(), store, tmp_path) as client:
+        assert client.get("/api/v1/jobs/finished/result").json()["text"] == "kept"
+        wait_for_status(client, "interrupted", {"completed"})
+        assert "Test transcription" in client.get("/api/v1/jobs/interrupted/result").json()["text"]
+
+def test_job_export_needs_timestamps(store, tmp_path):
+    """Test that a finished job exports subtitles only when it was transcribed with timestamps"""
+    with make_client(TestTranscriptionService(), store, tmp_path) as client:
+        url = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+        plain = client.post("/api/v1/jobs/transcribe/youtube", json={"url": url}).json()["id"]
+        timed = client.post("/api/v1/jobs/transcribe/youtube",
+                            json={"url": url, "options": {"return_timestamps": True}}).json()["id"]
+        for job_id in (plain, timed):
+            wait_for_status(client, job_id, {"completed"})
+
+        assert client.get(f"/api/v1/jobs/{plain}/export/srt").status_code == 409
+        vtt = client.get(f"/api/v1/jobs/{timed}/export/vtt")
+        assert vtt.status_code == 200
+        assert vtt.text == "WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nTest segment\n\n"
+
+def test_progress_is_saved_at_most_once_per_interval(tmp_path):
+    """Test that per-chunk progress does not write to SQLite on the event loop every chunk"""
+    saved = []
+
+    class CountingStore(JobStore):
+        def save(self, job):
+            saved.append(job.chunks_done)
+            super().save(job)
+
+    class ChattyService(TestTranscriptionService):
+        async def transcribe(self, source, options, is_youtube=False, progress=None):
+            for done in range(100):
+                progress(TranscriptionProgress(done, 100))
+            return await super().transcribe(source, options, is_youtube)
+
+    async def main():
+        manager = JobManager(ChattyService(), None, upload_dir=str(tmp_path / "uploads"))
+        await manager.start(CountingStore(str(tmp_path / "jobs.sqlite3")))
+        job = await manager.submit_youtube("https://www.youtube.com/watch?v=dQw4w9WgXcQ", TranscriptionOptions())
+        await manager._tasks[job.id]
+        return manager.store.get(job.id)
+
+    job = asyncio.run(main())
+    assert job.status == JobStatus.COMPLETED and job.chunks_done == 99
+    # Queued, running, the first progress event and completion
+    assert saved == [0, 0, 0, 99]
@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+import torch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from transformers import WhisperFeatureExtractor
+from app.models.transcription import TranscriptionOptions
+from app.routers.transcription import create_router
+from app.services.language import LanguageDetectionUnsupportedError, detect_language
+from tests.test_engines import tiny_whisper
+from tests.utils import TestTranscriptionService, make_whisper_service
+
+SR = 16000
+LANGUAGES = {"<|en|>": 10, "<|fr|>": 11, "<|de|>": 12}
+
+def test_detect_language_reads_one_decoder_step():
+    """Test that the language is the most likely language token after the start token"""
+    model = tiny_whisper()
+    model.generation_config.lang_to_id = LANGUAGES
+    processor = SimpleNamespace(feature_extractor=WhisperFeatureExtractor())
+    audio = np.random.default_rng(0).uniform(-0.1, 0.1, 40 * SR).astype(np.float32)
+
+    detection = detect_language(model, processor, audio)
+
+    features = processor.feature_extractor(audio[:30 * SR], sampling_rate=SR, return_tensors="pt").input_features
+    with torch.no_grad():
+        logits = model(input_features=features, decoder_input_ids=torch.tensor([[1]])).logits[0, -1]
+    expected = ["en", "fr", "de"][int(logits[list(LANGUAGES.values())].argmax())]
+    assert detection["language"] == expected
+    assert list(detection["probabilities"])[0] == expected
+    assert sum(detection["probabilities"].values()) == pytest.approx(1.0, abs=1e-3)
+
+def test_models_without_language_tokens_are_rejected():
+    model = tiny_whisper()
+    model.generation_config.lang_to_id = None
+    with pytest.raises(LanguageDetectionUnsupportedError):
+        detect_language(model, SimpleNamespace(feature_extractor=WhisperFeatureExtractor()), np.zeros(SR, np.float32))
+
+class RecordingPipeline:
+    def __init__(self):
+        self.languages = []
+
+    def __call__(self, inputs, **kwargs):
+        self.languages.append(kwargs["generate_kwargs"].get("language"))
+        return [{"text": "bonjour"} for _ in inputs]
+
+def make_service(language_detector):
+    pipeline = RecordingPipeline()
+    return make_whisper_service(pipeline, language_detector=language_detector), pipeline
+
+def transcribe(service, audio, options):
+    async def run():
+        return await service._transcribe_audio(audio, options, service._batch_key(options))
+    result = asyncio.run(run())
+    service.inference_pool.shutdown()
+    return result
+
+def test_language_is_detected_once_and_used_for_every_window():
+    """Test that the first window's language is decoded in all windows and reported"""
+    calls = []
+
+    def detector(audio):
+        calls.append(len(audio))
+        return {"language": "fr", "probability": 0.8, "probabilities": {"fr": 0.8}}
+
+    service, pipeline = make_service(detector)
+    result = transcribe(service, np.random.default_rng(0).uniform(-0.5, 0.5, 70 * SR).astype(np.float32),
+                        TranscriptionOptions())
+
+    assert len(calls) == 1 and calls[0] <= 30 * SR
+    assert pipeline.languages and set(pipeline.languages) == {"fr"}
+    assert result["language"] == "fr"
+    assert result["language_probability"] == 0.8
+
+def test_given_or_undetectable_language_skips_detection():
+    def unsupported(audio):
+        raise LanguageDetectionUnsupportedError("English only")
+
+    audio = np.random.default_rng(0).uniform(-0.5, 0.5, 5 * SR).astype(np.float32)
+    service, pipeline = make_service(unsupported)
+    result = transcribe(service, audio, TranscriptionOptions())
+    assert pipeline.languages == [None]
+    assert "language" not in result
+
+    service, pipeline = make_service(lambda audio: pytest.fail("detection should not run"))
+    result = transcribe(service, audio, TranscriptionOptions(language="de"))
+    assert pipeline.languages == ["de"]
+    assert result["language"] == "de" and "language_probability" not in result
+
+def test_detect_language_endpoints():
+    app = FastAPI()
+    app.include_router(create_router(TestTranscriptionService()), prefix="/api/v1")
+    client = TestClient(app)
+
+    response = client.post("/api/v1/detect-language", files={"file": ("test.mp3", b"0" * 100, "audio/mpeg")})
+    assert response.status_code == 200
+    assert response.json() == {"language": "fr", "probability": 0.9, "probabilities": {"fr": 0.9, "en": 0.1}}
+
+    url = "https://www.youtube.com/watch?v=nonexistentvideo"
+    response = client.post("/api/v1/detect-language/youtube", json={"url": url})
+    assert response.status_code == 500
+    assert response.json()["detail"].startswith("Failed to detect the language of YouTube video")
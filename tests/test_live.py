@@ -0,0 +1,155 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.routers.live import create_live_router
+from app.services.inference_pool import InferenceQueueFullError
+from app.services.live import LiveTranscriptionSession
+from tests.utils import TestTranscriptionService, make_whisper_service
+
+SR = 16000
+WORDS = "the quick brown fox jumps over the lazy dog".split()
+
+def speech(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.uniform(-0.5, 0.5, int(seconds * SR)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+async def fake_transcribe(audio: np.ndarray) -> str:
+    """One word per second of audio, so hypotheses grow as the utterance does"""
+    return " ".join(WORDS[:int(len(audio) / SR)])
+
+class LiveTestTranscriptionService(TestTranscriptionService):
+    async def transcribe_array(self, audio, options):
+        return {"text": await fake_transcribe(audio)}
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+def test_local_agreement_commits_words_once():
+    """Test that words become stable once two hypotheses agree, and are never repeated"""
+    session = LiveTranscriptionSession(fake_transcribe, SR, step_s=1.0)
+    updates = []
+    for _ in range(4):
+        session.feed(speech(1.0))
+        updates.append(run(session.advance()))
+
+    assert updates[0].stable == "" and updates[0].tentative == "the"
+    assert updates[1].stable == "the" and updates[1].tentative == "quick"
+    assert updates[3].stable == "brown" and updates[3].tentative == "fox"
+    assert session.transcript == ["the", "quick", "brown"]
+
+def test_silence_ends_utterance_and_commits_everything():
+    session = LiveTranscriptionSession(fake_transcribe, SR, min_silence_s=0.6)
+    session.feed(speech(2.0))
+    run(session.advance())
+    session.feed(silence(1.0))
+    update = run(session.advance())
+    assert update.tentative == ""
+    assert session.transcript == ["the", "quick", "brown"]
+
+def test_silence_is_not_sent_to_the_model():
+    calls = []
+
+    async def transcribe(audio):
+        calls.append(len(audio))
+        return ""
+
+    session = LiveTranscriptionSession(transcribe, SR)
+    session.feed(silence(3.0))
+    assert run(session.advance()) is None
+    assert calls == []
+
+def test_backlog_drops_oldest_audio():
+    """Test that audio beyond the backlog limit is dropped so latency stays bounded"""
+    session = LiveTranscriptionSession(fake_transcribe, SR, max_backlog_s=2.0)
+    assert session.feed(speech(1.5)) == 0
+    dropped = session.feed(speech(1.5))
+    assert dropped == SR
+    assert session.backlog_s == pytest.approx(2.0)
+    assert session.dropped_samples == SR
+
+def test_utterance_and_backlog_never_exceed_whisper_window():
+    """Test that audio queued during a decode is cut at 30 s and starts the next utterance"""
+    lengths = []
+
+    async def transcribe(audio):
+        lengths.append(len(audio))
+        return await fake_transcribe(audio)
+
+    session = LiveTranscriptionSession(transcribe, SR, max_window_s=60, max_backlog_s=60)
+    session.feed(speech(25.0))
+    run(session.advance())
+    session.feed(speech(10.0))
+    update = run(session.advance())
+
+    assert lengths[0] == 25 * SR and lengths[1] <= 30 * SR
+    # The cut ends the utterance, so everything decoded so far is committed
+    assert update.tentative == "" and session.transcript == WORDS
+    assert session.ready and session.backlog_s == pytest.approx(35 - lengths[1] / SR)
+    run(session.advance(final=True))
+    assert sum(lengths[1:]) == 35 * SR
+
+def test_live_decodes_are_admitted_through_the_inference_pool():
+    """Test that live decodes count against the request queue and fail fast when it is full"""
+    service = make_whisper_service(settings=Settings(inference_workers=1, inference_queue_size=0))
+
+    async def decode_while_saturated():
+        async with service.inference_pool.slot():
+            await service.transcribe_array(speech(1.0), TranscriptionOptions())
+
+    with pytest.raises(InferenceQueueFullError):
+        run(decode_while_saturated())
+    assert run(service.transcribe_array(speech(1.0), TranscriptionOptions()))["text"] == "hi"
+    service.inference_pool.shutdown()
+
+def make_client(service=None) -> TestClient:
+    app = FastAPI()
+    settings = Settings(live_step_ms=1000, live_max_backlog_s=30)
+    app.include_router(create_live_router(service or LiveTestTranscriptionService(), settings), prefix="/api/v1")
+    return TestClient(app)
+
+def pcm_s16le(audio: np.ndarray) -> bytes:
+    return (audio * 32767).astype("<i2").tobytes()
+
+def test_websocket_streams_hypotheses_and_final_transcript():
+    with make_client().websocket_connect("/api/v1/live") as websocket:
+        for _ in range(3):
+            websocket.send_bytes(pcm_s16le(speech(1.0)))
+        websocket.send_text(json.dumps({"type": "end"}))
+
+        messages = []
+        while not messages or messages[-1]["type"] != "final":
+            messages.append(websocket.receive_json())
+
+    assert all(message["type"] in ("hypothesis", "final") for message in messages)
+    assert all(message["latency_s"] >= 0 for message in messages[:-1])
+    assert messages[-1]["text"] == "the quick brown"
+
+def test_websocket_resamples_other_rates():
+    with make_client().websocket_connect("/api/v1/live?sample_rate=8000&encoding=f32le") as websocket:
+        websocket.send_bytes(speech(1.0)[::2].astype("<f4").tobytes())
+        websocket.send_text("end")
+        message = websocket.receive_json()
+        while message["type"] != "final":
+            message = websocket.receive_json()
+    assert message["text"] == "the"
+
+def test_overloaded_server_closes_the_session_with_try_again_later():
+    class OverloadedService(TestTranscriptionService):
+        async def transcribe_array(self, audio, options):
+            raise InferenceQueueFullError(retry_after=5)
+
+    with make_client(OverloadedService()).websocket_connect("/api/v1/live") as websocket:
+        websocket.send_bytes(pcm_s16le(speech(1.0)))
+        websocket.send_text("end")
+        assert websocket.receive_json() == {
+            "type": "error", "detail": "Inference queue is full, retry later", "retry_after": 5,
+        }
+        assert websocket.receive()["code"] == 1013
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.routers.transcription import create_router
+from app.services import metrics
+from benchmarks.run import synthetic_speech, to_wav_bytes
+from tests.test_audio import requires_ffmpeg
+from tests.utils import TestTranscriptionService, make_whisper_service
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+class FakeEncoder:
+    def __init__(self):
+        self.pre_hooks, self.hooks = [], []
+
+    def register_forward_pre_hook(self, hook):
+        self.pre_hooks.append(hook)
+
+    def register_forward_hook(self, hook):
+        self.hooks.append(hook)
+
+    def __call__(self):
+        for hook in self.pre_hooks:
+            hook(self, ())
+        for hook in self.hooks:
+            hook(self, (), None)
+
+class FakePipeline:
+    """Calls its feature extractor and encoder like the ASR pipeline does"""
+
+    def __init__(self):
+        self.encoder = FakeEncoder()
+        self.feature_extractor = lambda audio, **kwargs: audio
+        self.model = type("Model", (), {"get_encoder": lambda _: self.encoder})()
+
+    def __call__(self, inputs, **kwargs):
+        for item in inputs:
+            self.feature_extractor(item["raw"])
+            self.encoder()
+        return [{"text": "hi"} for _ in inputs]
+
+def make_service():
+    return make_whisper_service(FakePipeline(), size_bytes=1234)
+
+def make_app(service) -> FastAPI:
+    app = FastAPI()
+    app.include_router(create_router(service), prefix="/api/v1")
+    return app
+
+def test_concurrent_first_batches_instrument_the_pipeline_once():
+    """Test that inference threads starting together register the encoder hooks only once"""
+    pipeline = FakePipeline()
+    encoder = pipeline.encoder
+
+    def slow_get_encoder(_):
+        time.sleep(0.05)
+        return encoder
+
+    pipeline.model = type("Model", (), {"get_encoder": slow_get_encoder})()
+    threads = [threading.Thread(target=metrics.instrument_pipeline, args=(pipeline,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert (len(encoder.pre_hooks), len(encoder.hooks)) == (1, 1)
+
+@requires_ffmpeg
+def test_debug_option_returns_stage_timings():
+    """Test that stage timings cover decode and every model stage, and feed the histograms"""
+    service = make_service()
+    client = TestClient(make_app(service))
+    before = sample("transcriber_audio_seconds_total", source="upload")
+    files = {"file": ("speech.wav", to_wav_bytes(synthetic_speech(3)), "audio/wav")}
+
+    response = client.post("/api/v1/transcribe", files=files, params={"debug": True})
+    service.inference_pool.shutdown()
+
+    assert response.status_code == 200
+    debug = response.json()["debug"]
+    # The upload is cut into windows while it decodes, so there is no separate segmentation stage
+    assert {"decode", "transcription", "feature_extraction", "encoder",
+            "decoder", "inference", "total"} <= set(debug["timings_s"])
+    assert debug["audio_s"] == 3.0
+    assert debug["real_time_factor"] > 0
+    assert sample("transcriber_audio_seconds_total", source="upload") - before == 3.0
+    assert sample("transcriber_stage_seconds_count", stage="encoder") >= 1
+    assert sample("transcriber_request_seconds_count", endpoint="transcribe", status="200") >= 1
+
+def test_debug_is_omitted_by_default():
+    client = TestClient(make_app(TestTranscriptionService()))
+    files = {"file": ("test.mp3", b"0" * 100, "audio/mpeg")}
+    assert client.post("/api/v1/transcribe", files=files).json()["debug"] is None
+
+def test_request_latency_is_recorded_by_status():
+    client = TestClient(make_app(TestTranscriptionService()))
+    before = sample("transcriber_request_seconds_count", endpoint="transcribe", status="400")
+    client.post("/api/v1/transcribe", files={"file": ("test.txt", b"0", "text/plain")})
+    assert sample("transcriber_request_seconds_count", endpoint="transcribe", status="400") == before + 1
+
+def test_gauges_read_service_state():
+    service = make_service()
+    metrics.bind_service(service)
+    service.registry.get()
+    assert sample("transcriber_model_memory_bytes") == 1234
+    assert sample("transcriber_loaded_models") == 1
+
+    async def admitted():
+        async with service.inference_pool.slot():
+            return sample("transcriber_in_flight_requests")
+
+    assert asyncio.run(admitted()) == 1
+    assert sample("transcriber_in_flight_requests") == 0
+    service.inference_pool.shutdown()
+
+def test_metrics_endpoint_serves_prometheus_text():
+    from app import main
+
+    response = TestClient(main.app).get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    for name in ("transcriber_stage_seconds", "transcriber_real_time_factor", "transcriber_queue_depth",
+                 "transcriber_in_flight_requests", "transcriber_model_memory_bytes"):
+        assert name in response.text
@@ -0,0 +1,93 @@
+import threading
+import pytest
+from fastapi.testclient import TestClient
+from app.services.model_registry import LoadedModel, ModelRegistry, UnknownModelError
+
+MB = 1024**2
+
+class FakeLoader:
+    """Loader that builds fake models with fixed sizes and counts loads per model"""
+
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.loads = []
+        self._lock = threading.Lock()
+
+    def __call__(self, model_id):
+        with self._lock:
+            self.loads.append(model_id)
+        return LoadedModel(model_id, None, None, lambda inputs, **kwargs: inputs, self.sizes[model_id])
+
+@pytest.fixture
+def loader():
+    return FakeLoader({
+        "distil-whisper/distil-large-v3": 1500 * MB,
+        "openai/whisper-tiny": 150 * MB,
+        "openai/whisper-base": 300 * MB,
+    })
+
+def test_models_load_lazily(loader):
+    """Test that constructing the registry loads nothing until a model is requested"""
+    registry = ModelRegistry(loader=loader)
+    assert loader.loads == []
+    assert not registry.ready
+
+    registry.get("tiny")
+    registry.get("openai/whisper-tiny")
+    assert loader.loads == ["openai/whisper-tiny"]
+    assert not registry.ready
+
+def test_warm_up_marks_ready(loader):
+    """Test that warm-up loads the default and extra models and reports readiness"""
+    registry = ModelRegistry(loader=loader)
+    registry.warm_up(["base"])
+    assert registry.ready
+    assert registry.loaded_models == ["distil-whisper/distil-large-v3", "openai/whisper-base"]
+
+def test_lru_eviction_keeps_default_model(loader):
+    """Test that least recently used models are evicted beyond the memory budget"""
+    registry = ModelRegistry(loader=loader, memory_budget_bytes=1900 * MB)
+    registry.warm_up()
+    registry.get("tiny")
+    registry.get("base")
+    assert registry.loaded_models == ["distil-whisper/distil-large-v3", "openai/whisper-base"]
+    assert registry.loaded_bytes == 1800 * MB
+    assert registry.ready
+
+def test_unknown_model_rejected(loader):
+    """Test that unsupported model names are rejected without loading anything"""
+    registry = ModelRegistry(loader=loader)
+    with pytest.raises(UnknownModelError):
+        registry.get("openai/whisper-large-v3")
+    assert loader.loads == []
+
+def test_concurrent_requests_load_model_once(loader):
+    """Test that concurrent first requests for a model share a single load"""
+    registry = ModelRegistry(loader=loader)
+    threads = [threading.Thread(target=registry.get, args=("base",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert loader.loads == ["openai/whisper-base"]
+
+def test_ready_endpoint_waits_for_warm_up(loader, monkeypatch):
+    """Test that /ready fails until the default model has been loaded"""
+    from app import main
+
+    registry = ModelRegistry(loader=loader)
+    monkeypatch.setattr(main.whisper_service, "registry", registry)
+    monkeypatch.setattr(main.settings, "warm_up", False)
+
+    with TestClient(main.app) as client:
+        assert client.get("/ready").status_code == 503
+        registry.warm_up()
+        response = client.get("/ready")
+        assert response.status_code == 200
+        assert response.json()["models"] == ["distil-whisper/distil-large-v3"]
+
+def test_configured_default_model_is_allowed():
+    """Test that a default model outside the alias list can still be served"""
+    registry = ModelRegistry(default_model="openai/whisper-small", loader=lambda model_id: LoadedModel(model_id, None, None, None, 1))
+    assert registry.resolve(None) == "openai/whisper-small"
+    assert registry.get("openai/whisper-small").model_id == "openai/whisper-small"
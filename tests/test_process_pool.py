@@ -0,0 +1,56 @@
+import os
+import numpy as np
+import pytest
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.process_pool import ModelProcessPool
+
+def fake_pipeline(inputs, **kwargs):
+    return [{"text": str(len(item["raw"])), "pid": os.getpid()} for item in inputs]
+
+def fake_loader(model_id):
+    # Module-level so spawned workers can unpickle it
+    return LoadedModel(model_id, None, None, fake_pipeline, 1)
+
+def marker_loader(model_id):
+    # The model ID is a directory in which each loading worker leaves its PID
+    if model_id.endswith("broken"):
+        raise ValueError("no such model")
+    open(os.path.join(model_id, str(os.getpid())), "w").close()
+    return fake_loader(model_id)
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ModelProcessPool(
+        2,
+        fake_loader,
+        default_model="openai/whisper-tiny",
+        allowed_models=["openai/whisper-tiny"],
+        memory_budget_bytes=1024,
+    )
+    yield pool
+    pool.shutdown()
+
+def test_batches_run_in_workers_in_order(pool):
+    """Test that a batch split across worker processes comes back in input order"""
+    registry = ModelRegistry(default_model="openai/whisper-tiny", loader=pool.load)
+    inputs = [{"raw": np.zeros(n, dtype=np.float32), "sampling_rate": 16000} for n in range(1, 9)]
+    results = registry.get().transcriber(inputs, batch_size=8)
+
+    assert [result["text"] for result in results] == [str(n) for n in range(1, 9)]
+    assert os.getpid() not in {result["pid"] for result in results}
+    assert registry.ready
+
+def test_load_returns_once_every_worker_holds_the_model(tmp_path):
+    """Test that each worker loads the model itself before the load is reported done"""
+    model_id, broken = str(tmp_path), str(tmp_path / "broken")
+    pool = ModelProcessPool(
+        2, marker_loader, default_model=model_id, allowed_models=[model_id, broken], memory_budget_bytes=1024
+    )
+    try:
+        # A failed load reports the loader's error and leaves the pool able to load others
+        with pytest.raises(ValueError, match="no such model"):
+            pool.load(broken)
+        pool.load(model_id)
+        assert len(os.listdir(tmp_path)) == 2
+    finally:
+        pool.shutdown()
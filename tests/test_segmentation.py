@@ -0,0 +1,74 @@
+import numpy as np
+from app.services.segmentation import split_on_silence
+from app.services.transcription_service import merge_window_results
+
+SR = 16000
+
+def speech_with_pauses(seconds: int, pause_every_s: float, pause_s: float = 0.4) -> np.ndarray:
+    """Loud noise with short silent gaps every pause_every_s seconds"""
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, seconds * SR).astype(np.float32)
+    for start in np.arange(pause_every_s, seconds, pause_every_s):
+        audio[int(start * SR):int((start + pause_s) * SR)] = 0.0
+    return audio
+
+def test_short_audio_is_one_window():
+    audio = np.zeros(10 * SR, dtype=np.float32)
+    assert split_on_silence(audio, SR, max_window_s=30) == [(0, len(audio))]
+
+def test_windows_cover_audio_and_respect_max_length():
+    """Test that windows are contiguous, cover everything, and never exceed the maximum"""
+    audio = speech_with_pauses(95, pause_every_s=7)
+    windows = split_on_silence(audio, SR, max_window_s=30)
+    assert windows[0][0] == 0 and windows[-1][1] == len(audio)
+    for (_, end), (next_start, _) in zip(windows, windows[1:]):
+        assert end == next_start
+    assert all(end - start <= 30 * SR for start, end in windows)
+
+def test_cuts_land_in_silence():
+    """Test that cut points are placed inside pauses rather than mid-speech"""
+    audio = speech_with_pauses(95, pause_every_s=7)
+    windows = split_on_silence(audio, SR, max_window_s=30)
+    for _, cut in windows[:-1]:
+        assert audio[cut] == 0.0
+
+def test_windows_are_views():
+    audio = speech_with_pauses(65, pause_every_s=7)
+    start, end = split_on_silence(audio, SR, max_window_s=30)[1]
+    assert np.shares_memory(audio[start:end], audio)
+
+def test_merge_shifts_timestamps_by_window_offset():
+    """Test that per-window timestamps are shifted onto the full audio's timeline"""
+    results = [
+        {"text": " Hello there.", "chunks": [{"timestamp": (0.0, 2.5), "text": " Hello there."}]},
+        {"text": " General Kenobi.", "chunks": [{"timestamp": (1.0, None), "text": " General Kenobi."}]},
+    ]
+    merged = merge_window_results(results, [(0, 28 * SR), (28 * SR, 40 * SR)])
+    assert merged["text"] == "Hello there. General Kenobi."
+    assert merged["segments"] == [
+        {"start": 0.0, "end": 2.5, "text": "Hello there."},
+        {"start": 29.0, "end": 40.0, "text": "General Kenobi."},
+    ]
+
+def test_merge_groups_words_into_segments():
+    """Test that word chunks are shifted and grouped at sentence ends, long pauses and window edges"""
+    results = [
+        {"text": " Hi there. How are", "chunks": [
+            {"timestamp": (0.0, 0.4), "text": " Hi"},
+            {"timestamp": (0.4, 0.9), "text": " there."},
+            {"timestamp": (1.0, 1.2), "text": " How"},
+            {"timestamp": (3.0, 3.2), "text": " are"},
+        ]},
+        {"text": " you?", "chunks": [{"timestamp": (0.5, None), "text": " you?"}]},
+    ]
+    merged = merge_window_results(results, [(0, 28 * SR), (28 * SR, 30 * SR)], word_timestamps=True)
+    assert [(s["start"], s["end"], s["text"]) for s in merged["segments"]] == [
+        (0.0, 0.9, "Hi there."),
+        (1.0, 1.2, "How"),
+        (3.0, 3.2, "are"),
+        (28.5, 30.0, "you?"),
+    ]
+    assert merged["segments"][0]["words"] == [
+        {"start": 0.0, "end": 0.4, "text": "Hi"},
+        {"start": 0.4, "end": 0.9, "text": "there."},
+    ]
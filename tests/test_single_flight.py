@@ -0,0 +1,117 @@
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_run():
+    """Test that callers with the same key attach to one call and all get its result"""
+    flights = SingleFlight()
+    calls = []
+
+    async def fn(report):
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.run("key", fn) for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert [result for result, _ in results] == ["result"] * 5
+    assert [started for _, started in results] == [True] + [False] * 4
+    assert len(calls) == 1
+    assert (flights.stats.started, flights.stats.joined, len(flights)) == (1, 4, 0)
+
+def test_cancelled_caller_leaves_the_call_running_for_others():
+    """Test that one caller disconnecting neither cancels the call nor the other callers"""
+    flights = SingleFlight()
+    finished = []
+
+    async def fn(report):
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "result"
+
+    async def main():
+        leaver = asyncio.create_task(flights.run("key", fn))
+        stayer = asyncio.create_task(flights.run("key", fn))
+        await asyncio.sleep(0.01)
+        leaver.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leaver
+        return await stayer
+
+    assert asyncio.run(main()) == ("result", False)
+    assert finished == [1]
+    assert flights.stats.cancelled == 0
+
+def test_call_is_cancelled_when_every_caller_leaves():
+    """Test that the call stops once nobody waits for it, and the next caller starts afresh"""
+    flights = SingleFlight()
+    runs = []
+
+    async def fn(report):
+        runs.append("started")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            runs.append("cancelled")
+            raise
+        return "stale"
+
+    async def fresh(report):
+        return "fresh"
+
+    async def main():
+        callers = [asyncio.create_task(flights.run("key", fn)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return await flights.run("key", fresh)
+
+    assert asyncio.run(main()) == ("fresh", True)
+    assert runs == ["started", "cancelled"]
+    assert flights.stats.cancelled == 1
+
+def test_errors_reach_every_caller_and_are_not_remembered():
+    """Test that a failed call raises for all its callers and a later call runs again"""
+    flights = SingleFlight()
+
+    async def failing(report):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def succeeding(report):
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(*(flights.run("key", failing) for _ in range(3)), return_exceptions=True)
+        return results, await flights.run("key", succeeding)
+
+    results, retry = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retry == ("ok", True)
+
+def test_progress_reaches_every_caller_and_is_replayed_to_late_joiners():
+    """Test that progress events fan out, and a caller joining late first sees the earlier ones"""
+    flights = SingleFlight()
+
+    async def main():
+        halfway = asyncio.Event()
+
+        async def fn(report):
+            report(1)
+            halfway.set()
+            await asyncio.sleep(0.01)
+            report(2)
+            return "done"
+
+        early, late = [], []
+        first = asyncio.create_task(flights.run("key", fn, early.append))
+        await halfway.wait()
+        await flights.run("key", fn, late.append)
+        await first
+        return early, late
+
+    assert asyncio.run(main()) == ([1, 2], [1, 2])
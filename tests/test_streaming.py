@@ -0,0 +1,95 @@
+import asyncio
+import json
+import time
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers.transcription import create_router
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services.audio import SAMPLING_RATE
+from app.services.transcription_service import TranscriptionProgress
+from tests.utils import TestTranscriptionService, make_whisper_service
+
+class ChunkedTranscriptionService(TestTranscriptionService):
+    """Test service that reports three chunks before returning the merged result"""
+
+    async def transcribe(self, source, options, is_youtube=False, progress=None):
+        for index in range(3):
+            chunk = {"index": index, "start": index * 30.0, "end": (index + 1) * 30.0, "text": f"part {index}"}
+            progress(TranscriptionProgress(index + 1, 3, chunk))
+        return await super().transcribe(source, options, is_youtube)
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(create_router(ChunkedTranscriptionService()), prefix="/api/v1")
+    return TestClient(app)
+
+def test_stream_emits_chunks_then_result(client):
+    """Test that each chunk is streamed before the final merged result"""
+    files = {"file": ("test.mp3", b"0" * 1000, "audio/mpeg")}
+    response = client.post("/api/v1/transcribe/stream", files=files)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = parse_events(response.text)
+    assert [event for event, _ in events] == ["chunk", "chunk", "chunk", "result"]
+    assert [data["text"] for _, data in events[:3]] == ["part 0", "part 1", "part 2"]
+    assert events[2][1]["chunks_done"] == events[2][1]["chunks_total"] == 3
+    assert events[-1][1]["text"] == "Test transcription for file size: 1000 bytes"
+
+def test_youtube_stream_emits_result(client):
+    request = {"url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ"}
+    events = parse_events(client.post("/api/v1/transcribe/youtube/stream", json=request).text)
+    assert events[-1][0] == "result"
+    assert events[-1][1]["video_title"] == "Test Video Title"
+
+def test_stream_reports_errors_as_events(client):
+    """Test that a failure after the stream has started is sent as an error event"""
+    request = {"url": "https://www.youtube.com/watch?v=nonexistentvideo"}
+    events = parse_events(client.post("/api/v1/transcribe/youtube/stream", json=request).text)
+    event, data = events[-1]
+    assert event == "error"
+    assert data["status_code"] == 500
+    assert "Failed to transcribe YouTube video" in data["detail"]
+
+def test_stream_rejects_non_audio(client):
+    files = {"file": ("test.txt", b"test content", "text/plain")}
+    assert client.post("/api/v1/transcribe/stream", files=files).status_code == 400
+
+def test_first_chunk_arrives_before_the_last_batch():
+    """Test that a streamed file's first window is decoded on its own instead of in one big batch"""
+    batches = []
+
+    def transcriber(inputs, **kwargs):
+        time.sleep(0.02 * len(inputs))
+        batches.append((len(inputs), time.monotonic()))
+        return [{"text": "hi"} for _ in inputs]
+
+    service = make_whisper_service(transcriber, Settings(language_detection=False))
+    chunk_times = []
+    # Six minutes: fewer windows than the default batch size of 16
+    audio = np.zeros(360 * SAMPLING_RATE, dtype=np.float32)
+    options = TranscriptionOptions()
+
+    def progress(update):
+        if update.chunk:
+            chunk_times.append(time.monotonic())
+
+    result = asyncio.run(service._transcribe_audio(audio, options, service._batch_key(options), progress))
+    service.inference_pool.shutdown()
+
+    windows = sum(size for size, _ in batches)
+    assert 1 < windows <= 16
+    assert len(chunk_times) == windows and result["text"] == " ".join(["hi"] * windows)
+    assert batches[0][0] == 1
+    assert chunk_times[0] < batches[-1][1]
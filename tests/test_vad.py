@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+import pytest
+from app.models.transcription import TranscriptionOptions
+from app.services.segmentation import pack_speech_regions
+from app.services.vad import EnergyVAD
+from tests.utils import make_whisper_service
+
+SR = 16000
+
+def noise(seconds: float) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return rng.uniform(-0.5, 0.5, int(seconds * SR)).astype(np.float32)
+
+def silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SR), dtype=np.float32)
+
+def test_speech_regions_skip_silence_and_bridge_short_pauses():
+    audio = np.concatenate([silence(5), noise(2), silence(0.2), noise(1), silence(10), noise(3), silence(5)])
+    regions = EnergyVAD(SR).speech_regions(audio, padding_s=0.2)
+    assert len(regions) == 2
+    (first_start, first_end), (second_start, second_end) = regions
+    assert first_start / SR == pytest.approx(4.8, abs=0.05)
+    assert first_end / SR == pytest.approx(8.4, abs=0.05)
+    assert second_start / SR == pytest.approx(18.0, abs=0.05)
+    assert second_end / SR == pytest.approx(21.4, abs=0.05)
+
+def test_speech_regions_drop_clicks():
+    audio = np.concatenate([silence(2), noise(0.03), silence(2)])
+    assert EnergyVAD(SR).speech_regions(audio) == []
+
+def test_pack_speech_regions_respects_max_window():
+    """Test that regions are packed up to the window length and long regions are split"""
+    audio = noise(100)
+    regions = [(0, 10 * SR), (20 * SR, 35 * SR), (40 * SR, 50 * SR), (60 * SR, 100 * SR)]
+    packed = pack_speech_regions(audio, regions, SR, max_window_s=30)
+    assert packed[0] == [(0, 10 * SR), (20 * SR, 35 * SR)]
+    assert all(sum(end - start for start, end in pieces) <= 30 * SR for pieces in packed)
+    assert [piece for pieces in packed for piece in pieces][-1][1] == 100 * SR
+
+class RecordingTranscriber:
+    """Fake pipeline returning one segment per input, spanning the whole input"""
+
+    def __init__(self):
+        self.input_lengths = []
+
+    def __call__(self, inputs, **kwargs):
+        results = []
+        for item in inputs:
+            seconds = len(item["raw"]) / SR
+            self.input_lengths.append(seconds)
+            results.append({"text": " speech", "chunks": [{"timestamp": (0.5, seconds - 0.5), "text": " speech"}]})
+        return results
+
+@pytest.fixture
+def service_and_transcriber():
+    transcriber = RecordingTranscriber()
+    service = make_whisper_service(transcriber)
+    yield service, transcriber
+    service.inference_pool.shutdown()
+
+def test_vad_transcribes_only_speech_with_original_timestamps(service_and_transcriber):
+    """Test that silence is cut before inference and timestamps map back to the full audio"""
+    service, transcriber = service_and_transcriber
+    audio = np.concatenate([silence(20), noise(4), silence(30), noise(6), silence(20)])
+    options = TranscriptionOptions(vad=True, return_timestamps=True)
+    result = asyncio.run(service._transcribe_audio(audio, options, service._batch_key(options)))
+
+    # Both regions (with padding) fit in one model input instead of three 30 s windows
+    assert transcriber.input_lengths == [pytest.approx(10.8, abs=0.1)]
+    assert result["silence_skipped_s"] == pytest.approx(80 - 10.8, abs=0.1)
+    assert result["segments"][0]["start"] == pytest.approx(20.3, abs=0.1)
+    assert result["segments"][0]["end"] == pytest.approx(59.7, abs=0.1)
+
+def test_without_vad_all_audio_is_transcribed(service_and_transcriber):
+    service, transcriber = service_and_transcriber
+    audio = np.concatenate([silence(20), noise(4), silence(30), noise(6), silence(20)])
+    options = TranscriptionOptions()
+    result = asyncio.run(service._transcribe_audio(audio, options, service._batch_key(options)))
+    assert sum(transcriber.input_lengths) == pytest.approx(80)
+    assert "silence_skipped_s" not in result
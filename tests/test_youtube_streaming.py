@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pytest
+from app.config import Settings
+from app.models.transcription import TranscriptionOptions
+from app.services import transcription_service
+from app.services.audio import AudioDecodeError
+from app.services.youtube import YoutubeAudio
+from tests.test_audio import requires_ffmpeg, write_wav
+from tests.utils import make_whisper_service
+
+SR = 16000
+
+class ThrottledAudioServer:
+    """Local HTTP server that serves a WAV file slowly, standing in for YouTube's media servers.
+
+    yt-dlp's generic extractor resolves its URLs like any other video page, so the real
+    resolver is exercised without network access.
+    """
+
+    def __init__(self, content: bytes, seconds: float):
+        self.content = content
+        self.seconds = seconds
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav")
+                self.send_header("Content-Length", str(len(server.content)))
+                self.end_headers()
+
+            def do_GET(self):
+                started = time.monotonic()
+                self.do_HEAD()
+                pieces = 20
+                size = -(-len(server.content) // pieces)
+                try:
+                    for start in range(0, len(server.content), size):
+                        time.sleep(server.seconds / pieces)
+                        self.wfile.write(server.content[start:start + size])
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # yt-dlp only reads the start of the response while resolving
+                    return
+                server.requests.append((started, time.monotonic()))
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/talk.wav"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class TimedTranscriber:
+    """Fake pipeline that records when each window reached the model"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.extend(time.monotonic() for _ in inputs)
+        return [{"text": f" {len(item['raw']) // SR}s"} for item in inputs]
+
+@pytest.fixture
+def wav_bytes(tmp_path):
+    path = tmp_path / "talk.wav"
+    write_wav(path, seconds=70, sampling_rate=SR, channels=1)
+    return path.read_bytes()
+
+@requires_ffmpeg
+def test_inference_starts_before_download_finishes(wav_bytes):
+    """Test that windows are transcribed while the rest of the audio is still downloading"""
+    transcriber = TimedTranscriber()
+    service = make_whisper_service(transcriber, Settings(batch_max_wait_ms=0))
+    with ThrottledAudioServer(wav_bytes, seconds=2.0) as server:
+        result = asyncio.run(service.transcribe(server.url, TranscriptionOptions(), is_youtube=True))
+
+    download_finished = server.requests[-1][1]
+    assert transcriber.calls[0] < download_finished
+    assert len(transcriber.calls) == 3
+    assert result["video_title"] == "talk"
+
+@requires_ffmpeg
+def test_concurrent_downloads_are_capped(wav_bytes):
+    """Test that downloads beyond the cap wait for a free download worker"""
+    service = make_whisper_service(TimedTranscriber(), Settings(max_concurrent_downloads=1, inference_queue_size=4))
+    with ThrottledAudioServer(wav_bytes, seconds=0.5) as server:
+        async def transcribe_twice():
+            return await asyncio.gather(*(
+                service.transcribe(server.url, TranscriptionOptions(), is_youtube=True) for _ in range(2)
+            ))
+        asyncio.run(transcribe_twice())
+
+    streams = sorted(server.requests)
+    assert len(streams) == 2
+    assert streams[1][0] >= streams[0][1] - 0.05
+
+@requires_ffmpeg
+def test_unreadable_stream_raises_decode_error():
+    service = make_whisper_service(TimedTranscriber())
+    with ThrottledAudioServer(b"0" * 1000, seconds=0.1) as server:
+        with pytest.raises(AudioDecodeError):
+            asyncio.run(service.transcribe(server.url, TranscriptionOptions(), is_youtube=True))
+
+def test_slow_model_slows_the_download_without_progress(monkeypatch):
+    """Test that decoding waits for inference even when nobody streams progress"""
+    decoded = 0
+    block = np.zeros(SR, dtype=np.float32)
+
+    def fake_stream(url, headers=None):
+        nonlocal decoded
+        for _ in range(900):
+            decoded += 1
+            yield block
+
+    seen = []
+
+    def slow_transcriber(inputs, **kwargs):
+        seen.append((len(seen), decoded))
+        time.sleep(0.05)
+        return [{"text": "hi"} for _ in inputs]
+
+    monkeypatch.setattr(transcription_service, "stream_decode_audio", fake_stream)
+    service = make_whisper_service(
+        slow_transcriber,
+        Settings(batch_max_size=2, batch_max_wait_ms=0, artifact_max_mb=0),
+        youtube_resolver=lambda url: YoutubeAudio("https://media.example/talk", "talk", 900.0),
+    )
+    asyncio.run(service.transcribe("https://www.youtube.com/watch?v=dQw4w9WgXcQ", TranscriptionOptions(), is_youtube=True))
+
+    # Seconds decoded ahead of the model: at most the block queue, the windows in flight and one being cut
+    ahead = 64 + 2 * 30 + 30 + 30
+    assert len(seen) >= 15
+    assert all(blocks <= calls * 2 * 30 + ahead for calls, blocks in seen)
@@ -1,16 +1,44 @@
-from typing import Union, Dict
+from typing import Any, Callable, Union, Dict, List, Optional
 from fastapi import UploadFile
-from app.services.transcription_service import TranscriptionService
+from app.config import Settings
+from app.services.model_registry import LoadedModel, ModelRegistry
+from app.services.transcription_service import (
+    ProgressCallback,
+    TranscriptionProgress,
+    TranscriptionService,
+    WhisperTranscriptionService,
+)
 from app.models.transcription import TranscriptionOptions
 
+def say_hi(inputs: List[Dict], **kwargs: Any) -> List[Dict]:
+    """Fake pipeline that hears "hi" in every input"""
+    return [{"text": "hi"} for _ in inputs]
+
+def make_whisper_service(
+    transcriber: Callable = say_hi,
+    settings: Optional[Settings] = None,
+    size_bytes: int = 0,
+    language_detector: Optional[Callable] = None,
+    **kwargs: Any
+) -> WhisperTranscriptionService:
+    """The real service, with every model it loads replaced by transcriber"""
+    registry = ModelRegistry(loader=lambda model_id: LoadedModel(
+        model_id, None, None, transcriber, size_bytes, language_detector=language_detector
+    ))
+    return WhisperTranscriptionService(settings, registry=registry, **kwargs)
+
 class TestTranscriptionService(TranscriptionService):
     async def transcribe(
         self, 
         source: Union[UploadFile, str], 
         options: TranscriptionOptions,
-        is_youtube: bool = False
+        is_youtube: bool = False,
+        progress: Optional[ProgressCallback] = None
     ) -> Dict:
         """Mock transcription service that returns test data"""
+        if progress:
+            chunk = {"index": 0, "start": 0, "end": 1, "text": "Test segment"}
+            progress(TranscriptionProgress(1, 1, chunk))
         if is_youtube:
             # Simulate YouTube video transcription
             if not isinstance(source, str):
@@ -39,4 +67,15 @@ class TestTranscriptionService(TranscriptionService):
                 result["segments"] = [
                     {"start": 0, "end": 1, "text": "Test segment"}
                 ]
-            return result
\ No newline at end of file
+            return result
+
+    async def detect_language(
+        self,
+        source: Union[UploadFile, str],
+        model: Optional[str] = None,
+        is_youtube: bool = False
+    ) -> Dict:
+        """Mock language detection that always hears French"""
+        if is_youtube and "nonexistentvideo" in source:
+            raise RuntimeError("Video unavailable")
+        return {"language": "fr", "probability": 0.9, "probabilities": {"fr": 0.9, "en": 0.1}}